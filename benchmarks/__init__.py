@@ -0,0 +1 @@
+"""Benchmark scripts for the auth service (run with ``python -m benchmarks.<name>``)."""
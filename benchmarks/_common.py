@@ -0,0 +1,84 @@
+"""Shared helpers for benchmark scripts.
+
+Benchmarks drive ``src.app.app`` in process through httpx's ASGI transport
+against a throwaway SQLite file, so they must configure the environment before
+any ``src`` module is imported. Call :func:`configure_environment` first and
+import application modules afterwards.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import httpx
+
+
+def configure_environment(**overrides: str) -> Path:
+    """Point the application at a fresh temporary SQLite database.
+
+    Args:
+        **overrides (str): Extra environment variables to set (e.g. ``HASH_WORKERS="0"``).
+
+    Returns:
+        Path: Location of the temporary database file.
+    """
+
+    db_path = Path(tempfile.mkdtemp(prefix="auth-bench-")) / "bench.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    # Benchmarks hammer a handful of accounts from one client address.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.update(overrides)
+    return db_path
+
+
+async def create_schema() -> None:
+    """Create all tables on the application engine (and every shard, if sharded)."""
+
+    import src.auth.models  # noqa: F401  (registers tables on Base.metadata)
+    from src.core.database import Base, schema_engines
+
+    for engine in schema_engines():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+
+def asgi_client() -> httpx.AsyncClient:
+    """Build an httpx client bound to the in-process ASGI app."""
+
+    import httpx
+
+    from src.app import app
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+
+def percentile(samples: Iterable[float], pct: float) -> float:
+    """Return the ``pct`` percentile (0-100) using nearest-rank interpolation."""
+
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[rank]
+
+
+def summarize_ms(samples: list[float]) -> dict[str, float]:
+    """Summarize latency samples given in seconds as milliseconds."""
+
+    return {
+        "count": float(len(samples)),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
@@ -0,0 +1,69 @@
+"""Microbenchmark ``decode_token`` with and without the verified-token cache.
+
+Decodes a pool of distinct access tokens repeatedly (as clients re-sending the
+same bearer token would) and reports microseconds per call, cache hit ratio
+and the time saved per call relative to the uncached path.
+
+Usage:
+    python -m benchmarks.bench_decode_token --tokens 100 --iterations 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from benchmarks._common import configure_environment
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--tokens", type=int, default=100, help="distinct tokens in rotation")
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--cache-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    configure_environment()
+    from src.auth.utils import create_access_token, decode_token, token_cache
+
+    tokens = [
+        create_access_token({"sub": f"user-{i}", "email": f"user{i}@example.com"})
+        for i in range(args.tokens)
+    ]
+    sequence = [tokens[i % len(tokens)] for i in range(args.iterations)]
+
+    def run() -> float:
+        start = time.perf_counter()
+        for token in sequence:
+            decode_token(token)
+        return (time.perf_counter() - start) / len(sequence) * 1e6
+
+    token_cache.max_size = 0
+    uncached_us = run()
+
+    token_cache.max_size = args.cache_size
+    token_cache.clear()
+    cached_us = run()
+    stats = token_cache.stats()
+
+    print(
+        json.dumps(
+            {
+                "distinct_tokens": args.tokens,
+                "iterations": args.iterations,
+                "uncached_us_per_call": uncached_us,
+                "cached_us_per_call": cached_us,
+                "saved_us_per_call": uncached_us - cached_us,
+                "speedup": uncached_us / cached_us if cached_us else None,
+                "hit_ratio": stats["hit_ratio"],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measure ``/me`` latency while concurrent logins run bcrypt.
+
+Compares the pooled hashing path against the old behaviour of verifying
+passwords inline on the event loop.
+
+Usage:
+    python -m benchmarks.bench_me_latency --mode pool --logins 4 --duration 10
+    python -m benchmarks.bench_me_latency --mode inline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._common import asgi_client, configure_environment, create_schema, summarize_ms
+
+USER = {"email": "bench@example.com", "username": "benchuser", "password": "BenchPassword123!"}
+
+
+async def _login_loop(stop: asyncio.Event, done: list[float]) -> None:
+    async with asgi_client() as client:
+        while not stop.is_set():
+            start = time.perf_counter()
+            resp = await client.post(
+                "/login", json={"email": USER["email"], "password": USER["password"]}
+            )
+            if resp.status_code == 200:
+                done.append(time.perf_counter() - start)
+
+
+async def run(mode: str, logins: int, duration: float, interval: float) -> dict[str, object]:
+    if mode == "inline":
+        from src.auth import service
+        from src.auth.utils import verify_password
+
+        async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+            return verify_password(plain_password, hashed_password)
+
+        service.verify_password_async = _inline_verify  # type: ignore[assignment]
+
+    await create_schema()
+    async with asgi_client() as client:
+        await client.post("/register", json=USER)
+        resp = await client.post(
+            "/login", json={"email": USER["email"], "password": USER["password"]}
+        )
+        headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+        stop = asyncio.Event()
+        login_latencies: list[float] = []
+        workers = [asyncio.create_task(_login_loop(stop, login_latencies)) for _ in range(logins)]
+
+        me_latencies: list[float] = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await client.get("/me", headers=headers)
+            me_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(interval)
+
+        stop.set()
+        await asyncio.gather(*workers)
+
+    from src.auth.hashing import password_hasher
+
+    password_hasher.shutdown()
+    return {
+        "mode": mode,
+        "concurrent_logins": logins,
+        "me": summarize_ms(me_latencies),
+        "login": summarize_ms(login_latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--mode", choices=["pool", "inline"], default="pool")
+    parser.add_argument("--logins", type=int, default=4, help="concurrent login loops")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to sample /me")
+    parser.add_argument("--interval", type=float, default=0.005, help="pause between /me calls")
+    args = parser.parse_args()
+
+    configure_environment()
+    result = asyncio.run(run(args.mode, args.logins, args.duration, args.interval))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
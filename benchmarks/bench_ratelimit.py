@@ -0,0 +1,70 @@
+"""Measure the per-request overhead of the auth rate-limit check.
+
+Runs ``RouteRateLimiter.check`` for a hot set of repeat keys and for a stream
+of unique keys that constantly forces LRU eviction (the credential-stuffing
+shape), and reports nanoseconds per check.
+
+Usage:
+    python -m benchmarks.bench_ratelimit --iterations 200000 --max-keys 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from starlette.requests import Request
+
+from benchmarks._common import configure_environment
+
+
+def _time_checks(limiter: object, requests: list[Request], emails: list[str]) -> float:
+    check = limiter.check  # type: ignore[attr-defined]
+    start = time.perf_counter()
+    for request, email in zip(requests, emails, strict=True):
+        check(request, email)
+    return (time.perf_counter() - start) / len(emails) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--hot-keys", type=int, default=1_000)
+    args = parser.parse_args()
+
+    configure_environment()
+    from src.auth.ratelimit import RouteRateLimiter
+
+    n = args.iterations
+    # Generous limits so every check takes the "allowed" path and nothing raises.
+    hot = RouteRateLimiter("login", per_minute=1e9, burst=10**9, max_keys=args.max_keys)
+    hot_ids = [i % args.hot_keys for i in range(n)]
+    hot_requests = [
+        Request({"type": "http", "client": (f"10.0.{k // 250}.{k % 250}", 1), "headers": []})
+        for k in hot_ids
+    ]
+    hot_emails = [f"user{k}@example.com" for k in hot_ids]
+
+    churn = RouteRateLimiter("login", per_minute=1e9, burst=10**9, max_keys=args.max_keys)
+    churn_requests = [
+        Request({"type": "http", "client": (f"ip-{i}", 1), "headers": []}) for i in range(n)
+    ]
+    churn_emails = [f"attacker{i}@example.com" for i in range(n)]
+
+    result = {
+        "iterations": n,
+        "max_keys": args.max_keys,
+        "hot_keys_ns_per_check": _time_checks(hot, hot_requests, hot_emails),
+        "unique_keys_ns_per_check": _time_checks(churn, churn_requests, churn_emails),
+        "unique_keys_buckets_retained": len(churn.buckets),
+        "unique_keys_evictions": churn.buckets.evictions,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
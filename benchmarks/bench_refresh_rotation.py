@@ -0,0 +1,231 @@
+"""Compare single-transaction refresh rotation with the example's rotation flow.
+
+``examples/alternative-auth-impl`` rotates with a lookup, a commit that revokes
+the old token, then an insert and a second commit. This script replays that
+flow against the ``src`` tables next to ``src.auth.service.refresh_access_token``
+(conditional ``UPDATE ... RETURNING`` + insert, one commit) and reports latency,
+SQL statements and commits per refresh for:
+
+* ``chains``: ``--clients`` concurrent clients each refreshing their own token
+  ``--rounds`` times, always presenting the newest token;
+* ``fanout``: ``--fanout`` concurrent refreshes presenting the same token,
+  reporting how many succeeded, how many successor tokens were issued and how
+  many of the user's tokens are still live afterwards. Correct is one success
+  and no live tokens: the losing requests are replays, and
+  ``refresh_access_token`` revokes the token's family on reuse.
+
+Usage:
+    python -m benchmarks.bench_refresh_rotation --clients 20 --rounds 20 --fanout 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from benchmarks._common import configure_environment, create_schema, summarize_ms
+
+RefreshFlow = Callable[[Any, str], Awaitable[tuple[str, str]]]
+
+
+async def example_refresh(db: Any, refresh_token: str) -> tuple[str, str]:
+    """The example's ``AuthService.refresh`` flow, ported to the async ``src`` models."""
+
+    from fastapi import HTTPException
+    from sqlalchemy import select
+
+    from src.auth.models import RefreshToken
+    from src.auth.service import _as_utc, create_tokens, refresh_token_record
+    from src.auth.utils import hash_token
+
+    row = (
+        await db.execute(
+            select(RefreshToken).where(RefreshToken.token_hash == hash_token(refresh_token))
+        )
+    ).scalar_one_or_none()
+    if row is None or row.revoked or _as_utc(row.expires_at) <= datetime.now(UTC):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    row.revoked = True
+    await db.commit()
+
+    user = await db.get(_user_model(), row.user_id)
+    access_token, new_refresh = create_tokens(user)
+    db.add(refresh_token_record(row.user_id, new_refresh))
+    await db.commit()
+    return access_token, new_refresh
+
+
+def _user_model() -> Any:
+    from src.auth.models import User
+
+    return User
+
+
+class StatementCounter:
+    """Count SQL statements and commits issued through the application engine."""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.commits = 0
+
+    def install(self) -> None:
+        from sqlalchemy import event
+
+        from src.core.database import engine
+
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine.sync_engine, "commit", self._on_commit)
+
+    def _on_execute(self, *_args: Any) -> None:
+        self.statements += 1
+
+    def _on_commit(self, *_args: Any) -> None:
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.statements = self.commits = 0
+
+
+async def _issue_tokens(count: int) -> list[str]:
+    """Create one user and ``count`` independent refresh tokens for it."""
+
+    from src.auth.models import User
+    from src.auth.service import create_tokens, refresh_token_record
+    from src.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        user = User(
+            email=f"bench-{time.monotonic_ns()}@example.com",
+            username=f"bench{time.monotonic_ns() % 10**12}",
+            hashed_password="x",
+            is_active=True,
+        )
+        db.add(user)
+        await db.flush()
+        tokens = []
+        for _ in range(count):
+            _, refresh_token = create_tokens(user)
+            db.add(refresh_token_record(user.id, refresh_token))
+            tokens.append(refresh_token)
+        await db.commit()
+    return tokens
+
+
+async def _timed_refresh(flow: RefreshFlow, refresh_token: str, samples: list[float]) -> str | None:
+    from fastapi import HTTPException
+
+    from src.core.database import AsyncSessionLocal
+
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            _, rotated = await flow(db, refresh_token)
+    except HTTPException:
+        return None
+    finally:
+        samples.append(time.perf_counter() - start)
+    return rotated
+
+
+async def run_chains(
+    flow: RefreshFlow, counter: StatementCounter, clients: int, rounds: int
+) -> dict[str, Any]:
+    tokens = await _issue_tokens(clients)
+    samples: list[float] = []
+    failures = 0
+
+    async def client(token: str) -> None:
+        nonlocal failures
+        for _ in range(rounds):
+            rotated = await _timed_refresh(flow, token, samples)
+            if rotated is None:
+                failures += 1
+                return
+            token = rotated
+
+    counter.reset()
+    await asyncio.gather(*(client(token) for token in tokens))
+    refreshes = max(len(samples), 1)
+    return {
+        **summarize_ms(samples),
+        "failures": failures,
+        "statements_per_refresh": counter.statements / refreshes,
+        "commits_per_refresh": counter.commits / refreshes,
+    }
+
+
+async def _live_user_tokens(refresh_token: str) -> int:
+    """Count unrevoked tokens of the user ``refresh_token`` was issued to."""
+
+    from sqlalchemy import func, select
+
+    from src.auth.models import RefreshToken
+    from src.auth.utils import hash_token
+    from src.core.database import AsyncSessionLocal
+
+    owner = select(RefreshToken.user_id).where(RefreshToken.token_hash == hash_token(refresh_token))
+    async with AsyncSessionLocal() as db:
+        live = await db.scalar(
+            select(func.count())
+            .select_from(RefreshToken)
+            .where(RefreshToken.user_id == owner.scalar_subquery(), RefreshToken.revoked.is_(False))
+        )
+    return int(live or 0)
+
+
+async def run_fanout(flow: RefreshFlow, counter: StatementCounter, fanout: int) -> dict[str, Any]:
+    (token,) = await _issue_tokens(1)
+    samples: list[float] = []
+    counter.reset()
+    results = await asyncio.gather(*(_timed_refresh(flow, token, samples) for _ in range(fanout)))
+    successors = {rotated for rotated in results if rotated is not None}
+    return {
+        **summarize_ms(samples),
+        "successful_responses": sum(rotated is not None for rotated in results),
+        "successor_tokens_issued": len(successors),
+        "live_tokens_after": await _live_user_tokens(token),
+        "statements": counter.statements,
+        "commits": counter.commits,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    await create_schema()
+    from src.auth.service import refresh_access_token
+
+    counter = StatementCounter()
+    counter.install()
+    flows: dict[str, RefreshFlow] = {
+        "example": example_refresh,
+        "single_transaction": refresh_access_token,
+    }
+    return {
+        name: {
+            "chains": await run_chains(flow, counter, args.clients, args.rounds),
+            "fanout": await run_fanout(flow, counter, args.fanout),
+        }
+        for name, flow in flows.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--fanout", type=int, default=10)
+    args = parser.parse_args()
+
+    configure_environment(REFRESH_TOKEN_ROTATION="true")
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
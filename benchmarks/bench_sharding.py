@@ -0,0 +1,175 @@
+"""Measure read/write throughput as storage is sharded across more databases.
+
+For each shard count in ``--shards`` the script starts a subprocess whose
+``DATABASE_SHARD_URLS`` points at that many fresh SQLite files (plus the
+directory database in ``DATABASE_URL``), seeds ``--users`` users and runs a
+mixed workload for ``--seconds``:
+
+* ``--writers`` tasks insert refresh-token rows for random users and commit,
+  as ``/login`` does;
+* ``--readers`` tasks load a user by id and count their live tokens, as
+  ``/me`` and session listing do.
+
+Every operation is routed to a single shard by the user id. SQLite serialises
+writers per file, so write throughput is where extra shards should show up.
+The script reports operations per second and latency percentiles per shard
+count, plus throughput relative to the single-shard run.
+
+Usage:
+    python -m benchmarks.bench_sharding --shards 1 2 4 --seconds 5 --writers 8 --readers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any
+
+from benchmarks._common import configure_environment, create_schema, summarize_ms
+
+
+async def _seed_users(count: int) -> list[str]:
+    from src.auth.models import User, UserDirectoryEntry
+    from src.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(
+                id=str(uuid.uuid4()),
+                email=f"user{i}@example.com",
+                username=f"user{i}",
+                hashed_password="x",
+                is_active=True,
+            )
+            for i in range(count)
+        ]
+        db.add_all(users)
+        db.add_all(
+            UserDirectoryEntry(email=u.email, username=u.username, user_id=u.id) for u in users
+        )
+        await db.commit()
+        return [user.id for user in users]
+
+
+async def _workload(args: argparse.Namespace) -> dict[str, Any]:
+    from sqlalchemy import func, select
+
+    from src.auth.models import RefreshToken, User
+    from src.auth.service import refresh_token_record
+    from src.auth.utils import create_refresh_token
+    from src.core.database import AsyncSessionLocal
+
+    await create_schema()
+    user_ids = await _seed_users(args.users)
+    rng = random.Random(0)
+    deadline = time.perf_counter() + args.seconds
+    samples: dict[str, list[float]] = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+
+    async def writer() -> None:
+        while time.perf_counter() < deadline:
+            user_id = rng.choice(user_ids)
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    refresh_token = create_refresh_token({"sub": user_id})
+                    db.add(refresh_token_record(user_id, refresh_token))
+                    await db.commit()
+            except Exception:
+                errors["write"] += 1
+            samples["write"].append(time.perf_counter() - start)
+
+    async def reader() -> None:
+        while time.perf_counter() < deadline:
+            user_id = rng.choice(user_ids)
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+                    live = (
+                        select(func.count())
+                        .select_from(RefreshToken)
+                        .where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+                    )
+                    (await db.execute(live)).scalar_one()
+            except Exception:
+                errors["read"] += 1
+            samples["read"].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(writer() for _ in range(args.writers)), *(reader() for _ in range(args.readers))
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        kind: {
+            "ops_per_sec": (len(values) - errors[kind]) / elapsed,
+            "errors": errors[kind],
+            **summarize_ms(values),
+        }
+        for kind, values in samples.items()
+    }
+
+
+def _run_shards(count: int, args: argparse.Namespace) -> dict[str, Any]:
+    """Run the workload with ``count`` shards in a subprocess and return its results."""
+
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.bench_sharding",
+        "--run",
+        str(count),
+        "--seconds",
+        str(args.seconds),
+        "--writers",
+        str(args.writers),
+        "--readers",
+        str(args.readers),
+        "--users",
+        str(args.users),
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--run", type=int, help="run a single shard count in-process")
+    args = parser.parse_args()
+
+    if args.run:
+        db_path = configure_environment()
+        urls = [
+            f"sqlite+aiosqlite:///{db_path.with_name(f'shard-{i}.db')}" for i in range(args.run)
+        ]
+        os.environ["DATABASE_SHARD_URLS"] = ",".join(urls)
+        print(json.dumps(asyncio.run(_workload(args))))
+        return
+
+    results: dict[str, Any] = {str(count): _run_shards(count, args) for count in args.shards}
+    baseline = results[str(args.shards[0])]
+    for count in args.shards:
+        for kind in ("read", "write"):
+            before = baseline[kind]["ops_per_sec"]
+            after = results[str(count)][kind]["ops_per_sec"]
+            results[str(count)][kind]["scaling"] = after / before if before else None
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
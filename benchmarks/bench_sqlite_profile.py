@@ -0,0 +1,155 @@
+"""Compare SQLite read/write throughput with and without the WAL profile.
+
+Runs a mixed workload for ``--seconds`` against a fresh SQLite file, once with
+the default engine (rollback journal, one shared pool) and once with
+``SQLITE_WAL_PROFILE`` (WAL, tuned pragmas, single writer plus reader pool):
+
+* ``--writers`` tasks insert refresh-token rows and commit, as ``/login`` does;
+* ``--readers`` tasks load users by id, as ``/me`` does on a cache miss.
+
+Each profile runs in its own subprocess because settings are read at import
+time. The script reports operations per second, latency percentiles and
+failed operations (e.g. ``database is locked``) for reads and writes.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile --seconds 5 --writers 4 --readers 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from typing import Any
+
+from benchmarks._common import configure_environment, create_schema, summarize_ms
+
+
+async def _seed_users(count: int) -> list[str]:
+    from src.auth.models import User
+    from src.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(
+                email=f"user{i}@example.com",
+                username=f"user{i}",
+                hashed_password="x",
+                is_active=True,
+            )
+            for i in range(count)
+        ]
+        db.add_all(users)
+        await db.commit()
+        return [user.id for user in users]
+
+
+async def _workload(args: argparse.Namespace) -> dict[str, Any]:
+    from sqlalchemy import select
+
+    from src.auth.models import User
+    from src.auth.service import create_tokens, refresh_token_record
+    from src.core.database import AsyncSessionLocal
+
+    await create_schema()
+    user_ids = await _seed_users(args.users)
+    deadline = time.perf_counter() + args.seconds
+    samples: dict[str, list[float]] = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+
+    async def writer(index: int) -> None:
+        i = 0
+        while time.perf_counter() < deadline:
+            user_id = user_ids[(index + i) % len(user_ids)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    user = await db.get(User, user_id)
+                    _, refresh_token = create_tokens(user)
+                    db.add(refresh_token_record(user_id, refresh_token))
+                    await db.commit()
+            except Exception:
+                errors["write"] += 1
+            samples["write"].append(time.perf_counter() - start)
+
+    async def reader(index: int) -> None:
+        i = 0
+        while time.perf_counter() < deadline:
+            user_id = user_ids[(index + i) % len(user_ids)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+            except Exception:
+                errors["read"] += 1
+            samples["read"].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(writer(i) for i in range(args.writers)), *(reader(i) for i in range(args.readers))
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        kind: {
+            "ops_per_sec": (len(values) - errors[kind]) / elapsed,
+            "errors": errors[kind],
+            **summarize_ms(values),
+        }
+        for kind, values in samples.items()
+    }
+
+
+def _run_profile(profile: str, args: argparse.Namespace) -> dict[str, Any]:
+    """Run one profile in a subprocess and return its parsed results."""
+
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.bench_sqlite_profile",
+        "--profile",
+        profile,
+        "--seconds",
+        str(args.seconds),
+        "--writers",
+        str(args.writers),
+        "--readers",
+        str(args.readers),
+        "--users",
+        str(args.users),
+    ]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--profile", choices=["default", "wal"], help="run a single profile in-process"
+    )
+    args = parser.parse_args()
+
+    if args.profile:
+        configure_environment(SQLITE_WAL_PROFILE="true" if args.profile == "wal" else "false")
+        print(json.dumps(asyncio.run(_workload(args))))
+        return
+
+    results = {profile: _run_profile(profile, args) for profile in ("default", "wal")}
+    for kind in ("read", "write"):
+        before, after = results["default"][kind]["ops_per_sec"], results["wal"][kind]["ops_per_sec"]
+        results[f"{kind}_speedup"] = after / before if before else None
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""End-to-end load test of the auth endpoints with baseline comparison.
+
+Drives a weighted mix of ``POST /register``, ``POST /login``,
+``POST /refresh`` and ``GET /me`` at a fixed concurrency and reports
+throughput and latency percentiles per endpoint. Three targets are
+supported:
+
+* ``--target asgi`` (default): ``src.app.app`` in process through httpx's
+  ASGI transport, against a throwaway SQLite file;
+* ``--target uvicorn``: the same app served by a uvicorn subprocess on a
+  local port, so HTTP parsing and the network stack are included;
+* ``--url``: an already running deployment (rate limiting must be off there).
+
+``--users`` accounts are registered and logged in before the timed run.
+Each worker owns its own accounts, so rotated refresh tokens are never
+presented twice (which reuse detection would treat as theft). Requests
+during ``--warmup`` seconds are sent but not measured, and ``--seed`` makes
+the request sequence reproducible.
+
+Results are printed and, with ``--output``, written as JSON. With
+``--baseline`` a previous output file is compared endpoint by endpoint:
+throughput more than ``--tolerance`` below the baseline, p95/p99 latency
+more than ``--tolerance`` above it, or an error rate over
+``--max-error-rate`` is a regression and the script exits with status 1.
+
+Usage:
+    python -m benchmarks.loadtest --concurrency 32 --seconds 20 --output baseline.json
+    python -m benchmarks.loadtest --concurrency 32 --seconds 20 --baseline baseline.json
+    python -m benchmarks.loadtest --target uvicorn --mix me=80,refresh=15,login=5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks._common import asgi_client, configure_environment, create_schema, summarize_ms
+
+PASSWORD = "LoadTestPassword123!"
+
+DEFAULT_MIX = "me=70,refresh=15,login=10,register=5"
+
+ENDPOINTS = ("register", "login", "refresh", "me")
+
+# Latency percentiles compared against the baseline; throughput is compared as well
+COMPARED_PERCENTILES = ("p95_ms", "p99_ms")
+
+
+@dataclass
+class Account:
+    """A registered user and its newest token pair."""
+
+    email: str
+    access_token: str = ""
+    refresh_token: str = ""
+
+
+@dataclass
+class LoadSession:
+    """Accounts shared by a run's workers and the counter naming new registrations."""
+
+    run_id: str
+    accounts: list[Account]
+    registered: int
+
+    def new_account(self) -> Account:
+        self.registered += 1
+        return Account(email=f"load-{self.run_id}-{self.registered}@example.com")
+
+
+@dataclass
+class Recorder:
+    """Latency samples and error counts per endpoint for the measured window."""
+
+    measure_from: float = 0.0
+    samples: dict[str, list[float]] = field(
+        default_factory=lambda: {name: [] for name in ENDPOINTS}
+    )
+    errors: dict[str, int] = field(default_factory=lambda: dict.fromkeys(ENDPOINTS, 0))
+
+    def add(self, endpoint: str, started: float, ok: bool) -> None:
+        if started < self.measure_from:
+            return
+        self.samples[endpoint].append(time.perf_counter() - started)
+        if not ok:
+            self.errors[endpoint] += 1
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse ``name=weight,...`` into endpoint weights.
+
+    Raises:
+        ValueError: For unknown endpoints or non-positive total weight.
+    """
+
+    mix: dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(
+                f"Unknown endpoint {name!r} in mix; expected one of {', '.join(ENDPOINTS)}"
+            )
+        mix[name] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("Mix weights must add up to more than zero")
+    return mix
+
+
+async def _login(client: httpx.AsyncClient, account: Account) -> httpx.Response:
+    response = await client.post("/login", json={"email": account.email, "password": PASSWORD})
+    if response.status_code == 200:
+        tokens = response.json()
+        account.access_token, account.refresh_token = (
+            tokens["access_token"],
+            tokens["refresh_token"],
+        )
+    return response
+
+
+async def _register(client: httpx.AsyncClient, account: Account) -> httpx.Response:
+    username = account.email.partition("@")[0]
+    return await client.post(
+        "/register", json={"email": account.email, "username": username, "password": PASSWORD}
+    )
+
+
+async def _retry_shed(call: Any) -> httpx.Response:
+    """Await ``call()`` until the service stops shedding it with 503 + Retry-After."""
+
+    while True:
+        response: httpx.Response = await call()
+        if response.status_code != 503:
+            return response
+        await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+
+
+async def setup_session(client: httpx.AsyncClient, users: int) -> LoadSession:
+    """Register and log in ``users`` accounts (not measured)."""
+
+    session = LoadSession(run_id=uuid.uuid4().hex[:8], accounts=[], registered=0)
+    semaphore = asyncio.Semaphore(4)
+
+    async def create() -> Account:
+        async with semaphore:
+            account = session.new_account()
+            (await _retry_shed(lambda: _register(client, account))).raise_for_status()
+            (await _retry_shed(lambda: _login(client, account))).raise_for_status()
+            return account
+
+    session.accounts = list(await asyncio.gather(*(create() for _ in range(users))))
+    return session
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    session: LoadSession,
+    accounts: list[Account],
+    mix: dict[str, float],
+    rng: random.Random,
+    deadline: float,
+    recorder: Recorder,
+) -> None:
+    endpoints, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        endpoint = rng.choices(endpoints, weights)[0]
+        account = rng.choice(accounts)
+        started = time.perf_counter()
+        if endpoint == "register":
+            ok = (await _register(client, session.new_account())).status_code == 201
+        elif endpoint == "login":
+            ok = (await _login(client, account)).status_code == 200
+        elif endpoint == "refresh":
+            response = await client.post("/refresh", json={"refresh_token": account.refresh_token})
+            ok = response.status_code == 200
+            if ok:
+                tokens = response.json()
+                account.access_token, account.refresh_token = (
+                    tokens["access_token"],
+                    tokens["refresh_token"],
+                )
+        else:
+            headers = {"Authorization": f"Bearer {account.access_token}"}
+            ok = (await client.get("/me", headers=headers)).status_code == 200
+        recorder.add(endpoint, started, ok)
+
+
+async def run_window(
+    client: httpx.AsyncClient,
+    session: LoadSession,
+    mix: dict[str, float],
+    concurrency: int,
+    seconds: float,
+    warmup: float = 0.0,
+    seed: int | str = 0,
+) -> dict[str, Any]:
+    """Send ``mix`` from ``concurrency`` workers for ``warmup + seconds`` and summarize.
+
+    Each worker uses its own slice of ``session.accounts``, so there must be
+    at least ``concurrency`` accounts. Only requests started after ``warmup``
+    are measured.
+
+    Returns:
+        dict[str, Any]: ``measured_seconds`` and per-endpoint (plus ``total``)
+        throughput, error counts and latency percentiles.
+    """
+
+    recorder = Recorder()
+    recorder.measure_from = time.perf_counter() + warmup
+    deadline = recorder.measure_from + seconds
+    await asyncio.gather(
+        *(
+            _worker(
+                client,
+                session,
+                session.accounts[worker::concurrency],
+                mix,
+                random.Random(f"{seed}-{worker}"),
+                deadline,
+                recorder,
+            )
+            for worker in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - recorder.measure_from
+
+    endpoints: dict[str, Any] = {}
+    for name, samples in recorder.samples.items():
+        if name not in mix:
+            continue
+        endpoints[name] = {
+            "requests_per_sec": len(samples) / elapsed,
+            "errors": recorder.errors[name],
+            "error_rate": recorder.errors[name] / len(samples) if samples else 0.0,
+            **summarize_ms(samples),
+        }
+    every_sample = [sample for samples in recorder.samples.values() for sample in samples]
+    total_errors = sum(recorder.errors.values())
+    endpoints["total"] = {
+        "requests_per_sec": len(every_sample) / elapsed,
+        "errors": total_errors,
+        "error_rate": total_errors / len(every_sample) if every_sample else 0.0,
+        **summarize_ms(every_sample),
+    }
+    return {"measured_seconds": elapsed, "endpoints": endpoints}
+
+
+async def run_load(client: httpx.AsyncClient, args: argparse.Namespace) -> dict[str, Any]:
+    """Run the configured load against ``client`` and return the results."""
+
+    session = await setup_session(client, max(args.users, args.concurrency))
+    return await run_window(
+        client, session, parse_mix(args.mix), args.concurrency, args.seconds, args.warmup, args.seed
+    )
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], tolerance: float, max_error_rate: float
+) -> list[dict[str, Any]]:
+    """Compare two result files endpoint by endpoint.
+
+    Args:
+        current (dict[str, Any]): Results of this run.
+        baseline (dict[str, Any]): Stored results to compare against.
+        tolerance (float): Allowed relative change (0.1 = 10%).
+        max_error_rate (float): Highest acceptable error rate in this run.
+
+    Returns:
+        list[dict[str, Any]]: One row per compared metric, with a ``regression`` flag.
+    """
+
+    rows = []
+    for name, now in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if before is None:
+            continue
+        metrics = [("requests_per_sec", -1)] + [(metric, 1) for metric in COMPARED_PERCENTILES]
+        for metric, worse_direction in metrics:
+            old, new = before[metric], now[metric]
+            change = (new - old) / old if old else 0.0
+            rows.append(
+                {
+                    "endpoint": name,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change,
+                    "regression": change * worse_direction > tolerance,
+                }
+            )
+        rows.append(
+            {
+                "endpoint": name,
+                "metric": "error_rate",
+                "baseline": before["error_rate"],
+                "current": now["error_rate"],
+                "change": now["error_rate"] - before["error_rate"],
+                "regression": now["error_rate"] > max_error_rate,
+            }
+        )
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+async def _wait_until_ready(
+    url: str, process: subprocess.Popen[bytes], timeout: float = 30.0
+) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError("uvicorn exited before becoming ready")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"uvicorn did not answer on {url} within {timeout:.0f}s")
+
+
+async def _run_target(args: argparse.Namespace) -> dict[str, Any]:
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    timeout = httpx.Timeout(args.request_timeout)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            return await run_load(client, args)
+
+    if args.target == "asgi":
+        from src.auth.hashing import password_hasher
+
+        await create_schema()
+        try:
+            async with asgi_client() as client:
+                return await run_load(client, args)
+        finally:
+            password_hasher.shutdown()
+
+    # The app's startup hook creates the schema on uvicorn
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "src.app:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+    ]
+    process = subprocess.Popen(command)
+    try:
+        await _wait_until_ready(url, process)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+            return await run_load(client, args)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--url", help="load an already running server instead (overrides --target)")
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})"
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20.0, help="measured duration")
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="unmeasured seconds before measuring"
+    )
+    parser.add_argument("--users", type=int, default=64, help="accounts created before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra app setting for asgi/uvicorn targets (repeatable)",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    if not args.url:
+        configure_environment(**dict(item.split("=", 1) for item in args.env))
+
+    results: dict[str, Any] = {
+        "config": {
+            "target": args.url or args.target,
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "seconds": args.seconds,
+            "warmup": args.warmup,
+            "users": args.users,
+            "seed": args.seed,
+            "env": args.env,
+        },
+        "environment": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "started_at": datetime.now(UTC).isoformat(),
+        },
+        **asyncio.run(_run_target(args)),
+    }
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get("config") != results["config"]:
+            print("warning: baseline was recorded with a different configuration", file=sys.stderr)
+        results["comparison"] = compare(results, baseline, args.tolerance, args.max_error_rate)
+        regressions = [row for row in results["comparison"] if row["regression"]]
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+    if regressions:
+        for row in regressions:
+            print(
+                f"REGRESSION {row['endpoint']} {row['metric']}: "
+                f"{row['baseline']:.4g} -> {row['current']:.4g}",
+                file=sys.stderr,
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
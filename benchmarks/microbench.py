@@ -0,0 +1,217 @@
+"""Microbenchmarks for the auth primitives, reported as ops/sec with variance.
+
+Cases (select with ``--filter``, a substring of the case name):
+
+* ``create_access_token``, ``create_refresh_token`` and ``decode_token``
+  (verified-token cache off) for each ``--algorithms`` entry;
+* ``get_password_hash`` and ``verify_password`` for each ``--bcrypt-rounds``
+  cost factor;
+* ``UserResponse.model_validate`` from a ``Principal`` (as ``/me`` does) and
+  from a ``User`` entity, and ``UserResponse``/``TokenResponse`` JSON
+  serialization.
+
+Each case is calibrated to run for at least ``--min-time`` seconds per
+repeat, then timed ``--repeats`` times; ops/sec is reported as the mean over
+repeats with its standard deviation, relative standard deviation and range.
+Compare two runs case by case and treat differences within a few RSDs as
+noise.
+
+Only HMAC algorithms are supported, as :mod:`src.auth.utils` signs and
+verifies with the single ``SECRET_KEY``.
+
+Usage:
+    python -m benchmarks.microbench
+    python -m benchmarks.microbench --filter token --algorithms HS256 HS512 --repeats 10
+    python -m benchmarks.microbench --filter password --bcrypt-rounds 10 12 14 --output micro.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import timeit
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks._common import configure_environment
+
+PASSWORD = "BenchPassword123!"
+
+HMAC_ALGORITHMS = ("HS256", "HS384", "HS512")
+
+Case = tuple[str, dict[str, Any], Callable[[], Any]]
+
+
+def measure(func: Callable[[], Any], repeats: int, min_time: float) -> dict[str, float]:
+    """Time ``func`` and summarize its throughput.
+
+    Args:
+        func (Callable[[], Any]): Operation to time.
+        repeats (int): Timed repeats after calibration.
+        min_time (float): Minimum seconds per repeat.
+
+    Returns:
+        dict[str, float]: Mean ops/sec, standard deviation, relative standard
+        deviation (percent), min/max ops/sec and calls per repeat.
+    """
+
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        # Aim just past min_time, growing at most 10x per step
+        number = max(
+            number + 1, min(number * 10, int(number * min_time * 1.2 / max(elapsed, 1e-9)))
+        )
+    rates = [number / elapsed for elapsed in timer.repeat(repeat=repeats, number=number)]
+    mean = statistics.fmean(rates)
+    stdev = statistics.stdev(rates) if len(rates) > 1 else 0.0
+    return {
+        "ops_per_sec": mean,
+        "stdev": stdev,
+        "rsd_pct": stdev / mean * 100 if mean else 0.0,
+        "min_ops_per_sec": min(rates),
+        "max_ops_per_sec": max(rates),
+        "calls_per_repeat": float(number),
+    }
+
+
+def _token_cases(algorithms: list[str]) -> Iterator[Case]:
+    from src.auth import utils
+    from src.core.config import settings
+
+    claims = {"sub": "5f0c6a3e-9a53-4a4f-a0a4-2f1f0c1d9e77", "email": "bench@example.com"}
+    for algorithm in algorithms:
+
+        def with_algorithm(
+            func: Callable[[], Any], algorithm: str = algorithm
+        ) -> Callable[[], Any]:
+            def run() -> Any:
+                settings.ALGORITHM = algorithm
+                return func()
+
+            return run
+
+        settings.ALGORITHM = algorithm
+        token = utils.create_access_token(claims)
+        params = {"algorithm": algorithm}
+        yield (
+            "create_access_token",
+            params,
+            with_algorithm(lambda: utils.create_access_token(claims)),
+        )
+        yield (
+            "create_refresh_token",
+            params,
+            with_algorithm(lambda: utils.create_refresh_token(claims)),
+        )
+        yield "decode_token", params, with_algorithm(lambda token=token: utils.decode_token(token))
+
+
+def _password_cases(rounds: list[int]) -> Iterator[Case]:
+    from passlib.context import CryptContext
+
+    from src.auth import utils
+
+    for cost in rounds:
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=cost)
+        hashed = context.hash(PASSWORD)
+
+        def with_context(
+            func: Callable[[], Any], context: CryptContext = context
+        ) -> Callable[[], Any]:
+            def run() -> Any:
+                utils.pwd_context = context
+                return func()
+
+            return run
+
+        params = {"bcrypt_rounds": cost}
+        yield "get_password_hash", params, with_context(lambda: utils.get_password_hash(PASSWORD))
+        yield (
+            "verify_password",
+            params,
+            with_context(lambda hashed=hashed: utils.verify_password(PASSWORD, hashed)),
+        )
+
+
+def _schema_cases() -> Iterator[Case]:
+    from src.auth.models import User
+    from src.auth.principal import Principal
+    from src.auth.schemas import TokenResponse, UserResponse
+
+    user = User(
+        id="5f0c6a3e-9a53-4a4f-a0a4-2f1f0c1d9e77",
+        email="bench@example.com",
+        username="benchuser",
+        hashed_password="x",
+        is_active=True,
+        created_at=datetime.now(UTC),
+    )
+    principal = Principal.from_user(user)
+    response = UserResponse.model_validate(principal)
+    tokens = TokenResponse(access_token="a" * 250, refresh_token="r" * 250, expires_in=900)
+
+    yield (
+        "UserResponse.model_validate",
+        {"source": "Principal"},
+        lambda: UserResponse.model_validate(principal),
+    )
+    yield (
+        "UserResponse.model_validate",
+        {"source": "User"},
+        lambda: UserResponse.model_validate(user),
+    )
+    yield "UserResponse.model_dump_json", {}, response.model_dump_json
+    yield "TokenResponse.model_dump_json", {}, tokens.model_dump_json
+    yield (
+        "TokenResponse.build_and_dump_json",
+        {},
+        lambda: TokenResponse(
+            access_token=tokens.access_token, refresh_token=tokens.refresh_token, expires_in=900
+        ).model_dump_json(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=HMAC_ALGORITHMS, default=list(HMAC_ALGORITHMS)
+    )
+    parser.add_argument("--bcrypt-rounds", nargs="+", type=int, default=[10, 12])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per repeat")
+    parser.add_argument("--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--output", help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    configure_environment()
+    from src.auth.utils import token_cache
+
+    # decode_token is measured without the verified-token cache (see bench_decode_token)
+    token_cache.max_size = 0
+
+    cases = [*_token_cases(args.algorithms), *_password_cases(args.bcrypt_rounds), *_schema_cases()]
+    results = [
+        {"name": name, "params": params, **measure(func, args.repeats, args.min_time)}
+        for name, params, func in cases
+        if args.filter in name
+    ]
+    output = json.dumps(
+        {"config": {"repeats": args.repeats, "min_time": args.min_time}, "results": results},
+        indent=2,
+    )
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
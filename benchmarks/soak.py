@@ -0,0 +1,296 @@
+"""Soak test: sustained mixed load with memory and latency drift checks.
+
+Runs the ``loadtest`` request mix against ``src.app.app`` in process, in
+consecutive ``--interval``-second windows, until ``--requests`` requests have
+been sent or ``--duration`` seconds have passed. After each window it runs a
+full garbage collection and samples:
+
+* RSS and ``tracemalloc`` traced/peak memory;
+* live object count (and the most common types);
+* per-endpoint throughput and latency percentiles for the window;
+* row counts and on-disk size of the ``refresh_tokens`` table and each of its
+  indexes (``dbstat`` on SQLite, ``pg_relation_size`` on PostgreSQL);
+* principal and token cache sizes.
+
+The first ``--warmup-windows`` windows let caches, pools and the allocator
+settle; the next window is the baseline. At the end the script reports the
+``tracemalloc`` allocation sites and object types that grew the most since
+the baseline, and fails (exit status 1) if:
+
+* RSS grew by more than ``--max-rss-growth-mb``;
+* traced Python memory grew by more than ``--max-traced-growth-mb``;
+* any endpoint's p95 latency over the last ``--drift-windows`` windows is more
+  than ``--max-latency-drift`` above the baseline windows' (0.5 = +50%).
+
+Usage:
+    python -m benchmarks.soak --requests 1000000 --interval 30
+    python -m benchmarks.soak --duration 600 --max-rss-growth-mb 64 --output soak.json
+    python -m benchmarks.soak --env PRINCIPAL_CACHE_TTL_SECONDS=0 --no-tracemalloc
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from benchmarks._common import asgi_client, configure_environment, create_schema
+from benchmarks.loadtest import parse_mix, run_window, setup_session
+
+DEFAULT_MIX = "me=70,refresh=25,login=4,register=1"
+
+MB = 1024 * 1024
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / MB if sys.platform == "darwin" else peak / 1024
+    return pages * os.sysconf("SC_PAGE_SIZE") / MB
+
+
+def _object_counts() -> Counter[str]:
+    return Counter(type(obj).__qualname__ for obj in gc.get_objects())
+
+
+async def _refresh_token_storage() -> dict[str, Any]:
+    """Rows and bytes used by ``refresh_tokens`` and its indexes, summed over shards."""
+
+    from sqlalchemy import text
+
+    from src.core.database import schema_engines
+
+    rows = live = 0
+    sizes: Counter[str] = Counter()
+    for engine in schema_engines():
+        async with engine.connect() as conn:
+            counts = await conn.execute(
+                text("SELECT count(*), count(*) FILTER (WHERE NOT revoked) FROM refresh_tokens")
+            )
+            total, live_rows = counts.one()
+            rows, live = rows + total, live + live_rows
+            if engine.dialect.name == "sqlite":
+                result = await conn.execute(
+                    text(
+                        "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+                        "(SELECT name FROM sqlite_master WHERE tbl_name = 'refresh_tokens') GROUP BY name"
+                    )
+                )
+            elif engine.dialect.name == "postgresql":
+                result = await conn.execute(
+                    text(
+                        "SELECT 'refresh_tokens', pg_relation_size('refresh_tokens') UNION ALL "
+                        "SELECT indexrelname, pg_relation_size(indexrelid) FROM pg_stat_user_indexes "
+                        "WHERE relname = 'refresh_tokens'"
+                    )
+                )
+            else:
+                continue
+            for name, size in result:
+                sizes[name] += int(size)
+    return {"rows": rows, "live_rows": live, "bytes": dict(sizes)}
+
+
+async def _sample(
+    window: int, result: dict[str, Any], requests: int, elapsed: float
+) -> dict[str, Any]:
+    from src.auth.principal import principal_cache
+    from src.auth.utils import token_cache
+
+    gc.collect()
+    counts = _object_counts()
+    traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    return {
+        "window": window,
+        "elapsed_seconds": elapsed,
+        "requests": requests,
+        "rss_mb": _rss_mb(),
+        "traced_mb": traced / MB,
+        "traced_peak_mb": peak / MB,
+        "objects": sum(counts.values()),
+        "top_types": dict(counts.most_common(10)),
+        "refresh_tokens": await _refresh_token_storage(),
+        "caches": {
+            "principal": principal_cache.stats()["size"],
+            "token": token_cache.stats()["size"],
+        },
+        "endpoints": {
+            name: {
+                key: stats[key]
+                for key in ("requests_per_sec", "errors", "p50_ms", "p95_ms", "p99_ms")
+            }
+            for name, stats in result["endpoints"].items()
+        },
+    }
+
+
+def _checks(samples: list[dict[str, Any]], args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Evaluate drift between the baseline windows and the last windows."""
+
+    baseline, last = samples[args.warmup_windows], samples[-1]
+    checks = [
+        {
+            "check": "rss_growth_mb",
+            "baseline": baseline["rss_mb"],
+            "current": last["rss_mb"],
+            "limit": args.max_rss_growth_mb,
+            "failed": last["rss_mb"] - baseline["rss_mb"] > args.max_rss_growth_mb,
+        }
+    ]
+    if not args.no_tracemalloc:
+        checks.append(
+            {
+                "check": "traced_growth_mb",
+                "baseline": baseline["traced_mb"],
+                "current": last["traced_mb"],
+                "limit": args.max_traced_growth_mb,
+                "failed": last["traced_mb"] - baseline["traced_mb"] > args.max_traced_growth_mb,
+            }
+        )
+    measured = samples[args.warmup_windows :]
+    first, recent = measured[: args.drift_windows], measured[-args.drift_windows :]
+    for endpoint in last["endpoints"]:
+        before = statistics.fmean(sample["endpoints"][endpoint]["p95_ms"] for sample in first)
+        after = statistics.fmean(sample["endpoints"][endpoint]["p95_ms"] for sample in recent)
+        checks.append(
+            {
+                "check": f"{endpoint}_p95_drift",
+                "baseline": before,
+                "current": after,
+                "limit": args.max_latency_drift,
+                "failed": before > 0 and (after - before) / before > args.max_latency_drift,
+            }
+        )
+    return checks
+
+
+async def _soak(args: argparse.Namespace) -> dict[str, Any]:
+    from src.auth.hashing import password_hasher
+
+    mix = parse_mix(args.mix)
+    await create_schema()
+    samples: list[dict[str, Any]] = []
+    growth: dict[str, Any] = {}
+    baseline_snapshot: tracemalloc.Snapshot | None = None
+    baseline_counts: Counter[str] = Counter()
+    try:
+        async with asgi_client() as client:
+            session = await setup_session(client, max(args.users, args.concurrency))
+            started = time.perf_counter()
+            requests = 0
+            window = 0
+            while requests < args.requests and time.perf_counter() - started < args.duration:
+                result = await run_window(
+                    client,
+                    session,
+                    mix,
+                    args.concurrency,
+                    args.interval,
+                    seed=f"{args.seed}-{window}",
+                )
+                requests += int(result["endpoints"]["total"]["count"])
+                sample = await _sample(window, result, requests, time.perf_counter() - started)
+                samples.append(sample)
+                print(
+                    f"window {window}: {requests} requests, rss {sample['rss_mb']:.1f} MB, "
+                    f"traced {sample['traced_mb']:.1f} MB, "
+                    f"p95 {result['endpoints']['total']['p95_ms']:.1f} ms",
+                    file=sys.stderr,
+                )
+                if window == args.warmup_windows:
+                    baseline_counts = _object_counts()
+                    if tracemalloc.is_tracing():
+                        baseline_snapshot = tracemalloc.take_snapshot()
+                window += 1
+    finally:
+        password_hasher.shutdown()
+
+    if len(samples) > args.warmup_windows:
+        growth["object_types"] = dict((_object_counts() - baseline_counts).most_common(15))
+        if baseline_snapshot is not None:
+            diff = tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")
+            growth["allocation_sites"] = [str(stat) for stat in diff[:15]]
+    return {"samples": samples, "growth": growth}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--requests", type=int, default=1_000_000, help="stop after this many requests"
+    )
+    parser.add_argument("--duration", type=float, default=3600.0, help="or after this many seconds")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds per sampling window")
+    parser.add_argument(
+        "--mix", default=DEFAULT_MIX, help=f"endpoint weights (default {DEFAULT_MIX})"
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup-windows", type=int, default=1)
+    parser.add_argument(
+        "--drift-windows", type=int, default=3, help="windows averaged for latency drift"
+    )
+    parser.add_argument("--max-rss-growth-mb", type=float, default=64.0)
+    parser.add_argument("--max-traced-growth-mb", type=float, default=32.0)
+    parser.add_argument("--max-latency-drift", type=float, default=0.5)
+    parser.add_argument(
+        "--no-tracemalloc", action="store_true", help="skip tracemalloc (less overhead)"
+    )
+    parser.add_argument("--tracemalloc-frames", type=int, default=1)
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="extra app setting (repeatable)",
+    )
+    parser.add_argument("--output", help="also write results to this JSON file")
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    configure_environment(**dict(item.split("=", 1) for item in args.env))
+    if not args.no_tracemalloc:
+        tracemalloc.start(args.tracemalloc_frames)
+
+    results: dict[str, Any] = {"config": {k: v for k, v in vars(args).items() if k != "output"}}
+    results.update(asyncio.run(_soak(args)))
+    samples = results["samples"]
+    if len(samples) > args.warmup_windows:
+        results["checks"] = _checks(samples, args)
+    else:
+        results["checks"] = []
+        print("warning: run ended before a baseline window; no drift checks", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+    failed = [check for check in results["checks"] if check["failed"]]
+    for check in failed:
+        print(
+            f"FAILED {check['check']}: {check['baseline']:.4g} -> {check['current']:.4g} "
+            f"(limit {check['limit']})",
+            file=sys.stderr,
+        )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,86 @@
 """Minimal FastAPI application wiring the auth router.
 
+``/`` is a public liveness check. The ``/health/*`` endpoints expose internal
+stats (queue depths, cache sizes, pool state) and, like ``/admin``, require the
+diagnostics token (see :mod:`src.core.diagnostics`).
+
 Run with:
     uvicorn src.app:app --reload
 """
 
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+from typing import Any
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 
+from src.auth.admission import hash_admission
+from src.auth.hashing import password_hasher
+from src.auth.principal import principal_cache
 from src.auth.router import router as auth_router
-from src.core.database import Base, engine
+from src.auth.sweeper import refresh_token_sweeper
+from src.auth.utils import token_cache
+from src.core.admin import router as admin_router
+from src.core.config import settings
+from src.core.database import (
+    Base,
+    engine,
+    read_engine,
+    replica_engine,
+    schema_engines,
+    shard_router,
+)
+from src.core.diagnostics import require_diagnostics_token
+from src.core.instrumentation import RequestMetricsMiddleware, registry
+from src.core.pool import pool_stats
+from src.core.profiling import ProfilingMiddleware
+from src.core.slowlog import RequestRouteMiddleware, slow_query_log
+from src.core.timing import ServerTimingMiddleware
 
 
 app = FastAPI(title="Auth Service")
 app.include_router(auth_router)
+app.include_router(admin_router)
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+if slow_query_log.enabled:
+    app.add_middleware(RequestRouteMiddleware)
+# Cheap unless a request opts in; see src.core.timing and src.core.profiling
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+
+# Operator-only internal stats
+health_router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+    dependencies=[Depends(require_diagnostics_token)],
+    include_in_schema=False,
+)
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    """Create database tables on startup (for demo/dev usage)."""
+    """Create database tables on startup (for demo/dev usage) and start the sweeper."""
+
+    for schema_engine in schema_engines():
+        async with schema_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    if settings.SWEEPER_ENABLED:
+        refresh_token_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    """Stop the refresh-token sweeper and release the password hashing worker pool.
+
+    The pool shutdown waits for running hashes, so it runs in a thread to keep
+    the event loop serving other shutdown work meanwhile.
+    """
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await refresh_token_sweeper.stop()
+    await asyncio.to_thread(password_hasher.shutdown)
 
 
 @app.get("/")
@@ -30,3 +89,58 @@ async def root() -> dict[str, str]:
 
     return {"status": "ok"}
 
+
+@health_router.get("/hashing")
+async def hashing_health() -> dict[str, int | float]:
+    """Report password-hashing queue depth and load-shedding counters."""
+
+    return {**hash_admission.stats(), "pool_pending": password_hasher.pending}
+
+
+@health_router.get("/cache")
+async def cache_health() -> dict[str, dict[str, int | float]]:
+    """Report size and hit/miss counters for in-process caches."""
+
+    return {"principal": principal_cache.stats(), "token": token_cache.stats()}
+
+
+@health_router.get("/sweeper")
+async def sweeper_health() -> dict[str, int | float]:
+    """Report refresh-token sweeper passes and rows deleted."""
+
+    return refresh_token_sweeper.stats()
+
+
+@health_router.get("/db")
+async def db_health() -> dict[str, Any]:
+    """Report connection-pool occupancy, checkout timeouts and wait/checkout latency.
+
+    Every pool reports its own counters and histograms. With the SQLite WAL
+    profile the reader pool is reported under ``reader``, and a configured read
+    replica under ``replica``. With sharded storage ``engine`` is the directory
+    database and each data shard is reported under ``shards``.
+    """
+
+    stats = pool_stats(engine.pool)
+    if read_engine is not engine:
+        stats["reader"] = pool_stats(read_engine.pool)
+    if replica_engine is not None:
+        stats["replica"] = pool_stats(replica_engine.pool)
+    if shard_router is not None:
+        stats["shards"] = {
+            shard_id: pool_stats(shard_router.engines[shard_id].pool)
+            for shard_id in shard_router.data_shards
+        }
+    return stats
+
+
+app.include_router(health_router)
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def metrics_endpoint() -> PlainTextResponse:
+        """Expose this worker's metrics in the Prometheus text format."""
+
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,162 @@
+"""Admission control for CPU-bound password hashing.
+
+A credential-stuffing burst can queue far more bcrypt work than the hashing
+pool can ever finish, starving every other request on the worker. The
+:class:`AdmissionController` caps how many hashing jobs run at once, bounds how
+many may wait, and gives each waiter a deadline. Anything over those limits is
+rejected immediately with ``503 Service Unavailable`` and a ``Retry-After``
+header instead of queueing forever.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, status
+
+from src.core.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+class AdmissionController:
+    """Bounded FIFO admission gate with a queue-time deadline.
+
+    Waiters are plain futures created on the running loop, so a controller can
+    be shared across event loops (e.g. between tests) without binding to one.
+
+    Attributes:
+        max_in_flight (int): Jobs allowed to run concurrently.
+        max_queue (int): Jobs allowed to wait for a slot.
+        queue_timeout (float): Seconds a job may wait before being rejected.
+        retry_after (int): ``Retry-After`` seconds advertised on rejection.
+        admitted (int): Total jobs admitted.
+        rejected_queue_full (int): Jobs rejected because the queue was full.
+        rejected_timeout (int): Jobs rejected after waiting ``queue_timeout``.
+        queue_wait_seconds (float): Cumulative time admitted jobs spent queued.
+    """
+
+    def __init__(
+        self, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int = 1
+    ) -> None:
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.queue_wait_seconds = 0.0
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently holding a slot."""
+
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Number of jobs currently waiting for a slot."""
+
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def _reject(self, detail: str) -> HTTPException:
+        """Build the rejection raised to the client."""
+
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def acquire(self) -> None:
+        """Wait for a slot.
+
+        Raises:
+            HTTPException: 503 with ``Retry-After`` if the queue is full or the
+                queue-time deadline passes.
+        """
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise self._reject("Server busy, please retry later")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except TimeoutError:
+            self._discard(waiter)
+            self.rejected_timeout += 1
+            raise self._reject("Server busy, please retry later") from None
+        except BaseException:
+            # Cancelled after the slot was handed over: give it back.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        self.admitted += 1
+        self.queue_wait_seconds += time.perf_counter() - started
+
+    def release(self) -> None:
+        """Release a slot, handing it directly to the oldest live waiter."""
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _discard(self, waiter: asyncio.Future[None]) -> None:
+        """Remove an abandoned waiter from the queue."""
+
+        with suppress(ValueError):
+            self._waiters.remove(waiter)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the ``async with`` block."""
+
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict[str, int | float]:
+        """Return a snapshot of queue depth and admission counters."""
+
+        return {
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queue_wait_seconds": self.queue_wait_seconds,
+        }
+
+
+# Process-wide gate in front of all password hashing on this worker
+hash_admission = AdmissionController(
+    max_in_flight=settings.HASH_MAX_IN_FLIGHT,
+    max_queue=settings.HASH_QUEUE_DEPTH,
+    queue_timeout=settings.HASH_QUEUE_TIMEOUT_SECONDS,
+    retry_after=settings.HASH_RETRY_AFTER_SECONDS,
+)
@@ -1,47 +1,82 @@
-"""FastAPI dependencies for authenticated operations."""
+"""FastAPI dependencies for authenticated operations.
+
+User lookups are read-only, so they use a
+:data:`~src.core.database.ReadSessionLocal` session (the replica, when
+configured). A user whose row was written within
+``Settings.READ_YOUR_WRITES_SECONDS`` is read from the primary instead.
+"""
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.models import User
+from src.auth.principal import Principal, load_principal
 from src.auth.utils import decode_token
-from src.core.database import get_db
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, ReadSessionLocal, get_read_db
+from src.core.instrumentation import metrics
+from src.core.replica import recent_writes
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
-    """Resolve the current authenticated user from a bearer token.
+def _access_token_payload(token: str) -> dict[str, Any]:
+    """Validate an access token and return its payload.
 
     Args:
         token (str): Bearer token provided by the client.
-        db (AsyncSession): Database session dependency.
 
     Returns:
-        User: The authenticated user entity.
+        dict[str, Any]: The verified payload, guaranteed to carry a ``sub`` claim.
 
     Raises:
-        HTTPException: If token is invalid, not an access token, or user not found.
+        HTTPException: If token is invalid, not an access token, or has no subject.
     """
 
     payload = decode_token(token)
     if payload.get("type") != "access":
+        metrics.token_failures.labels("access", "invalid").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid access token"
         )
 
     user_id = payload.get("sub")
     if not user_id:
+        metrics.token_failures.labels("access", "invalid").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token missing subject"
         )
+    return payload
+
+
+def _access_token_subject(token: str) -> str:
+    """Validate an access token and return its subject (user id)."""
+
+    return str(_access_token_payload(token)["sub"])
+
+
+async def _load_active_user(db: AsyncSession, user_id: str) -> User:
+    """Load an active user by id.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (str): User identifier.
+
+    Returns:
+        User: The user entity.
+
+    Raises:
+        HTTPException: If the user does not exist or is inactive.
+    """
 
     stmt = select(User).where(User.id == user_id)
     result = await db.execute(stmt)
@@ -52,3 +87,95 @@ async def get_current_user(
         )
     return user
 
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """Resolve the current authenticated user from a bearer token.
+
+    Always loads the ORM entity; routes that only need the user's profile
+    should depend on :func:`get_current_principal` instead. The entity comes
+    from a read-only session and must not be modified.
+
+    Args:
+        token (str): Bearer token provided by the client.
+        db (AsyncSession): Read-only database session dependency.
+
+    Returns:
+        User: The authenticated user entity.
+
+    Raises:
+        HTTPException: If token is invalid, not an access token, or user not found.
+    """
+
+    user_id = _access_token_subject(token)
+    if recent_writes.pinned(user_id):
+        async with AsyncSessionLocal() as primary:
+            return await _load_active_user(primary, user_id)
+    return await _load_active_user(db, user_id)
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Resolve the current authenticated principal, served from cache when possible.
+
+    A database session is opened only on a cache miss, and concurrent misses
+    for the same user share it and its single query.
+
+    Args:
+        token (str): Bearer token provided by the client.
+
+    Returns:
+        Principal: Snapshot of the authenticated user.
+
+    Raises:
+        HTTPException: If token is invalid, not an access token, or user not found.
+    """
+
+    return await _resolve_principal(_access_token_subject(token))
+
+
+def _read_session_factory(user_id: str) -> Callable[[], AsyncSession]:
+    """Return the session factory for reading ``user_id``'s row."""
+
+    return AsyncSessionLocal if recent_writes.pinned(user_id) else ReadSessionLocal
+
+
+async def _resolve_principal(user_id: str) -> Principal:
+    """Load an active principal through the cache, raising 401 otherwise."""
+
+    principal = await load_principal(_read_session_factory(user_id), user_id)
+    if principal is None or not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive"
+        )
+    return principal
+
+
+async def get_claims_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Resolve the current principal from access-token claims alone.
+
+    Used for ``/me`` when ``Settings.STATELESS_ME`` is enabled. Tokens whose
+    profile claims are missing or older than
+    ``Settings.PROFILE_CLAIMS_MAX_AGE_SECONDS`` fall back to the principal
+    cache, opening a database session only in that case.
+
+    Args:
+        token (str): Bearer token provided by the client.
+
+    Returns:
+        Principal: Snapshot of the authenticated user.
+
+    Raises:
+        HTTPException: If token is invalid or the user is inactive.
+    """
+
+    payload = _access_token_payload(token)
+    principal = Principal.from_claims(payload, settings.PROFILE_CLAIMS_MAX_AGE_SECONDS)
+    if principal is not None:
+        if not principal.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive"
+            )
+        return principal
+
+    return await _resolve_principal(str(payload["sub"]))
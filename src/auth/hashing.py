@@ -0,0 +1,147 @@
+"""Asynchronous password hashing backed by a bounded worker pool.
+
+Bcrypt is deliberately slow, so running it inline inside an ``async`` handler
+blocks the event loop for every concurrent request on the worker. This module
+offloads :func:`src.auth.utils.get_password_hash` and
+:func:`src.auth.utils.verify_password` to a process pool sized through
+``Settings.HASH_WORKERS``. Every job first passes the
+:data:`src.auth.admission.hash_admission` gate, which bounds the backlog and
+sheds load once it is full.
+
+The synchronous helpers in :mod:`src.auth.utils` remain the single source of
+truth for hashing and are still suitable for tests and scripts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from src.auth.admission import hash_admission
+from src.auth.utils import get_password_hash, verify_password
+from src.core.config import settings
+from src.core.instrumentation import metrics
+from src.core.timing import record_phase
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Run bcrypt work on a bounded executor instead of the event loop.
+
+    The executor is created lazily on first use so importing this module never
+    spawns processes.
+
+    Admission (how many jobs may be submitted at once) is decided by the
+    caller; see :mod:`src.auth.admission`.
+
+    Attributes:
+        workers (int): Worker process count; ``0`` uses the default thread executor.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: Executor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs submitted to the executor and not yet finished."""
+
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        """Return the underlying executor, creating it on first use."""
+
+        if self._executor is None:
+            if self.workers > 0:
+                # "spawn" avoids forking a process that already runs event-loop
+                # and database driver threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="password-hasher")
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Execute ``func(*args)`` on the hashing executor.
+
+        Args:
+            func (Callable[..., T]): Picklable top-level callable.
+            *args (Any): Positional arguments for ``func``.
+
+        Returns:
+            T: The callable's return value.
+        """
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Shut down the executor, waiting for running jobs to finish."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide hasher shared by all requests on this worker
+password_hasher = PasswordHasher(settings.HASH_WORKERS)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a plaintext password without blocking the event loop.
+
+    Args:
+        password (str): The plaintext password.
+
+    Returns:
+        str: The resulting bcrypt hash.
+
+    Raises:
+        HTTPException: 503 with ``Retry-After`` if hashing capacity is exhausted.
+    """
+
+    async with hash_admission.slot():
+        started = time.perf_counter()
+        try:
+            return await password_hasher.run(get_password_hash, password)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.password_hash_seconds.labels("hash").observe(elapsed)
+            record_phase("bcrypt", elapsed)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plaintext password against a bcrypt hash without blocking the event loop.
+
+    Args:
+        plain_password (str): The plaintext password to verify.
+        hashed_password (str): The bcrypt-hashed password for comparison.
+
+    Returns:
+        bool: True if the password matches, otherwise False.
+
+    Raises:
+        HTTPException: 503 with ``Retry-After`` if hashing capacity is exhausted.
+    """
+
+    async with hash_admission.slot():
+        started = time.perf_counter()
+        try:
+            return await password_hasher.run(verify_password, plain_password, hashed_password)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.password_hash_seconds.labels("verify").observe(elapsed)
+            record_phase("bcrypt", elapsed)
@@ -0,0 +1,343 @@
+"""Schema migrations for the authentication tables.
+
+The project has no migration framework; ``create_all`` on startup only creates
+missing tables. This module upgrades existing databases in place.
+
+Refresh-token digests:
+    Older databases store the full refresh JWT in ``refresh_tokens.token`` (a
+    ``TEXT`` column with both a unique constraint and an index) and have no
+    index on ``user_id``. :func:`migrate_refresh_token_digests` replaces each
+    token with its SHA-256 digest, in batches. On SQLite, which cannot drop a
+    column that carries a unique constraint, the table is rebuilt from the
+    current :class:`~src.auth.models.RefreshToken` definition; other databases
+    add and backfill ``token_hash`` in place and then drop ``token``, leaving
+    the new indexes to :func:`create_refresh_token_indexes`.
+
+Refresh-token families:
+    Rotation groups tokens into families via ``refresh_tokens.family_id``.
+    :func:`migrate_refresh_token_families` adds the column to databases
+    created before rotation and puts every existing token in a family of its
+    own (``family_id = id``).
+
+Refresh-token issue times:
+    :func:`migrate_refresh_token_created_at` adds ``refresh_tokens.created_at``,
+    used to revoke sessions issued before a point in time, with the model's
+    timezone-aware type (``TIMESTAMP WITH TIME ZONE`` on PostgreSQL). The issue
+    time of existing tokens is unknown, so they get :data:`LEGACY_ISSUED_AT`
+    (the epoch) and are matched by every ``issued_before`` cut-off.
+
+Refresh-token indexes:
+    :func:`create_refresh_token_indexes` adds indexes declared on the model
+    after a database was created (e.g. the ``expires_at`` index used by the
+    sweeper); ``create_all`` does not add indexes to existing tables. It also
+    drops indexes made redundant by newer ones (:data:`SUPERSEDED_INDEXES`).
+
+Run with:
+    python -m src.auth.migrations
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, cast
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Connection,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    Text,
+    insert,
+    inspect,
+    select,
+    text,
+)
+
+from src.auth.models import RefreshToken
+from src.auth.utils import hash_token
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Dialect
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+LEGACY_REFRESH_TABLE = "refresh_tokens_legacy"
+
+# Issue time recorded for tokens created before created_at existed
+LEGACY_ISSUED_AT = datetime(1970, 1, 1, tzinfo=UTC)
+
+# Old refresh_tokens indexes covered by a newer one: ix_refresh_tokens_user_id
+# is a prefix of ix_refresh_tokens_user_id_expires_at
+SUPERSEDED_INDEXES = ("ix_refresh_tokens_user_id",)
+
+# Pre-digest refresh_tokens layout, used to read rows with proper types
+_legacy_refresh_tokens = Table(
+    LEGACY_REFRESH_TABLE,
+    MetaData(),
+    Column("id", String(36), primary_key=True),
+    Column("token", Text),
+    Column("user_id", String(36)),
+    Column("expires_at", DateTime(timezone=True)),
+    Column("revoked", Boolean),
+)
+
+
+def _refresh_tokens_table() -> Table:
+    """Return the current refresh_tokens table definition."""
+
+    return cast("Table", RefreshToken.__table__)
+
+
+def _refresh_token_columns(conn: Connection) -> set[str]:
+    """Return the column names of the existing refresh_tokens table (empty if absent)."""
+
+    inspector = inspect(conn)
+    if not inspector.has_table(RefreshToken.__tablename__):
+        return set()
+    return {column["name"] for column in inspector.get_columns(RefreshToken.__tablename__)}
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    """Create model-declared refresh_tokens indexes that do not exist yet, and drop superseded ones.
+
+    Indexes over a column the table does not have yet are skipped; they are
+    created once the column migration that adds it has run.
+    """
+
+    columns = _refresh_token_columns(conn)
+    existing = {index["name"] for index in inspect(conn).get_indexes(RefreshToken.__tablename__)}
+    for index in _refresh_tokens_table().indexes:
+        if index.name not in existing and {column.name for column in index.columns} <= columns:
+            index.create(conn)
+    for name in SUPERSEDED_INDEXES:
+        if name in existing:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+
+def _backfill_refresh_tokens(conn: Connection, batch_size: int) -> int:
+    """Add, backfill and constrain token_hash in place, then drop token.
+
+    Args:
+        conn (Connection): Connection inside an open transaction.
+        batch_size (int): Rows updated per batch.
+
+    Returns:
+        int: Number of rows migrated.
+    """
+
+    table = RefreshToken.__tablename__
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN token_hash VARCHAR(64)"))
+
+    migrated = 0
+    while True:
+        rows = conn.execute(
+            text(f"SELECT id, token FROM {table} WHERE token_hash IS NULL LIMIT :limit"),
+            {"limit": batch_size},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            text(f"UPDATE {table} SET token_hash = :token_hash WHERE id = :id"),
+            [{"id": row.id, "token_hash": hash_token(row.token)} for row in rows],
+        )
+        migrated += len(rows)
+        logger.info("Migrated %d refresh tokens", migrated)
+
+    conn.execute(text(f"ALTER TABLE {table} DROP COLUMN token"))
+    conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN token_hash SET NOT NULL"))
+    conn.execute(
+        text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_token_hash_key UNIQUE (token_hash)")
+    )
+    return migrated
+
+
+def _rebuild_refresh_tokens(conn: Connection, batch_size: int) -> int:
+    """Rebuild refresh_tokens with digests in place of raw tokens (SQLite).
+
+    Args:
+        conn (Connection): Connection inside an open transaction.
+        batch_size (int): Rows copied per batch.
+
+    Returns:
+        int: Number of rows migrated.
+    """
+
+    table = _refresh_tokens_table()
+    legacy = _legacy_refresh_tokens
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {LEGACY_REFRESH_TABLE}"))
+    # Index names survive the rename; drop the old ones so the new table can reuse them.
+    for index in inspect(conn).get_indexes(LEGACY_REFRESH_TABLE):
+        conn.execute(text(f"DROP INDEX {index['name']}"))
+    table.create(conn)
+
+    migrated = 0
+    last_id = ""
+    while True:
+        rows = conn.execute(
+            select(legacy).where(legacy.c.id > last_id).order_by(legacy.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            insert(table),
+            [
+                {
+                    "id": row.id,
+                    "token_hash": hash_token(row.token),
+                    "user_id": row.user_id,
+                    "family_id": row.id,
+                    "created_at": LEGACY_ISSUED_AT,
+                    "expires_at": row.expires_at,
+                    "revoked": row.revoked,
+                }
+                for row in rows
+            ],
+        )
+        migrated += len(rows)
+        last_id = rows[-1].id
+        logger.info("Migrated %d refresh tokens", migrated)
+
+    conn.execute(text(f"DROP TABLE {LEGACY_REFRESH_TABLE}"))
+    return migrated
+
+
+async def migrate_refresh_token_digests(engine: AsyncEngine, batch_size: int = 1000) -> int:
+    """Upgrade refresh_tokens from raw-token storage to digest storage.
+
+    Safe to run repeatedly: it does nothing when the table already has a
+    ``token_hash`` column or does not exist yet. Outside SQLite, run the other
+    column migrations and then :func:`create_refresh_token_indexes` afterwards
+    to index the migrated table.
+
+    Args:
+        engine (AsyncEngine): Engine bound to the database to migrate.
+        batch_size (int): Rows copied per batch.
+
+    Returns:
+        int: Number of rows migrated (0 if nothing needed migrating).
+    """
+
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(_refresh_token_columns)
+        if "token" not in columns or "token_hash" in columns:
+            return 0
+        if conn.dialect.name == "sqlite":
+            return await conn.run_sync(_rebuild_refresh_tokens, batch_size)
+        return await conn.run_sync(_backfill_refresh_tokens, batch_size)
+
+
+def _add_family_column(conn: Connection) -> None:
+    """Add refresh_tokens.family_id and give each existing row its own family."""
+
+    table = RefreshToken.__tablename__
+    # SQLite only accepts ADD COLUMN ... NOT NULL with a default.
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN family_id VARCHAR(36) NOT NULL DEFAULT ''"))
+    conn.execute(text(f"UPDATE {table} SET family_id = id"))
+
+
+async def migrate_refresh_token_families(engine: AsyncEngine) -> bool:
+    """Add the rotation ``family_id`` column to an existing refresh_tokens table.
+
+    Safe to run repeatedly. Run :func:`create_refresh_token_indexes` afterwards
+    to index the new column.
+
+    Args:
+        engine (AsyncEngine): Engine bound to the database to migrate.
+
+    Returns:
+        bool: True if the column was added.
+    """
+
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(_refresh_token_columns)
+        if not columns or "family_id" in columns:
+            return False
+        await conn.run_sync(_add_family_column)
+        return True
+
+
+def _created_at_ddl(dialect: Dialect) -> str:
+    """Return the ``ALTER TABLE`` adding refresh_tokens.created_at on ``dialect``.
+
+    The column type is compiled from the model (``TIMESTAMP WITH TIME ZONE`` on
+    PostgreSQL). Existing rows get :data:`LEGACY_ISSUED_AT` through a constant
+    default, which keeps this valid on SQLite (it rejects ``CURRENT_TIMESTAMP``
+    here). SQLite stores naive UTC values; elsewhere the default carries its
+    offset.
+    """
+
+    column_type = _refresh_tokens_table().c.created_at.type.compile(dialect=dialect)
+    default = LEGACY_ISSUED_AT.isoformat(sep=" ")
+    if dialect.name == "sqlite":
+        default = LEGACY_ISSUED_AT.replace(tzinfo=None).isoformat(sep=" ")
+    return (
+        f"ALTER TABLE {RefreshToken.__tablename__} ADD COLUMN created_at {column_type} "
+        f"NOT NULL DEFAULT '{default}'"
+    )
+
+
+def _add_created_at_column(conn: Connection) -> None:
+    """Add refresh_tokens.created_at, stamping existing rows with LEGACY_ISSUED_AT."""
+
+    conn.execute(text(_created_at_ddl(conn.dialect)))
+
+
+async def migrate_refresh_token_created_at(engine: AsyncEngine) -> bool:
+    """Add the ``created_at`` issue-time column to an existing refresh_tokens table.
+
+    Safe to run repeatedly.
+
+    Args:
+        engine (AsyncEngine): Engine bound to the database to migrate.
+
+    Returns:
+        bool: True if the column was added.
+    """
+
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(_refresh_token_columns)
+        if not columns or "created_at" in columns:
+            return False
+        await conn.run_sync(_add_created_at_column)
+        return True
+
+
+async def create_refresh_token_indexes(engine: AsyncEngine) -> None:
+    """Create refresh_tokens indexes declared on the model but missing in the database.
+
+    Indexes listed in :data:`SUPERSEDED_INDEXES` are dropped.
+
+    Args:
+        engine (AsyncEngine): Engine bound to the database to migrate.
+    """
+
+    async with engine.begin() as conn:
+        if await conn.run_sync(_refresh_token_columns):
+            await conn.run_sync(_create_missing_indexes)
+
+
+async def _main() -> None:
+    """Run all migrations against the configured database (every shard, if sharded)."""
+
+    from src.core.database import schema_engines
+
+    for engine in schema_engines():
+        migrated = await migrate_refresh_token_digests(engine)
+        logger.info("Refresh-token digest migration complete on %s: %d rows", engine.url, migrated)
+        if await migrate_refresh_token_families(engine):
+            logger.info("Added refresh_tokens.family_id on %s", engine.url)
+        if await migrate_refresh_token_created_at(engine):
+            logger.info("Added refresh_tokens.created_at on %s", engine.url)
+        await create_refresh_token_indexes(engine)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -1,6 +1,7 @@
 """ORM models for authentication domain.
 
-Defines `User` and `RefreshToken` models using SQLAlchemy 2.0 declarative mapping.
+Defines `User`, `RefreshToken` and `UserDirectoryEntry` models using SQLAlchemy 2.0
+declarative mapping.
 """
 
 from __future__ import annotations
@@ -9,10 +10,10 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.core.database import Base
+from src.core.database import Base, shard_router
 
 
 class User(Base):
@@ -52,9 +53,17 @@ class RefreshToken(Base):
 
     Attributes:
         id (str): UUID string primary key.
-        token (str): The refresh token (JWT) value.
-        user_id (str): Associated user ID.
-        expires_at (datetime): Expiration timestamp (UTC).
+        token_hash (str): Hex SHA-256 digest of the refresh token. Only the digest is
+            stored and indexed; it is a fixed 64 characters regardless of token length.
+        user_id (str): Associated user ID. Indexed together with ``expires_at`` for
+            per-user session queries, and on its own over live tokens only (see
+            ``__table_args__``) for per-user revocation.
+        family_id (str): ID of the first token of the rotation chain this token belongs
+            to. Every token issued by rotating a refresh token shares its family, so a
+            replayed (already rotated) token can revoke the whole chain.
+        created_at (datetime): Issue timestamp (UTC), used to revoke tokens issued
+            before a point in time.
+        expires_at (datetime): Expiration timestamp (UTC), indexed for the sweeper.
         revoked (bool): Whether this token has been revoked.
         user (User | None): Related user entity.
     """
@@ -64,13 +73,58 @@ class RefreshToken(Base):
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    token: Mapped[str] = mapped_column(Text, unique=True, nullable=False, index=True)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
     user_id: Mapped[str] = mapped_column(
         String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    family_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
     revoked: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
     # Relationship
     user: Mapped[Optional[User]] = relationship(back_populates="refresh_tokens")
 
+    __table_args__ = (Index("ix_refresh_tokens_user_id_expires_at", "user_id", "expires_at"),)
+
+
+# Partial index over live tokens only: revocation filters on ``revoked IS false``,
+# and revoked rows (most of the table between sweeps) are left out of the index.
+_live_tokens = RefreshToken.revoked.is_(False)
+Index(
+    "ix_refresh_tokens_live_user_id",
+    RefreshToken.user_id,
+    postgresql_where=_live_tokens,
+    sqlite_where=_live_tokens,
+)
+
+
+class UserDirectoryEntry(Base):
+    """Email/username index used to find a user's shard when storage is sharded.
+
+    Lives on the directory (primary) database and is only populated when
+    ``DATABASE_SHARD_URLS`` is configured; user rows themselves are placed on
+    the shard owning their id.
+
+    Attributes:
+        email (str): Email address (primary key).
+        username (str): Unique username.
+        user_id (str): ID of the user row on its shard.
+    """
+
+    __tablename__ = "user_directory"
+
+    email: Mapped[str] = mapped_column(String(255), primary_key=True)
+    username: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    user_id: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
+
+
+if shard_router is not None:
+    # A user's refresh tokens are co-located with the user row.
+    shard_router.register(User, User.id)
+    shard_router.register(RefreshToken, RefreshToken.user_id)
+    shard_router.register_global(UserDirectoryEntry)
@@ -0,0 +1,193 @@
+"""Cached authenticated principal.
+
+A :class:`Principal` is an immutable snapshot of the user fields needed to
+serve authenticated requests. Principals are cached per worker in
+:data:`principal_cache` so protected routes do not hit the database on every
+request, and concurrent misses for the same user share a single query, run
+in a session of its own rather than in any one caller's session. Code
+that changes a user row must call :func:`invalidate_principal`; ORM-level
+updates and deletes of :class:`~src.auth.models.User` do so automatically,
+bulk ``UPDATE`` statements do not. The same ORM events also record the write in
+:data:`src.core.replica.recent_writes`, so that user's reads avoid a lagging
+replica for a while.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event, select
+
+from src.auth.models import User
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.replica import recent_writes
+from src.core.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Authenticated user snapshot.
+
+    Attributes:
+        id (str): User identifier.
+        email (str): Email address.
+        username (str): Username.
+        is_active (bool): Active status.
+        created_at (datetime): Creation timestamp.
+    """
+
+    id: str
+    email: str
+    username: str
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> Principal:
+        """Build a principal from a loaded user entity.
+
+        Args:
+            user (User): The user entity.
+
+        Returns:
+            Principal: Detached snapshot of the user.
+        """
+
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+    def profile_claims(self) -> dict[str, Any]:
+        """Return the profile fields as JWT claims (``sub``/``email`` excluded).
+
+        Returns:
+            dict[str, Any]: ``username``, ``is_active`` and ``created_at`` claims.
+        """
+
+        return {
+            "username": self.username,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_claims(cls, payload: dict[str, Any], max_age: float) -> Principal | None:
+        """Rebuild a principal from access-token claims.
+
+        Args:
+            payload (dict[str, Any]): Verified access-token payload.
+            max_age (float): Maximum age in seconds of the ``iat`` claim.
+
+        Returns:
+            Principal | None: The principal, or None if the token carries no
+            profile claims or they are older than ``max_age``.
+        """
+
+        issued_at = payload.get("iat")
+        if "username" not in payload or not isinstance(issued_at, (int, float)):
+            return None
+        if datetime.now(UTC).timestamp() - issued_at > max_age:
+            return None
+        try:
+            return cls(
+                id=str(payload["sub"]),
+                email=str(payload["email"]),
+                username=str(payload["username"]),
+                is_active=bool(payload["is_active"]),
+                created_at=datetime.fromisoformat(str(payload["created_at"])),
+            )
+        except (KeyError, ValueError):
+            return None
+
+
+# Process-wide principal cache keyed by user id
+principal_cache: TTLCache[str, Principal] = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+# Coalesces concurrent cache misses for the same user into one SELECT
+principal_lookups: SingleFlight[str, Principal | None] = SingleFlight()
+
+
+async def select_principal(db: AsyncSession, user_id: str) -> Principal | None:
+    """Load the principal for ``user_id`` from the database and cache it.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (str): User identifier.
+
+    Returns:
+        Principal | None: The principal, or None if no such user exists.
+    """
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+async def load_principal(
+    session_factory: Callable[[], AsyncSession], user_id: str
+) -> Principal | None:
+    """Return the principal for ``user_id``, from cache or the database.
+
+    A cache miss opens a session from ``session_factory`` for the SELECT. The
+    lookup is shared by concurrent misses for the same user, so it must not
+    run in a session that belongs to any one of them.
+
+    Args:
+        session_factory (Callable[[], AsyncSession]): Factory for the session
+            used on a cache miss.
+        user_id (str): User identifier.
+
+    Returns:
+        Principal | None: The principal, or None if no such user exists.
+    """
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    async def _select() -> Principal | None:
+        async with session_factory() as db:
+            return await select_principal(db, user_id)
+
+    return await principal_lookups.do(user_id, _select)
+
+
+def invalidate_principal(user_id: str) -> None:
+    """Drop the cached principal for a user.
+
+    Args:
+        user_id (str): Identifier of the changed user.
+    """
+
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper: Any, connection: Any, target: User) -> None:
+    """Invalidate the cached principal whenever the ORM writes a user row.
+
+    Also pins the user's reads to the primary for the read-your-writes window.
+    """
+
+    invalidate_principal(target.id)
+    recent_writes.mark(target.id)
@@ -0,0 +1,163 @@
+"""In-process token-bucket rate limiting for authentication endpoints.
+
+``/login`` and ``/register`` are checked per client IP and then per email before
+any bcrypt or database work runs, so a single attacker key cannot consume hashing
+capacity. Buckets live in a bounded LRU map: once ``max_keys`` distinct keys
+are tracked the least recently used bucket is evicted, which keeps memory flat
+even when an attacker cycles through millions of emails or addresses.
+
+Limits are per worker process; with N workers the effective limit is N times
+the configured one.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, Request, status
+
+from src.core.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by arbitrary strings with LRU eviction.
+
+    Each key starts with ``capacity`` tokens and regains ``rate`` tokens per
+    second up to ``capacity``. A hit consumes one token.
+
+    Attributes:
+        capacity (int): Maximum tokens per bucket (burst size).
+        rate (float): Tokens added per second.
+        max_keys (int): Maximum number of buckets retained.
+        evictions (int): Buckets evicted to respect ``max_keys``.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        rate: float,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = max(capacity, 1)
+        self.rate = rate
+        self.max_keys = max(max_keys, 1)
+        self.evictions = 0
+        self._clock = clock
+        # key -> [tokens, last refill timestamp]
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, key: str) -> float:
+        """Consume a token for ``key``.
+
+        Args:
+            key (str): Bucket key.
+
+        Returns:
+            float: ``0.0`` if the hit is allowed, otherwise the number of seconds
+            until a token becomes available.
+        """
+
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.capacity), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (1.0 - bucket[0]) / self.rate
+
+    def clear(self) -> None:
+        """Forget all buckets."""
+
+        self._buckets.clear()
+
+
+class RouteRateLimiter:
+    """Per-route limiter applying the same bucket policy per email and per IP.
+
+    The IP is ``request.client.host``. Behind a reverse proxy that address is
+    the proxy's unless the server is run with forwarded-header handling (e.g.
+    uvicorn's ``--proxy-headers`` with ``--forwarded-allow-ips``); otherwise
+    all clients share one IP bucket.
+
+    Attributes:
+        route (str): Route label prefixed to every bucket key.
+        enabled (bool): Whether checks are enforced.
+        buckets (TokenBucketLimiter): Shared bucket store for both key kinds.
+    """
+
+    def __init__(
+        self, route: str, per_minute: float, burst: int, max_keys: int, enabled: bool = True
+    ) -> None:
+        self.route = route
+        self.enabled = enabled
+        self.buckets = TokenBucketLimiter(capacity=burst, rate=per_minute / 60.0, max_keys=max_keys)
+
+    def check(self, request: Request, email: str) -> None:
+        """Enforce the limit for the request's client IP and the given email.
+
+        The IP bucket is checked first, and only requests it admits are
+        charged to the email bucket. A throttled IP therefore cannot probe
+        unlimited emails, nor keep a victim's email bucket drained and lock
+        that user out; a targeted email still cannot be attacked from many IPs.
+
+        Args:
+            request (Request): Incoming request (for the client address).
+            email (str): Email address from the request body.
+
+        Raises:
+            HTTPException: 429 with ``Retry-After`` if either key is exhausted.
+        """
+
+        if not self.enabled:
+            return
+
+        client_ip = request.client.host if request.client else "unknown"
+        wait = self.buckets.hit(f"{self.route}:ip:{client_ip}")
+        if wait == 0:
+            wait = self.buckets.hit(f"{self.route}:email:{email.strip().lower()}")
+        if wait > 0:
+            retry_after = math.ceil(wait) if math.isfinite(wait) else 3600
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please retry later",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+
+login_rate_limiter = RouteRateLimiter(
+    "login",
+    per_minute=settings.LOGIN_RATE_LIMIT_PER_MINUTE,
+    burst=settings.LOGIN_RATE_LIMIT_BURST,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
+register_rate_limiter = RouteRateLimiter(
+    "register",
+    per_minute=settings.REGISTER_RATE_LIMIT_PER_MINUTE,
+    burst=settings.REGISTER_RATE_LIMIT_BURST,
+    max_keys=settings.RATE_LIMIT_MAX_KEYS,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
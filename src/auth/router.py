@@ -4,74 +4,97 @@ Endpoints:
     - POST /register
     - POST /login
     - POST /refresh
+    - POST /logout
+    - POST /logout/all
     - GET /me
 """
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.dependencies import get_current_user
-from src.auth.models import RefreshToken, User
+from src.auth.dependencies import get_claims_principal, get_current_principal
+from src.auth.principal import Principal  # noqa: TC001  (FastAPI evaluates route annotations)
+from src.auth.ratelimit import login_rate_limiter, register_rate_limiter
 from src.auth.schemas import (
+    LogoutAllRequest,
+    LogoutAllResponse,
     RefreshTokenRequest,
     TokenResponse,
     UserLoginRequest,
     UserRegisterRequest,
     UserResponse,
 )
-from src.auth.service import authenticate_user, create_tokens, register_user, refresh_access_token
+from src.auth.service import (
+    authenticate_user,
+    create_tokens,
+    refresh_access_token,
+    refresh_token_record,
+    register_user,
+    revoke_refresh_token,
+    revoke_user_refresh_tokens,
+)
 from src.core.config import settings
-from src.core.database import get_db
+from src.core.database import AsyncSessionLocal, get_db
+from src.core.instrumentation import metrics
+from src.core.timing import phase
 
 
 router = APIRouter(tags=["auth"])
 
+# /me is served from token claims alone when stateless mode is enabled
+_me_principal = get_claims_principal if settings.STATELESS_ME else get_current_principal
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register_endpoint(
-    payload: UserRegisterRequest, db: AsyncSession = Depends(get_db)
+    payload: UserRegisterRequest, request: Request, db: AsyncSession = Depends(get_db)
 ) -> UserResponse:
     """Register a new user.
 
     Args:
         payload (UserRegisterRequest): Registration data.
+        request (Request): Incoming request, used for per-IP rate limiting.
         db (AsyncSession): Database session dependency.
 
     Returns:
         UserResponse: The created user data.
     """
 
+    register_rate_limiter.check(request, payload.email)
     user = await register_user(db, payload)
     return UserResponse.model_validate(user)
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login_endpoint(
-    payload: UserLoginRequest, db: AsyncSession = Depends(get_db)
+    payload: UserLoginRequest, request: Request, db: AsyncSession = Depends(get_db)
 ) -> TokenResponse:
     """Authenticate and issue tokens.
 
     Args:
         payload (UserLoginRequest): Login credentials.
+        request (Request): Incoming request, used for per-IP rate limiting.
         db (AsyncSession): Database session dependency.
 
     Returns:
         TokenResponse: Access and refresh tokens with expiry info.
     """
 
-    user = await authenticate_user(db, payload.email, payload.password)
+    login_rate_limiter.check(request, payload.email)
+    try:
+        user = await authenticate_user(db, payload.email, payload.password)
+    except HTTPException:
+        metrics.logins.labels("failure").inc()
+        raise
+    metrics.logins.labels("success").inc()
     access_token, refresh_token = create_tokens(user)
 
     # Persist refresh token for revocation tracking
-    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    db.add(
-        RefreshToken(token=refresh_token, user_id=user.id, expires_at=expires_at, revoked=False)
-    )
-    await db.commit()
+    db.add(refresh_token_record(user.id, refresh_token))
+    with phase("commit"):
+        await db.commit()
 
     return TokenResponse(
         access_token=access_token,
@@ -91,10 +114,18 @@ async def refresh_endpoint(
         db (AsyncSession): Database session dependency.
 
     Returns:
-        TokenResponse: New access token and (same) refresh token.
+        TokenResponse: New access token and the rotated (or, with rotation
+        disabled, the same) refresh token.
     """
 
-    new_access, refresh = await refresh_access_token(db, payload.refresh_token)
+    try:
+        new_access, refresh = await refresh_access_token(
+            db, payload.refresh_token, session_factory=AsyncSessionLocal
+        )
+    except HTTPException:
+        metrics.refreshes.labels("failure").inc()
+        raise
+    metrics.refreshes.labels("success").inc()
     return TokenResponse(
         access_token=new_access,
         refresh_token=refresh,
@@ -102,8 +133,48 @@ async def refresh_endpoint(
     )
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_endpoint(payload: RefreshTokenRequest, db: AsyncSession = Depends(get_db)) -> None:
+    """Revoke the session a refresh token belongs to.
+
+    Args:
+        payload (RefreshTokenRequest): Refresh token wrapper.
+        db (AsyncSession): Database session dependency.
+    """
+
+    await revoke_refresh_token(db, payload.refresh_token)
+
+
+@router.post("/logout/all", response_model=LogoutAllResponse)
+async def logout_all_endpoint(
+    payload: LogoutAllRequest | None = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> LogoutAllResponse:
+    """Revoke all of the current user's sessions ("sign out everywhere").
+
+    Args:
+        payload (LogoutAllRequest | None): Optional ``issued_before`` cut-off.
+        current_user (Principal): Authenticated user.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        LogoutAllResponse: Number of refresh tokens revoked.
+    """
+
+    issued_before = payload.issued_before if payload else None
+    revoked = await revoke_user_refresh_tokens(db, current_user.id, issued_before)
+    return LogoutAllResponse(revoked=revoked)
+
+
 @router.get("/me", response_model=UserResponse)
-async def me_endpoint(current_user: User = Depends(get_current_user)) -> UserResponse:
-    """Retrieve current authenticated user profile."""
+async def me_endpoint(
+    current_user: Principal = Depends(_me_principal),
+) -> UserResponse:
+    """Retrieve current authenticated user profile.
+
+    Served from the principal cache, or from the access token's profile claims
+    without a database session when ``Settings.STATELESS_ME`` is enabled.
+    """
 
     return UserResponse.model_validate(current_user)
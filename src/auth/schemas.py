@@ -60,6 +60,27 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutAllRequest(BaseModel):
+    """Request body for revoking all of the current user's sessions.
+
+    Attributes:
+        issued_before (datetime | None): Only revoke refresh tokens issued before this
+            instant. Revokes every session when omitted.
+    """
+
+    issued_before: datetime | None = None
+
+
+class LogoutAllResponse(BaseModel):
+    """Response body for a bulk session revocation.
+
+    Attributes:
+        revoked (int): Number of refresh tokens revoked.
+    """
+
+    revoked: int
+
+
 class UserResponse(BaseModel):
     """Response body for user metadata.
 
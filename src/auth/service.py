@@ -5,17 +5,77 @@ Provides user registration, authentication, token issuance and refresh handling.
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Tuple
+import hmac
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, NoReturn
 
 from fastapi import HTTPException, status
-from sqlalchemy import or_, select
+from sqlalchemy import ColumnElement, delete, inspect, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.models import RefreshToken, User
+from src.auth.hashing import get_password_hash_async, verify_password_async
+from src.auth.models import RefreshToken, User, UserDirectoryEntry
+from src.auth.principal import Principal, load_principal, principal_cache, select_principal
 from src.auth.schemas import UserRegisterRequest
-from src.auth.utils import create_access_token, create_refresh_token, get_password_hash, verify_password
+from src.auth.utils import (
+    create_access_token,
+    create_opaque_refresh_token,
+    create_refresh_token,
+    hash_token,
+    opaque_token_id,
+)
 from src.core.config import settings
+from src.core.instrumentation import metrics
+from src.core.replica import recent_writes
+from src.core.sharding import is_sharded
+from src.core.singleflight import SingleFlight
+from src.core.timing import phase
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class StoredRefreshToken:
+    """Session-independent snapshot of a persisted refresh token.
+
+    Attributes:
+        user_id (str): Owning user ID.
+        expires_at (datetime): Expiration timestamp (UTC).
+        revoked (bool): Whether the token has been revoked.
+    """
+
+    user_id: str
+    expires_at: datetime
+    revoked: bool
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Return ``value`` as an aware UTC datetime.
+
+    SQLite does not store offsets, so ``DateTime(timezone=True)`` columns come
+    back naive there; they are always written in UTC.
+    """
+
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING ... RETURNING
+_UPSERT_DIALECTS = frozenset({"postgresql", "sqlite"})
+
+
+# Coalesces concurrent /refresh lookups of the same token into one SELECT.
+# Rotations are deliberately not coalesced: of two concurrent rotations of one
+# token, the loser must be rejected as reuse so the family gets revoked.
+refresh_token_lookups: SingleFlight[str, StoredRefreshToken | None] = SingleFlight()
 
 
 async def register_user(db: AsyncSession, user_data: UserRegisterRequest) -> User:
@@ -32,25 +92,109 @@ async def register_user(db: AsyncSession, user_data: UserRegisterRequest) -> Use
         HTTPException: If email or username is already registered.
     """
 
-    existing_stmt = select(User).where(
-        or_(User.email == user_data.email, User.username == user_data.username)
+    already_registered = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email or username already registered",
+    )
+
+    # With sharded storage, uniqueness is enforced by the directory database.
+    sharded = is_sharded(db)
+    lookup = UserDirectoryEntry if sharded else User
+    existing_stmt = (
+        select(lookup)
+        .where(or_(lookup.email == user_data.email, lookup.username == user_data.username))
+        .limit(1)
     )
     result = await db.execute(existing_stmt)
     existing = result.scalar_one_or_none()
     if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email or username already registered",
-        )
+        raise already_registered
+
+    values: dict[str, Any] = {
+        "id": str(uuid.uuid4()),
+        "email": user_data.email,
+        "username": user_data.username,
+        "hashed_password": await get_password_hash_async(user_data.password),
+        "is_active": True,
+    }
+    if sharded:
+        return await _register_sharded_user(db, values, already_registered)
+
+    dialect = db.get_bind(inspect(User)).dialect.name
+    if dialect not in _UPSERT_DIALECTS:
+        user = User(**values)
+        db.add(user)
+        try:
+            with phase("commit"):
+                await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise already_registered from None
+        await db.refresh(user)
+        return user
+
+    # A concurrent registration can pass the check above while this one hashed
+    # the password; ON CONFLICT turns that race into an empty RETURNING rather
+    # than an IntegrityError, and RETURNING saves the refresh round trip.
+    insert = postgresql.insert(User) if dialect == "postgresql" else sqlite.insert(User)
+    stmt = insert.values(**values).on_conflict_do_nothing().returning(User)
+    created: User | None = (await db.scalars(stmt)).one_or_none()
+    if created is None:
+        await db.rollback()
+        raise already_registered
+    with phase("commit"):
+        await db.commit()
+    # Statement-level inserts skip the mapper events that pin new users' reads
+    recent_writes.mark(created.id)
+    return created
+
+
+async def _register_sharded_user(
+    db: AsyncSession, values: dict[str, Any], already_registered: HTTPException
+) -> User:
+    """Create a user on sharded storage, reserving its email and username first.
+
+    The directory entry and the user row live on different databases and are
+    committed separately. The directory entry is committed first: its unique
+    keys turn a concurrent registration of the same email or username into an
+    IntegrityError before any user row exists. If writing the user row then
+    fails, the reservation is deleted again.
+
+    Args:
+        db (AsyncSession): Sharded database session.
+        values (dict[str, Any]): Column values of the new user.
+        already_registered (HTTPException): Error raised when the email or
+            username is taken.
+
+    Returns:
+        User: The created user entity.
+
+    Raises:
+        HTTPException: If the email or username is already registered.
+    """
 
-    user = User(
-        email=user_data.email,
-        username=user_data.username,
-        hashed_password=get_password_hash(user_data.password),
-        is_active=True,
+    db.add(
+        UserDirectoryEntry(email=values["email"], username=values["username"], user_id=values["id"])
     )
+    try:
+        with phase("commit"):
+            await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise already_registered from None
+
+    user = User(**values)
     db.add(user)
-    await db.commit()
+    try:
+        with phase("commit"):
+            await db.commit()
+    except Exception:
+        await db.rollback()
+        await db.execute(
+            delete(UserDirectoryEntry).where(UserDirectoryEntry.email == values["email"])
+        )
+        await db.commit()
+        raise
     await db.refresh(user)
     return user
 
@@ -70,10 +214,21 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
         HTTPException: If credentials are invalid or user is inactive.
     """
 
-    stmt = select(User).where(User.email == email)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
-    if not user or not verify_password(password, user.hashed_password):
+    user: User | None = None
+    with phase("user_lookup"):
+        if is_sharded(db):
+            # Resolve the user's shard through the directory instead of asking every shard
+            directory_stmt = select(UserDirectoryEntry.user_id).where(
+                UserDirectoryEntry.email == email
+            )
+            user_id = (await db.execute(directory_stmt)).scalar_one_or_none()
+            if user_id is not None:
+                result = await db.execute(select(User).where(User.id == user_id))
+                user = result.scalar_one_or_none()
+        else:
+            result = await db.execute(select(User).where(User.email == email))
+            user = result.scalar_one_or_none()
+    if not user or not await verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -82,72 +237,352 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user account"
         )
+
+    # Prime the principal cache: the freshly issued access token is likely to
+    # be used right away.
+    principal_cache.set(user.id, Principal.from_user(user))
     return user
 
 
-def create_tokens(user: User) -> Tuple[str, str]:
-    """Create access and refresh JWT tokens for a user.
+def access_token_claims(user: User | Principal) -> dict[str, Any]:
+    """Build the claims embedded in an access token for a user.
 
-    Note: Persistence of refresh tokens is handled by the caller.
+    With ``Settings.STATELESS_ME`` enabled the token also carries the profile
+    claims and an ``iat`` timestamp, so ``/me`` can be served from the token.
 
     Args:
-        user (User): The user for whom to generate tokens.
+        user (User | Principal): The token subject.
+
+    Returns:
+        dict[str, Any]: Claims for :func:`src.auth.utils.create_access_token`.
+    """
+
+    claims: dict[str, Any] = {"sub": user.id, "email": user.email}
+    if settings.STATELESS_ME:
+        principal = user if isinstance(user, Principal) else Principal.from_user(user)
+        claims.update(principal.profile_claims())
+        claims["iat"] = int(datetime.now(UTC).timestamp())
+    return claims
+
+
+def create_tokens(user: User | Principal) -> tuple[str, str]:
+    """Create access and refresh tokens for a user.
+
+    The refresh token is a JWT or an opaque ``<id>.<secret>`` string depending
+    on ``Settings.REFRESH_TOKEN_FORMAT``.
+
+    Note: Persistence of refresh tokens is handled by the caller, see
+    :func:`refresh_token_record`.
+
+    Args:
+        user (User | Principal): The user for whom to generate tokens.
 
     Returns:
         Tuple[str, str]: (access_token, refresh_token)
     """
 
-    access_token = create_access_token({"sub": user.id, "email": user.email})
-    refresh_token = create_refresh_token({"sub": user.id, "email": user.email})
+    access_token = create_access_token(access_token_claims(user))
+    if settings.REFRESH_TOKEN_FORMAT == "opaque":
+        refresh_token = create_opaque_refresh_token()
+    else:
+        refresh_token = create_refresh_token({"sub": user.id, "email": user.email})
     return access_token, refresh_token
 
 
-async def refresh_access_token(db: AsyncSession, refresh_token: str) -> Tuple[str, str]:
+def refresh_token_record(
+    user_id: str, refresh_token: str, family_id: str | None = None
+) -> RefreshToken:
+    """Build the row that tracks a newly issued refresh token.
+
+    Opaque tokens use their embedded id as the row's primary key so they can
+    be found without a digest index lookup.
+
+    Args:
+        user_id (str): Owning user ID.
+        refresh_token (str): The issued refresh token (either format).
+        family_id (str | None): Rotation family of the token being replaced.
+            None starts a new family identified by this row's id.
+
+    Returns:
+        RefreshToken: Unsaved row; the caller adds and commits it.
+    """
+
+    token_id = opaque_token_id(refresh_token) or str(uuid.uuid4())
+    issued_at = datetime.now(UTC)
+    return RefreshToken(
+        id=token_id,
+        token_hash=hash_token(refresh_token),
+        user_id=user_id,
+        family_id=family_id or token_id,
+        created_at=issued_at,
+        expires_at=issued_at + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        revoked=False,
+    )
+
+
+async def _find_refresh_token(
+    db: AsyncSession, refresh_token: str, token_hash: str
+) -> RefreshToken | None:
+    """Look up the stored row for a refresh token in either format.
+
+    Opaque tokens are fetched by primary key and their digest compared in
+    constant time; JWTs are looked up through the digest index.
+
+    Args:
+        db (AsyncSession): Database session.
+        refresh_token (str): Raw refresh token.
+        token_hash (str): ``hash_token(refresh_token)``.
+
+    Returns:
+        RefreshToken | None: The stored row, or None if unknown.
+    """
+
+    token_id = opaque_token_id(refresh_token)
+    if token_id is not None:
+        row = await db.get(RefreshToken, token_id, populate_existing=True)
+        if row is None or not hmac.compare_digest(row.token_hash, token_hash):
+            return None
+        return row
+
+    stmt = (
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == token_hash)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def refresh_access_token(
+    db: AsyncSession,
+    refresh_token: str,
+    session_factory: Callable[[], AsyncSession] | None = None,
+) -> tuple[str, str]:
     """Issue a new access token using a valid refresh token.
 
-    Verifies the provided refresh token against the database for revocation and
-    expiration, then issues a new access token. For simplicity, the refresh
-    token is re-used until it expires.
+    Verifies the provided refresh token (JWT or opaque) against the database for
+    revocation and expiration, then issues a new access token. With
+    ``Settings.REFRESH_TOKEN_ROTATION`` the refresh token is replaced as well
+    (see :func:`_rotate_refresh_token`); otherwise it is re-used until it
+    expires. Without rotation and given ``session_factory``, concurrent
+    refreshes with the same token share one token lookup and one user lookup,
+    each run in a session of its own; with rotation, only one of them can
+    claim the token and the others are rejected as reuse. The user is resolved
+    through the principal cache.
 
     Args:
         db (AsyncSession): Database session.
         refresh_token (str): The refresh token.
+        session_factory (Callable[[], AsyncSession] | None): Factory for the
+            sessions shared lookups run in. Without one, lookups run in ``db``
+            and are not shared.
 
     Returns:
-        Tuple[str, str]: (access_token, refresh_token). The refresh token is unchanged.
+        tuple[str, str]: (access_token, refresh_token). The refresh token is new
+        when rotation is enabled and unchanged otherwise.
 
     Raises:
-        HTTPException: If the refresh token is invalid, revoked, or expired.
+        HTTPException: If the refresh token is invalid, revoked, reused, or expired.
     """
 
+    token_hash = hash_token(refresh_token)
+
+    if settings.REFRESH_TOKEN_ROTATION:
+        return await _rotate_refresh_token(db, refresh_token, token_hash)
+
     # Lookup refresh token in DB
-    stmt = select(RefreshToken).where(RefreshToken.token == refresh_token)
-    result = await db.execute(stmt)
-    stored = result.scalar_one_or_none()
+    if session_factory is None:
+        stored = await _stored_refresh_token(db, refresh_token, token_hash)
+    else:
+        factory = session_factory
+
+        async def _lookup() -> StoredRefreshToken | None:
+            async with factory() as session:
+                return await _stored_refresh_token(session, refresh_token, token_hash)
+
+        stored = await refresh_token_lookups.do(token_hash, _lookup)
     if not stored or stored.revoked:
+        metrics.token_failures.labels("refresh", "revoked" if stored else "invalid").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
     if stored.expires_at <= datetime.now(timezone.utc):
+        metrics.token_failures.labels("refresh", "expired").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expired"
         )
 
     # Fetch the user to embed claims
-    user_stmt = select(User).where(User.id == stored.user_id)
-    user_res = await db.execute(user_stmt)
-    user = user_res.scalar_one_or_none()
+    if session_factory is None:
+        user = principal_cache.get(stored.user_id)
+        user = user or await select_principal(db, stored.user_id)
+    else:
+        user = await load_principal(session_factory, stored.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User not found"
         )
 
-    new_access_token = create_access_token({"sub": user.id, "email": user.email})
+    new_access_token = create_access_token(access_token_claims(user))
     return new_access_token, refresh_token
 
 
+async def _stored_refresh_token(
+    db: AsyncSession, refresh_token: str, token_hash: str
+) -> StoredRefreshToken | None:
+    """Look up a refresh token and return a snapshot that outlives ``db``."""
+
+    row = await _find_refresh_token(db, refresh_token, token_hash)
+    if row is None:
+        return None
+    return StoredRefreshToken(
+        user_id=row.user_id, expires_at=_as_utc(row.expires_at), revoked=row.revoked
+    )
+
+
+async def _rotate_refresh_token(
+    db: AsyncSession, refresh_token: str, token_hash: str
+) -> tuple[str, str]:
+    """Revoke a refresh token and issue its successor in one transaction.
+
+    The presented token is claimed with a single conditional
+    ``UPDATE ... WHERE revoked = false RETURNING`` and its successor is
+    inserted into the same family, followed by one commit. If the claim
+    matches nothing, the token is looked up only to report why; a token that
+    exists but is already revoked is treated as stolen and its whole family is
+    revoked. This includes a concurrent request presenting the same token that
+    loses the claim.
+
+    Args:
+        db (AsyncSession): Database session.
+        refresh_token (str): The presented refresh token.
+        token_hash (str): ``hash_token(refresh_token)``.
+
+    Returns:
+        tuple[str, str]: (access_token, refresh_token) for the new token pair.
+
+    Raises:
+        HTTPException: If the refresh token is invalid, reused, or expired, or
+            its user no longer exists.
+    """
+
+    conditions = [
+        RefreshToken.token_hash == token_hash,
+        RefreshToken.revoked.is_(False),
+        RefreshToken.expires_at > datetime.now(UTC),
+    ]
+    token_id = opaque_token_id(refresh_token)
+    if token_id is not None:
+        conditions.append(RefreshToken.id == token_id)
+
+    with phase("token_claim"):
+        claimed = await _claim_refresh_token(db, conditions)
+    if claimed is None:
+        await _reject_refresh_token(db, refresh_token, token_hash)
+    user_id, family_id = claimed
+
+    user = principal_cache.get(user_id) or await select_principal(db, user_id)
+    if not user:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User not found")
+
+    access_token, new_refresh_token = create_tokens(user)
+    db.add(refresh_token_record(user_id, new_refresh_token, family_id=family_id))
+    with phase("commit"):
+        await db.commit()
+    return access_token, new_refresh_token
+
+
+async def _claim_refresh_token(
+    db: AsyncSession, conditions: list[ColumnElement[bool]]
+) -> tuple[str, str] | None:
+    """Atomically revoke the live refresh token matching ``conditions``.
+
+    Uses ``UPDATE ... RETURNING`` where the dialect supports it, so the claim
+    is a single statement; elsewhere the row is read first and then claimed
+    with an UPDATE that re-checks ``revoked``.
+
+    Args:
+        db (AsyncSession): Database session with an open transaction.
+        conditions (list[ColumnElement[bool]]): Filters selecting the live token.
+
+    Returns:
+        tuple[str, str] | None: (user_id, family_id) of the claimed token, or
+        None if no live token matched (or a concurrent request claimed it first).
+    """
+
+    stmt = (
+        update(RefreshToken)
+        .where(*conditions)
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind(inspect(RefreshToken)).dialect.update_returning:
+        result = await db.execute(stmt.returning(RefreshToken.user_id, RefreshToken.family_id))
+        row = result.one_or_none()
+        return None if row is None else (row.user_id, row.family_id)
+
+    select_stmt = select(RefreshToken.id, RefreshToken.user_id, RefreshToken.family_id)
+    found = (await db.execute(select_stmt.where(*conditions))).one_or_none()
+    if found is None:
+        return None
+    updated = await db.execute(stmt.where(RefreshToken.id == found.id))
+    if getattr(updated, "rowcount", 0) != 1:
+        return None
+    return found.user_id, found.family_id
+
+
+async def _reject_refresh_token(db: AsyncSession, refresh_token: str, token_hash: str) -> NoReturn:
+    """Raise the appropriate 401 for a refresh token that could not be claimed.
+
+    If the token had already been revoked while its family still has a live
+    token, it was rotated before and is being replayed: the whole family is
+    revoked and reuse is reported.
+
+    Raises:
+        HTTPException: Always.
+    """
+
+    stored = await _find_refresh_token(db, refresh_token, token_hash)
+    if stored is not None and stored.revoked:
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == stored.family_id, RefreshToken.revoked.is_(False))
+            .values(revoked=True)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if not getattr(result, "rowcount", 0):
+            # The whole session was already revoked (e.g. logged out); nothing was reused.
+            metrics.token_failures.labels("refresh", "revoked").inc()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+            )
+        logger.warning(
+            "Refresh token reuse detected for user %s; revoked family %s",
+            stored.user_id,
+            stored.family_id,
+        )
+        metrics.token_failures.labels("refresh", "reuse").inc()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token reuse detected"
+        )
+    if stored is not None and _as_utc(stored.expires_at) <= datetime.now(UTC):
+        metrics.token_failures.labels("refresh", "expired").inc()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expired"
+        )
+    metrics.token_failures.labels("refresh", "invalid").inc()
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+
 async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
-    """Revoke a specific refresh token.
+    """Revoke the session a refresh token belongs to.
+
+    Revokes every token in the presented token's rotation family, so the
+    session cannot be resumed with an older or newer token from the same
+    login. This is a single ``UPDATE`` keyed by a subquery on the token digest;
+    no rows are loaded.
 
     Args:
         db (AsyncSession): Database session.
@@ -157,14 +592,49 @@ async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
         HTTPException: If token not found.
     """
 
-    stmt = select(RefreshToken).where(RefreshToken.token == token)
-    result = await db.execute(stmt)
-    stored = result.scalar_one_or_none()
-    if not stored:
+    family = select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_token(token))
+    token_id = opaque_token_id(token)
+    if token_id is not None:
+        family = family.where(RefreshToken.id == token_id)
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family.scalar_subquery())
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if not getattr(result, "rowcount", 0):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Refresh token not found"
         )
-    stored.revoked = True
-    db.add(stored)
-    await db.commit()
 
+
+async def revoke_user_refresh_tokens(
+    db: AsyncSession, user_id: str, issued_before: datetime | None = None
+) -> int:
+    """Revoke all of a user's live refresh tokens with one bulk ``UPDATE``.
+
+    The statement is driven by the ``user_id`` index and loads no rows, so its
+    cost does not depend on how many sessions the user has open.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (str): User whose sessions to revoke.
+        issued_before (datetime | None): Only revoke tokens issued before this
+            instant (naive values are taken as UTC). None revokes every token.
+
+    Returns:
+        int: Number of tokens revoked.
+    """
+
+    stmt = (
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    if issued_before is not None:
+        stmt = stmt.where(RefreshToken.created_at < _as_utc(issued_before))
+    result = await db.execute(stmt)
+    await db.commit()
+    return int(getattr(result, "rowcount", 0))
@@ -0,0 +1,164 @@
+"""Background cleanup of the refresh_tokens table.
+
+Every login inserts a refresh-token row and nothing else ever removes one, so
+:class:`RefreshTokenSweeper` periodically deletes rows that can no longer be
+used: tokens that expired more than ``Settings.SWEEPER_RETENTION_HOURS`` ago,
+and revoked tokens whose rotation family has no live token left. Revoked
+tokens of a live family are kept until they expire, because presenting one
+again is how refresh-token reuse is detected. Rows are deleted in small batches,
+each in its own short transaction, with a pause between batches so the sweep
+never holds a long write lock (SQLite allows only one writer at a time).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy import and_, delete, exists, or_, select
+from sqlalchemy.orm import aliased
+
+from src.auth.models import RefreshToken
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenSweeper:
+    """Periodically delete expired and revoked refresh tokens in batches.
+
+    Attributes:
+        interval (float): Seconds between passes.
+        batch_size (int): Maximum rows deleted per transaction.
+        batch_pause (float): Seconds slept between batches within a pass.
+        retention (timedelta): How long expired rows are kept past expiry.
+        passes (int): Completed passes.
+        last_deleted (int): Rows deleted by the most recent pass.
+        total_deleted (int): Rows deleted since start-up.
+        last_duration (float): Wall time of the most recent pass in seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        interval: float,
+        batch_size: int,
+        batch_pause: float,
+        retention_hours: float,
+    ) -> None:
+        self.interval = interval
+        self.batch_size = max(batch_size, 1)
+        self.batch_pause = batch_pause
+        self.retention = timedelta(hours=retention_hours)
+        self.passes = 0
+        self.last_deleted = 0
+        self.total_deleted = 0
+        self.last_duration = 0.0
+        self._session_factory = session_factory
+        self._task: asyncio.Task[None] | None = None
+
+    async def _delete_batch(self, now: datetime) -> int:
+        """Delete up to ``batch_size`` sweepable rows in one transaction."""
+
+        live = aliased(RefreshToken)
+        family_is_live = exists().where(
+            live.family_id == RefreshToken.family_id,
+            live.revoked.is_(False),
+            live.expires_at > now,
+        )
+        sweepable = or_(
+            RefreshToken.expires_at < now - self.retention,
+            and_(RefreshToken.revoked.is_(True), ~family_is_live),
+        )
+        async with self._session_factory() as db:
+            ids = (
+                (await db.execute(select(RefreshToken.id).where(sweepable).limit(self.batch_size)))
+                .scalars()
+                .all()
+            )
+            if not ids:
+                return 0
+            await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+            await db.commit()
+            return len(ids)
+
+    async def sweep_once(self) -> int:
+        """Run one pass, deleting batches until none are left.
+
+        Returns:
+            int: Number of rows deleted by this pass.
+        """
+
+        started = time.perf_counter()
+        now = datetime.now(UTC)
+        deleted = 0
+        while True:
+            count = await self._delete_batch(now)
+            deleted += count
+            if count < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        self.passes += 1
+        self.last_deleted = deleted
+        self.total_deleted += deleted
+        self.last_duration = time.perf_counter() - started
+        logger.info("Refresh-token sweep deleted %d rows in %.3fs", deleted, self.last_duration)
+        return deleted
+
+    async def _run(self) -> None:
+        """Sweep forever, logging (not propagating) failed passes."""
+
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception:
+                logger.exception("Refresh-token sweep failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the periodic sweep on the running event loop (idempotent)."""
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the periodic sweep and wait for it to finish."""
+
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    def stats(self) -> dict[str, int | float]:
+        """Return pass and deletion counters."""
+
+        return {
+            "running": int(self._task is not None and not self._task.done()),
+            "passes": self.passes,
+            "last_deleted": self.last_deleted,
+            "total_deleted": self.total_deleted,
+            "last_duration_seconds": self.last_duration,
+        }
+
+
+# Process-wide sweeper, started from the application start-up hook
+refresh_token_sweeper = RefreshTokenSweeper(
+    AsyncSessionLocal,
+    interval=settings.SWEEPER_INTERVAL_SECONDS,
+    batch_size=settings.SWEEPER_BATCH_SIZE,
+    batch_pause=settings.SWEEPER_BATCH_PAUSE_SECONDS,
+    retention_hours=settings.SWEEPER_RETENTION_HOURS,
+)
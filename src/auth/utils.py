@@ -5,18 +5,31 @@ Includes password hashing/verification and JWT creation/decoding helpers.
 
 from __future__ import annotations
 
+import hashlib
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
+from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 
+from src.core.cache import TTLCache
 from src.core.config import settings
+from src.core.instrumentation import metrics
+from src.core.timing import record_phase
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Opt-in cache of verified payloads keyed by SHA-256 of the raw token. Entries
+# expire no later than the token's own ``exp`` claim.
+token_cache: TTLCache[bytes, dict[str, Any]] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=0
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plaintext password against a bcrypt hash.
@@ -59,6 +72,17 @@ def _expire_time(delta: Optional[timedelta]) -> datetime:
     return now + (delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
 
 
+def _encode_jwt(claims: dict[str, Any]) -> str:
+    """Sign ``claims`` with the configured key and algorithm, recording the time taken."""
+
+    started = time.perf_counter()
+    encoded_jwt = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    elapsed = time.perf_counter() - started
+    metrics.jwt_seconds.labels("encode").observe(elapsed)
+    record_phase("jwt", elapsed)
+    return encoded_jwt
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a signed JWT access token.
 
@@ -73,8 +97,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     to_encode = data.copy()
     expire = _expire_time(expires_delta)
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    return _encode_jwt(to_encode)
 
 
 def create_refresh_token(
@@ -82,6 +105,9 @@ def create_refresh_token(
 ) -> str:
     """Create a signed JWT refresh token.
 
+    Each token carries a random ``jti`` claim so that two tokens issued to the
+    same user within the same second are still distinct.
+
     Args:
         data (Dict[str, Any]): Base claims to include in the token payload.
         expires_delta (Optional[timedelta]): Optional lifetime; defaults to configured days.
@@ -93,14 +119,61 @@ def create_refresh_token(
     to_encode = data.copy()
     default_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     expire = datetime.now(timezone.utc) + (expires_delta or default_delta)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
+    return _encode_jwt(to_encode)
+
+
+def create_opaque_refresh_token() -> str:
+    """Create an opaque refresh token of the form ``<id>.<secret>``.
+
+    ``id`` is a UUID used as the stored row's primary key and ``secret`` is 32
+    random bytes (URL-safe base64). Only the token's digest is persisted.
+
+    Returns:
+        str: The opaque token string.
+    """
+
+    return f"{uuid.uuid4()}.{secrets.token_urlsafe(32)}"
+
+
+def opaque_token_id(token: str) -> str | None:
+    """Extract the row id from an opaque refresh token.
+
+    Args:
+        token (str): A refresh token in either format.
+
+    Returns:
+        str | None: The id part for opaque tokens, or None for JWTs and
+        malformed values.
+    """
+
+    token_id, sep, secret = token.partition(".")
+    if not sep or not secret or "." in secret or len(token_id) != 36:
+        return None
+    return token_id
+
+
+def hash_token(token: str) -> str:
+    """Compute the SHA-256 digest under which a refresh token is stored.
+
+    Args:
+        token (str): Raw token string.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest (64 characters).
+    """
+
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
 def decode_token(token: str) -> Dict[str, Any]:
     """Decode and validate a JWT token.
 
+    When ``Settings.TOKEN_CACHE_MAX_SIZE`` is non-zero, payloads of valid
+    tokens are cached until their ``exp`` claim so repeated presentations of
+    the same bearer token skip signature verification. Invalid tokens are
+    never cached.
+
     Args:
         token (str): Encoded JWT string.
 
@@ -111,12 +184,34 @@ def decode_token(token: str) -> Dict[str, Any]:
         HTTPException: If token is invalid or expired.
     """
 
+    cache_key: bytes | None = None
+    if token_cache.enabled:
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+        cached = token_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+    started = time.perf_counter()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
+    except ExpiredSignatureError:
+        metrics.token_failures.labels("access", "expired").inc()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        ) from None
     except JWTError:
+        metrics.token_failures.labels("access", "invalid").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         ) from None
-
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.jwt_seconds.labels("decode").observe(elapsed)
+        record_phase("jwt", elapsed)
+
+    exp = payload.get("exp")
+    if cache_key is not None and isinstance(exp, (int, float)):
+        token_cache.set(cache_key, dict(payload), ttl=exp - time.time())
+    return payload
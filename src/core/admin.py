@@ -0,0 +1,128 @@
+"""Operator-only diagnostics API.
+
+Every route requires the ``X-Diagnostics-Token`` header (see
+:mod:`src.core.diagnostics`) and is left out of the OpenAPI schema.
+
+Endpoints:
+    - GET /admin/slow-queries
+    - DELETE /admin/slow-queries
+    - POST /admin/profile
+    - GET /admin/profiles
+    - GET /admin/profiles/{profile_id}
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from src.core.config import settings
+from src.core.diagnostics import require_diagnostics_token
+from src.core.profiling import PROFILE_FORMATS, CapturedProfile, profile_recorder
+from src.core.slowlog import slow_query_log
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_diagnostics_token)],
+    include_in_schema=False,
+)
+
+
+@router.get("/slow-queries")
+async def slow_queries_endpoint(
+    route: str | None = Query(default=None, description="Only statements from this route template"),
+    limit: int = Query(default=100, ge=1, le=1000),
+) -> dict[str, Any]:
+    """List this worker's slow statements, newest first, with their query plans."""
+
+    return {
+        "enabled": slow_query_log.enabled,
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "queries": [asdict(record) for record in slow_query_log.records(route, limit)],
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries_endpoint() -> None:
+    """Clear this worker's slow-query log and cached plans."""
+
+    slow_query_log.clear()
+
+
+def _profile_response(profile: CapturedProfile, output: str | None, limit: int = 50) -> Response:
+    """Render ``profile`` as a download (pstats) or plain text.
+
+    Raises:
+        HTTPException: 400 if the profile cannot be rendered as ``output``.
+    """
+
+    try:
+        body = profile.render(output, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from None
+    headers = {"X-Profile-Id": profile.id}
+    if (output or PROFILE_FORMATS[profile.mode][0]) == "pstats":
+        headers["Content-Disposition"] = f'attachment; filename="profile-{profile.id}.pstats"'
+        return Response(body, media_type="application/octet-stream", headers=headers)
+    return Response(body, media_type="text/plain; charset=utf-8", headers=headers)
+
+
+@router.post("/profile")
+async def profile_window_endpoint(
+    mode: Literal["cprofile", "sample"] = "sample",
+    seconds: float = Query(default=5.0, gt=0, le=settings.PROFILING_MAX_SECONDS),
+    interval_ms: float = Query(default=5.0, gt=0, le=1000, description="Sampling interval"),
+    output: str | None = Query(default=None, alias="format"),
+) -> Response:
+    """Profile this worker for ``seconds`` and return the profile.
+
+    Raises:
+        HTTPException: 400 for a format the mode cannot produce, 409 if a
+            profile is already running.
+    """
+
+    if output is not None and output not in PROFILE_FORMATS[mode]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{mode} profiles are available as {', '.join(PROFILE_FORMATS[mode])}",
+        )
+    active = profile_recorder.start(mode, interval_ms / 1000)
+    if active is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="A profile is already running"
+        )
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = profile_recorder.finish(active)
+    return _profile_response(profile, output)
+
+
+@router.get("/profiles")
+async def profiles_endpoint() -> list[dict[str, Any]]:
+    """List this worker's kept profiles, newest first."""
+
+    return [profile.summary() for profile in profile_recorder.profiles()]
+
+
+@router.get("/profiles/{profile_id}")
+async def profile_endpoint(
+    profile_id: str,
+    output: str | None = Query(default=None, alias="format"),
+    limit: int = Query(default=50, ge=1, le=1000, description="Functions listed in text output"),
+) -> Response:
+    """Return a kept profile as pstats, text or collapsed stacks.
+
+    Raises:
+        HTTPException: 404 if the profile is unknown or was dropped, 400 for
+            a format its mode cannot produce.
+    """
+
+    profile = profile_recorder.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return _profile_response(profile, output, limit)
@@ -0,0 +1,123 @@
+"""Bounded in-process TTL/LRU cache.
+
+Provides a small dictionary-backed cache used for hot read paths that can
+tolerate briefly stale data. Entries expire after a per-cache default TTL (or
+a per-entry override) and the least recently used entry is evicted once
+``max_size`` is reached. Hit, miss and eviction counters are kept so callers
+can expose them.
+
+The cache is not thread-safe; it is meant to be used from a single event loop.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """LRU cache whose entries also expire after a time-to-live.
+
+    A ``max_size`` of ``0`` disables the cache: lookups always miss and writes
+    are ignored.
+
+    Attributes:
+        max_size (int): Maximum number of entries retained.
+        ttl (float): Default entry lifetime in seconds.
+        hits (int): Lookups served from the cache.
+        misses (int): Lookups that found no live entry.
+        evictions (int): Entries dropped to respect ``max_size``.
+    """
+
+    def __init__(
+        self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_size = max(max_size, 0)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        # key -> (expires_at, value)
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+
+        return self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """Return the live value for ``key`` or None.
+
+        Args:
+            key (K): Cache key.
+
+        Returns:
+            V | None: Cached value, or None on a miss or expired entry.
+        """
+
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store ``value`` under ``key``.
+
+        Args:
+            key (K): Cache key.
+            value (V): Value to cache.
+            ttl (float | None): Lifetime override in seconds; defaults to ``self.ttl``.
+        """
+
+        if not self.enabled:
+            return
+        lifetime = self.ttl if ttl is None else ttl
+        if lifetime <= 0:
+            return
+        self._data[key] = (self._clock() + lifetime, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Drop ``key`` if present."""
+
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int | float]:
+        """Return size and hit/miss counters."""
+
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -12,6 +12,23 @@ import os
 from dataclasses import dataclass
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment.
+
+    Args:
+        name (str): Environment variable name.
+        default (bool): Value used when the variable is unset.
+
+    Returns:
+        bool: True for "1", "true", "yes" or "on" (case-insensitive).
+    """
+
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 @dataclass(slots=True)
 class Settings:
     """Settings container for JWT configuration.
@@ -22,12 +39,152 @@ class Settings:
         ALGORITHM (str): JWT signing algorithm. Defaults to "HS256".
         ACCESS_TOKEN_EXPIRE_MINUTES (int): Access token lifetime in minutes.
         REFRESH_TOKEN_EXPIRE_DAYS (int): Refresh token lifetime in days.
+        HASH_WORKERS (int): Number of worker processes used for bcrypt hashing and
+            verification. ``0`` runs hashing on the default thread executor instead.
+        HASH_QUEUE_DEPTH (int): Maximum number of hashing jobs allowed to wait for
+            admission before new jobs are rejected.
+        HASH_MAX_IN_FLIGHT (int): Maximum number of hashing jobs admitted at once.
+            Defaults to the number of hashing workers.
+        HASH_QUEUE_TIMEOUT_SECONDS (float): Longest time a hashing job may wait for
+            admission before it is rejected.
+        HASH_RETRY_AFTER_SECONDS (int): ``Retry-After`` value sent with rejections.
+        RATE_LIMIT_ENABLED (bool): Whether per-email/per-IP rate limiting is applied to
+            ``/login`` and ``/register``.
+        RATE_LIMIT_MAX_KEYS (int): Maximum number of rate-limit buckets kept per route;
+            least recently used keys are evicted beyond this.
+        LOGIN_RATE_LIMIT_PER_MINUTE (float): Sustained ``/login`` attempts allowed per
+            email and per client IP.
+        LOGIN_RATE_LIMIT_BURST (int): Bucket capacity for ``/login``, i.e. attempts
+            allowed back to back.
+        REGISTER_RATE_LIMIT_PER_MINUTE (float): Sustained ``/register`` attempts allowed
+            per email and per client IP.
+        REGISTER_RATE_LIMIT_BURST (int): Bucket capacity for ``/register``.
+        PRINCIPAL_CACHE_TTL_SECONDS (float): How long a resolved user principal is
+            served from memory before it is re-read from the database.
+        PRINCIPAL_CACHE_MAX_SIZE (int): Maximum number of cached principals per worker.
+            ``0`` disables the cache.
+        TOKEN_CACHE_MAX_SIZE (int): Maximum number of verified token payloads cached by
+            ``decode_token``. ``0`` (the default) disables the cache.
+        STATELESS_ME (bool): Embed profile claims (username, is_active, created_at) in
+            access tokens and serve ``/me`` from those claims without a database
+            session.
+        PROFILE_CLAIMS_MAX_AGE_SECONDS (int): Staleness bound for profile claims: tokens
+            issued longer ago than this are resolved through the principal
+            cache/database instead.
+        REFRESH_TOKEN_FORMAT (str): Format of newly issued refresh tokens: ``"jwt"``
+            (signed JWT) or ``"opaque"`` (``<id>.<secret>``, looked up by primary key).
+            Both formats are always accepted by ``/refresh``.
+        SWEEPER_ENABLED (bool): Whether the background task that deletes expired and
+            revoked refresh tokens runs in the app process.
+        SWEEPER_INTERVAL_SECONDS (float): Pause between sweeper passes.
+        SWEEPER_BATCH_SIZE (int): Maximum rows deleted per statement (and per
+            transaction).
+        SWEEPER_BATCH_PAUSE_SECONDS (float): Sleep between batches within a pass, so
+            other writers can take the lock.
+        SWEEPER_RETENTION_HOURS (float): How long expired refresh tokens are kept past
+            their expiry before deletion.
+        REFRESH_TOKEN_ROTATION (bool): Issue a new refresh token on every ``/refresh``
+            and revoke the presented one. Presenting an already rotated token revokes
+            its whole family. When disabled, refresh tokens are reused until they
+            expire.
+        DB_POOL_SIZE (int): Connections kept open in the engine's pool. Size it to the
+            number of requests one worker serves concurrently; total connections are
+            roughly workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+        DB_MAX_OVERFLOW (int): Extra connections opened beyond ``DB_POOL_SIZE`` under
+            load and closed when returned.
+        DB_POOL_TIMEOUT_SECONDS (float): Longest time a request waits for a pooled
+            connection before failing.
+        DB_POOL_PRE_PING (bool): Test connections on checkout and transparently replace
+            dead ones.
+        DB_POOL_RECYCLE_SECONDS (int): Replace connections older than this on checkout;
+            ``-1`` never recycles.
+        SQLITE_WAL_PROFILE (bool): For file-backed SQLite, enable WAL with tuned pragmas
+            and route reads to a pool of read-only connections while writes go through a
+            single writer connection.
+        SQLITE_BUSY_TIMEOUT_MS (int): How long a connection waits on SQLite's lock
+            before failing (WAL profile).
+        SQLITE_CACHE_SIZE_KIB (int): Page cache per connection in KiB (WAL profile).
+        SQLITE_MMAP_SIZE_BYTES (int): Bytes of the database file memory-mapped per
+            connection (WAL profile).
+        SQLITE_READER_POOL_SIZE (int): Read-only connections in the reader pool (WAL
+            profile).
+        READ_YOUR_WRITES_SECONDS (float): After a user's row is written, reads for that
+            user go to the primary instead of the replica (``DATABASE_REPLICA_URL``) for
+            this long. Should exceed the replica's usual lag; ``0`` disables pinning.
+        PG_STATEMENT_CACHE_SIZE (int): Prepared statements cached per asyncpg connection
+            (PostgreSQL profile). Set to 0 behind PgBouncer in transaction pooling mode.
+        PG_JIT (bool): Leave PostgreSQL's JIT compiler enabled for the service's
+            sessions. The service runs short indexed queries, for which JIT compilation
+            only adds latency.
+        METRICS_ENABLED (bool): Serve ``/metrics`` (Prometheus text format) and record
+            per-route request latency.
+        SERVER_TIMING_ENABLED (bool): Add a ``Server-Timing`` header with a per-phase
+            latency breakdown (bcrypt, database, JWT, commit) to every response. Without
+            it the header is only added to requests carrying a valid diagnostics token.
+        DIAGNOSTICS_TOKEN (str): Shared secret that clients present in the
+            ``X-Diagnostics-Token`` header to turn on per-request diagnostics. Empty
+            (the default) disables the header.
+        SLOW_QUERY_THRESHOLD_MS (float): Statements slower than this many milliseconds
+            are recorded in the slow-query log, with their query plan. ``0`` disables
+            the log.
+        SLOW_QUERY_LOG_SIZE (int): Slow-query records kept per worker; the oldest are
+            dropped first.
+        PROFILING_MAX_SECONDS (float): Longest window ``POST /admin/profile`` may
+            profile a worker for.
+        PROFILING_HISTORY_SIZE (int): Per-request profiles kept per worker for
+            ``GET /admin/profiles/{id}``; the oldest are dropped first.
+        STRICT_LAZY_LOADING (bool): Make relationship lazy loads that would emit SQL
+            raise instead (see ``src.core.querybudget``). For development and tests.
     """
 
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    HASH_WORKERS: int = 2
+    HASH_QUEUE_DEPTH: int = 64
+    HASH_MAX_IN_FLIGHT: int = 2
+    HASH_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    HASH_RETRY_AFTER_SECONDS: int = 1
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    LOGIN_RATE_LIMIT_PER_MINUTE: float = 10.0
+    LOGIN_RATE_LIMIT_BURST: int = 5
+    REGISTER_RATE_LIMIT_PER_MINUTE: float = 5.0
+    REGISTER_RATE_LIMIT_BURST: int = 5
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    TOKEN_CACHE_MAX_SIZE: int = 0
+    STATELESS_ME: bool = False
+    PROFILE_CLAIMS_MAX_AGE_SECONDS: int = 300
+    REFRESH_TOKEN_FORMAT: str = "jwt"
+    SWEEPER_ENABLED: bool = True
+    SWEEPER_INTERVAL_SECONDS: float = 300.0
+    SWEEPER_BATCH_SIZE: int = 500
+    SWEEPER_BATCH_PAUSE_SECONDS: float = 0.05
+    SWEEPER_RETENTION_HOURS: float = 24.0
+    REFRESH_TOKEN_ROTATION: bool = True
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_RECYCLE_SECONDS: int = -1
+    SQLITE_WAL_PROFILE: bool = False
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KIB: int = 65536
+    SQLITE_MMAP_SIZE_BYTES: int = 268435456
+    SQLITE_READER_POOL_SIZE: int = 8
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    PG_STATEMENT_CACHE_SIZE: int = 100
+    PG_JIT: bool = False
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = False
+    DIAGNOSTICS_TOKEN: str = ""
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_LOG_SIZE: int = 256
+    PROFILING_MAX_SECONDS: float = 30.0
+    PROFILING_HISTORY_SIZE: int = 16
+    STRICT_LAZY_LOADING: bool = False
 
     @staticmethod
     def load() -> "Settings":
@@ -37,7 +194,8 @@ class Settings:
             Settings: Loaded settings instance.
 
         Raises:
-            ValueError: If SECRET_KEY is not defined in environment.
+            ValueError: If SECRET_KEY is not defined in environment or
+                REFRESH_TOKEN_FORMAT is not a supported format.
         """
 
         # Default to a development key if not provided; strongly recommend overriding
@@ -47,12 +205,102 @@ class Settings:
         algorithm = os.getenv("JWT_ALGORITHM", "HS256")
         access_minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
         refresh_days = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+        hash_workers = int(os.getenv("HASH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+        hash_queue_depth = int(os.getenv("HASH_QUEUE_DEPTH", "64"))
+        hash_max_in_flight = int(os.getenv("HASH_MAX_IN_FLIGHT", str(max(hash_workers, 1))))
+        hash_queue_timeout = float(os.getenv("HASH_QUEUE_TIMEOUT_SECONDS", "2.0"))
+        hash_retry_after = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+        rate_limit_enabled = _env_bool("RATE_LIMIT_ENABLED", True)
+        rate_limit_max_keys = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+        login_rate_limit_per_minute = float(os.getenv("LOGIN_RATE_LIMIT_PER_MINUTE", "10"))
+        login_rate_limit_burst = int(os.getenv("LOGIN_RATE_LIMIT_BURST", "5"))
+        register_rate_limit_per_minute = float(os.getenv("REGISTER_RATE_LIMIT_PER_MINUTE", "5"))
+        register_rate_limit_burst = int(os.getenv("REGISTER_RATE_LIMIT_BURST", "5"))
+        principal_cache_ttl_seconds = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+        principal_cache_max_size = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+        token_cache_max_size = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "0"))
+        stateless_me = _env_bool("STATELESS_ME", False)
+        profile_claims_max_age_seconds = int(os.getenv("PROFILE_CLAIMS_MAX_AGE_SECONDS", "300"))
+        refresh_token_format = os.getenv("REFRESH_TOKEN_FORMAT", "jwt").lower()
+        if refresh_token_format not in {"jwt", "opaque"}:
+            raise ValueError("REFRESH_TOKEN_FORMAT must be 'jwt' or 'opaque'")
+        sweeper_enabled = _env_bool("SWEEPER_ENABLED", True)
+        sweeper_interval_seconds = float(os.getenv("SWEEPER_INTERVAL_SECONDS", "300"))
+        sweeper_batch_size = int(os.getenv("SWEEPER_BATCH_SIZE", "500"))
+        sweeper_batch_pause_seconds = float(os.getenv("SWEEPER_BATCH_PAUSE_SECONDS", "0.05"))
+        sweeper_retention_hours = float(os.getenv("SWEEPER_RETENTION_HOURS", "24"))
+        refresh_token_rotation = _env_bool("REFRESH_TOKEN_ROTATION", True)
+        db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+        db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        db_pool_timeout_seconds = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+        db_pool_pre_ping = _env_bool("DB_POOL_PRE_PING", False)
+        db_pool_recycle_seconds = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "-1"))
+        sqlite_wal_profile = _env_bool("SQLITE_WAL_PROFILE", False)
+        sqlite_busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        sqlite_cache_size_kib = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+        sqlite_mmap_size_bytes = int(os.getenv("SQLITE_MMAP_SIZE_BYTES", "268435456"))
+        sqlite_reader_pool_size = int(os.getenv("SQLITE_READER_POOL_SIZE", "8"))
+        read_your_writes_seconds = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+        pg_statement_cache_size = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "100"))
+        pg_jit = _env_bool("PG_JIT", False)
+        metrics_enabled = _env_bool("METRICS_ENABLED", True)
+        server_timing_enabled = _env_bool("SERVER_TIMING_ENABLED", False)
+        diagnostics_token = os.getenv("DIAGNOSTICS_TOKEN", "")
+        slow_query_threshold_ms = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+        slow_query_log_size = int(os.getenv("SLOW_QUERY_LOG_SIZE", "256"))
+        profiling_max_seconds = float(os.getenv("PROFILING_MAX_SECONDS", "30"))
+        profiling_history_size = int(os.getenv("PROFILING_HISTORY_SIZE", "16"))
+        strict_lazy_loading = _env_bool("STRICT_LAZY_LOADING", False)
 
         return Settings(
             SECRET_KEY=secret,
             ALGORITHM=algorithm,
             ACCESS_TOKEN_EXPIRE_MINUTES=access_minutes,
             REFRESH_TOKEN_EXPIRE_DAYS=refresh_days,
+            HASH_WORKERS=hash_workers,
+            HASH_QUEUE_DEPTH=hash_queue_depth,
+            HASH_MAX_IN_FLIGHT=hash_max_in_flight,
+            HASH_QUEUE_TIMEOUT_SECONDS=hash_queue_timeout,
+            HASH_RETRY_AFTER_SECONDS=hash_retry_after,
+            RATE_LIMIT_ENABLED=rate_limit_enabled,
+            RATE_LIMIT_MAX_KEYS=rate_limit_max_keys,
+            LOGIN_RATE_LIMIT_PER_MINUTE=login_rate_limit_per_minute,
+            LOGIN_RATE_LIMIT_BURST=login_rate_limit_burst,
+            REGISTER_RATE_LIMIT_PER_MINUTE=register_rate_limit_per_minute,
+            REGISTER_RATE_LIMIT_BURST=register_rate_limit_burst,
+            PRINCIPAL_CACHE_TTL_SECONDS=principal_cache_ttl_seconds,
+            PRINCIPAL_CACHE_MAX_SIZE=principal_cache_max_size,
+            TOKEN_CACHE_MAX_SIZE=token_cache_max_size,
+            STATELESS_ME=stateless_me,
+            PROFILE_CLAIMS_MAX_AGE_SECONDS=profile_claims_max_age_seconds,
+            REFRESH_TOKEN_FORMAT=refresh_token_format,
+            SWEEPER_ENABLED=sweeper_enabled,
+            SWEEPER_INTERVAL_SECONDS=sweeper_interval_seconds,
+            SWEEPER_BATCH_SIZE=sweeper_batch_size,
+            SWEEPER_BATCH_PAUSE_SECONDS=sweeper_batch_pause_seconds,
+            SWEEPER_RETENTION_HOURS=sweeper_retention_hours,
+            REFRESH_TOKEN_ROTATION=refresh_token_rotation,
+            DB_POOL_SIZE=db_pool_size,
+            DB_MAX_OVERFLOW=db_max_overflow,
+            DB_POOL_TIMEOUT_SECONDS=db_pool_timeout_seconds,
+            DB_POOL_PRE_PING=db_pool_pre_ping,
+            DB_POOL_RECYCLE_SECONDS=db_pool_recycle_seconds,
+            SQLITE_WAL_PROFILE=sqlite_wal_profile,
+            SQLITE_BUSY_TIMEOUT_MS=sqlite_busy_timeout_ms,
+            SQLITE_CACHE_SIZE_KIB=sqlite_cache_size_kib,
+            SQLITE_MMAP_SIZE_BYTES=sqlite_mmap_size_bytes,
+            SQLITE_READER_POOL_SIZE=sqlite_reader_pool_size,
+            READ_YOUR_WRITES_SECONDS=read_your_writes_seconds,
+            PG_STATEMENT_CACHE_SIZE=pg_statement_cache_size,
+            PG_JIT=pg_jit,
+            METRICS_ENABLED=metrics_enabled,
+            SERVER_TIMING_ENABLED=server_timing_enabled,
+            DIAGNOSTICS_TOKEN=diagnostics_token,
+            SLOW_QUERY_THRESHOLD_MS=slow_query_threshold_ms,
+            SLOW_QUERY_LOG_SIZE=slow_query_log_size,
+            PROFILING_MAX_SECONDS=profiling_max_seconds,
+            PROFILING_HISTORY_SIZE=profiling_history_size,
+            STRICT_LAZY_LOADING=strict_lazy_loading,
         )
 
 
@@ -1,17 +1,52 @@
 """Database configuration and session management using SQLAlchemy async.
 
 This module sets up an async SQLAlchemy engine and session factory, and provides
-FastAPI-compatible dependencies for obtaining a database session.
+FastAPI-compatible dependencies for obtaining a database session. The engine's
+connection pool is sized from :mod:`src.core.config` and instrumented by
+:class:`src.core.pool.InstrumentedAsyncPool`.
+
+With ``Settings.SQLITE_WAL_PROFILE`` and a file-backed SQLite database,
+``engine`` is a single-connection writer and ``read_engine`` a pool of
+read-only connections; sessions route between them (see :mod:`src.core.sqlite`).
+Otherwise ``read_engine`` is ``engine``.
+
+``postgresql+asyncpg://`` URLs get the PostgreSQL profile's connection
+arguments (see :mod:`src.core.postgres`).
+
+Read-only paths can use :func:`get_read_db` instead of :func:`get_db`. It is
+backed by ``DATABASE_REPLICA_URL`` when set, and by the primary otherwise.
+
+With ``DATABASE_SHARD_URLS`` set, sessions are sharded by :data:`shard_router`:
+user-owned rows go to one of those databases by consistent hash of the user
+id, and ``engine`` (``DATABASE_URL``) holds only the email directory. Models
+register their shard keys in :mod:`src.auth.models`.
+
+Every engine is instrumented for ``/metrics``, feeds the slow-query log
+(:mod:`src.core.slowlog`) and counts statements for query budgets
+(:mod:`src.core.querybudget`).
 """
 
 from __future__ import annotations
 
 import os
-from typing import AsyncGenerator
+from typing import TYPE_CHECKING, Any
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
+from src.core import querybudget
+from src.core.config import settings
+from src.core.instrumentation import instrument_engine
+from src.core.pool import InstrumentedAsyncPool
+from src.core.postgres import asyncpg_connect_args, uses_asyncpg
+from src.core.sharding import ShardRouter
+from src.core.slowlog import slow_query_log
+from src.core.sqlite import install_sqlite_pragmas, routing_session_class
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
 
 class Base(DeclarativeBase):
     """Declarative base for ORM models."""
@@ -29,20 +64,167 @@ def _get_database_url() -> str:
     return os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./app.db")
 
 
+def _get_replica_url() -> str | None:
+    """Resolve the optional read-replica URL from environment.
+
+    Returns:
+        str | None: The replica URL, or None to read from the primary.
+    """
+
+    return os.getenv("DATABASE_REPLICA_URL") or None
+
+
+def _get_shard_urls() -> list[str]:
+    """Resolve the comma-separated data-shard URLs from environment.
+
+    Returns:
+        list[str]: Shard URLs in shard order; empty when storage is not sharded.
+    """
+
+    return [url.strip() for url in os.getenv("DATABASE_SHARD_URLS", "").split(",") if url.strip()]
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    """Whether ``url`` names an in-memory SQLite database."""
+
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def _uses_sqlite_profile(url: str) -> bool:
+    """Whether the WAL reader/writer profile applies to ``url``."""
+
+    return (
+        settings.SQLITE_WAL_PROFILE
+        and make_url(url).get_backend_name() == "sqlite"
+        and not _is_memory_sqlite(url)
+    )
+
+
+def _engine_options(url: str) -> dict[str, Any]:
+    """Build connection-pool options for ``url`` from settings.
+
+    In-memory SQLite databases live inside a single connection, so SQLAlchemy
+    keeps its default single-connection pool for them and no pool options apply.
+    asyncpg URLs also get the PostgreSQL profile's ``connect_args``.
+
+    Args:
+        url (str): Database URL.
+
+    Returns:
+        dict[str, Any]: Keyword arguments for ``create_async_engine``.
+    """
+
+    if _is_memory_sqlite(url):
+        return {}
+    options: dict[str, Any] = {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if uses_asyncpg(url):
+        options["connect_args"] = asyncpg_connect_args()
+    return options
+
+
 DATABASE_URL: str = _get_database_url()
 
-# Create async engine
-engine: AsyncEngine = create_async_engine(DATABASE_URL, echo=False, future=True)
+if _uses_sqlite_profile(DATABASE_URL):
+    # One writer connection; the pool serializes in-process writes.
+    engine: AsyncEngine = create_async_engine(
+        DATABASE_URL,
+        echo=False,
+        future=True,
+        **{**_engine_options(DATABASE_URL), "pool_size": 1, "max_overflow": 0},
+    )
+    read_engine: AsyncEngine = create_async_engine(
+        DATABASE_URL,
+        echo=False,
+        future=True,
+        **{
+            **_engine_options(DATABASE_URL),
+            "pool_size": settings.SQLITE_READER_POOL_SIZE,
+            "max_overflow": 0,
+        },
+    )
+    install_sqlite_pragmas(engine)
+    install_sqlite_pragmas(read_engine, query_only=True)
+    _session_options: dict[str, Any] = {
+        "sync_session_class": routing_session_class(engine, read_engine)
+    }
+else:
+    engine = create_async_engine(
+        DATABASE_URL, echo=False, future=True, **_engine_options(DATABASE_URL)
+    )
+    read_engine = engine
+    _session_options = {"bind": engine}
+
+DATABASE_SHARD_URLS: list[str] = _get_shard_urls()
+
+shard_router: ShardRouter | None = None
+if DATABASE_SHARD_URLS:
+    shard_router = ShardRouter(
+        engine,
+        {
+            f"shard-{index}": create_async_engine(
+                url, echo=False, future=True, **_engine_options(url)
+            )
+            for index, url in enumerate(DATABASE_SHARD_URLS)
+        },
+    )
+    _session_options = shard_router.session_options()
 
 # Async session factory
 AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
     expire_on_commit=False,
     autoflush=False,
     autocommit=False,
     class_=AsyncSession,
+    **_session_options,
 )
 
+DATABASE_REPLICA_URL: str | None = _get_replica_url()
+if DATABASE_REPLICA_URL and shard_router is not None:
+    raise ValueError("DATABASE_REPLICA_URL cannot be combined with DATABASE_SHARD_URLS")
+
+if DATABASE_REPLICA_URL:
+    replica_engine: AsyncEngine | None = create_async_engine(
+        DATABASE_REPLICA_URL, echo=False, future=True, **_engine_options(DATABASE_REPLICA_URL)
+    )
+    # Read-only session factory for replica reads
+    ReadSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        expire_on_commit=False,
+        autoflush=False,
+        autocommit=False,
+        class_=AsyncSession,
+    )
+else:
+    replica_engine = None
+    ReadSessionLocal = AsyncSessionLocal
+
+
+def schema_engines() -> list[AsyncEngine]:
+    """Return every engine whose database holds application tables.
+
+    Returns:
+        list[AsyncEngine]: ``engine`` followed by the data shards, if sharded.
+    """
+
+    if shard_router is None:
+        return [engine]
+    return list(shard_router.engines.values())
+
+
+# Statement latency, the slow-query log and query budgets, on every engine the service uses
+for _engine in {*schema_engines(), read_engine, *([replica_engine] if replica_engine else [])}:
+    instrument_engine(_engine.sync_engine)
+    slow_query_log.install(_engine.sync_engine)
+    querybudget.install(_engine.sync_engine)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency that yields an async database session.
@@ -57,3 +239,20 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency that yields a session for read-only work.
+
+    The session reads from the replica when ``DATABASE_REPLICA_URL`` is set and
+    may lag behind the primary; callers that must see a recent write should
+    check :data:`src.core.replica.recent_writes` and use the primary instead.
+
+    Yields:
+        AsyncSession: An async session that must not be used for writes.
+    """
+
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,61 @@
+"""Trust check for on-demand, per-request diagnostics.
+
+Clients that know ``Settings.DIAGNOSTICS_TOKEN`` can send it in the
+:data:`DIAGNOSTICS_HEADER` request header to opt a single request into
+diagnostics that are too costly or too revealing to run for everyone (such as
+the ``Server-Timing`` breakdown of :mod:`src.core.timing`), and to reach the
+``/admin`` and ``/health`` endpoints guarded by
+:func:`require_diagnostics_token`.
+"""
+
+from __future__ import annotations
+
+import hmac
+from typing import TYPE_CHECKING
+
+from fastapi import Header, HTTPException, status
+
+from src.core.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+DIAGNOSTICS_HEADER = "X-Diagnostics-Token"
+
+_HEADER_KEY = DIAGNOSTICS_HEADER.lower().encode("latin-1")
+
+
+def is_trusted_token(token: str | None) -> bool:
+    """Whether ``token`` matches the configured diagnostics token.
+
+    Always False while ``Settings.DIAGNOSTICS_TOKEN`` is empty.
+    """
+
+    expected = settings.DIAGNOSTICS_TOKEN
+    if not expected or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+def has_diagnostics_token(headers: Iterable[tuple[bytes, bytes]]) -> bool:
+    """Whether raw ASGI ``headers`` carry a valid diagnostics token."""
+
+    for key, value in headers:
+        if key == _HEADER_KEY:
+            return is_trusted_token(value.decode("latin-1"))
+    return False
+
+
+def require_diagnostics_token(
+    token: str | None = Header(default=None, alias=DIAGNOSTICS_HEADER),
+) -> None:
+    """FastAPI dependency rejecting requests without a valid diagnostics token.
+
+    Raises:
+        HTTPException: 403 if the header is missing or wrong, or no token is configured.
+    """
+
+    if not is_trusted_token(token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Valid diagnostics token required"
+        )
@@ -0,0 +1,155 @@
+"""Process-wide metrics for the service's hot paths, exposed at ``/metrics``.
+
+:data:`metrics` holds every family recorded by the application:
+
+* per-route request latency and request counts, via
+  :class:`RequestMetricsMiddleware`;
+* bcrypt, JWT encode/decode and database statement latency;
+* login, refresh and token-failure counters.
+
+The connection pool's checkout wait histogram (:data:`src.core.pool.pool_metrics`)
+is exposed from the same :data:`registry`. Routes are labelled with their
+path template (``/me``), never the raw path, so label cardinality stays bounded.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from src.core.metrics import Registry
+from src.core.pool import pool_metrics
+from src.core.timing import record_phase
+
+_STATEMENT_KINDS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+_QUERY_STARTS = "metrics_query_starts"
+
+
+class AppMetrics:
+    """Metric families recorded by the application.
+
+    Attributes:
+        request_seconds: ``http_request_duration_seconds{method, route}``.
+        requests: ``http_requests_total{method, route, status}``.
+        password_hash_seconds: ``auth_password_hash_seconds{operation}``, bcrypt
+            jobs from submission to result (``hash`` or ``verify``).
+        jwt_seconds: ``auth_jwt_seconds{operation}`` (``encode`` or ``decode``).
+        db_execute_seconds: ``db_execute_seconds{statement}`` per cursor execution.
+        logins: ``auth_logins_total{outcome}``.
+        refreshes: ``auth_refreshes_total{outcome}``.
+        token_failures: ``auth_token_failures_total{token, reason}``.
+    """
+
+    def __init__(self, registry: Registry) -> None:
+        self.request_seconds = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+        )
+        self.requests = registry.counter(
+            "http_requests_total",
+            "HTTP requests by route and status.",
+            ("method", "route", "status"),
+        )
+        self.password_hash_seconds = registry.histogram(
+            "auth_password_hash_seconds", "Bcrypt hash/verify job latency.", ("operation",)
+        )
+        self.jwt_seconds = registry.histogram(
+            "auth_jwt_seconds", "JWT encode/decode latency.", ("operation",)
+        )
+        self.db_execute_seconds = registry.histogram(
+            "db_execute_seconds", "Database statement execution latency.", ("statement",)
+        )
+        self.logins = registry.counter(
+            "auth_logins_total", "Login attempts by outcome.", ("outcome",)
+        )
+        self.refreshes = registry.counter(
+            "auth_refreshes_total", "Token refresh attempts by outcome.", ("outcome",)
+        )
+        self.token_failures = registry.counter(
+            "auth_token_failures_total", "Rejected tokens by kind and reason.", ("token", "reason")
+        )
+
+
+# Process-wide registry rendered by /metrics
+registry = Registry()
+metrics = AppMetrics(registry)
+
+registry.expose(
+    "db_pool_wait_seconds", "Time waiting for a pooled connection.", "histogram", pool_metrics.wait
+)
+registry.expose(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after the pool timeout.",
+    "counter",
+    lambda: pool_metrics.timeouts,
+)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording latency and status per route template.
+
+    Requests that match no route are labelled ``route="unmatched"``.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            metrics.request_seconds.labels(method, route).observe(time.perf_counter() - started)
+            metrics.requests.labels(method, route, str(status)).inc()
+
+
+def statement_kind(statement: str) -> str:
+    """Return the leading SQL keyword of ``statement`` (or ``OTHER``)."""
+
+    words = statement.split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in _STATEMENT_KINDS else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record ``db_execute_seconds`` and the ``db`` timing phase for statements on ``engine``.
+
+    Args:
+        engine (Engine): Sync engine (``AsyncEngine.sync_engine``) to instrument.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        conn.info.setdefault(_QUERY_STARTS, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        elapsed = time.perf_counter() - conn.info[_QUERY_STARTS].pop()
+        metrics.db_execute_seconds.labels(statement_kind(statement)).observe(elapsed)
+        record_phase("db", elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context: Any) -> None:
+        # after_cursor_execute does not fire for failed statements
+        starts = (
+            context.connection.info.get(_QUERY_STARTS) if context.connection is not None else None
+        )
+        if context.statement is not None and starts:
+            starts.pop()
@@ -0,0 +1,268 @@
+"""In-process metric primitives.
+
+A :class:`Histogram` records observations into fixed cumulative buckets (the
+Prometheus layout), so recording is O(number of buckets) with no allocation
+and snapshots can be taken at any time without locking the event loop.
+
+:class:`Registry` groups counters and histograms into labelled families and
+renders them in the Prometheus text exposition format. Metrics are plain
+attributes updated from the event-loop thread, so recording takes no locks;
+each worker process keeps its own registry and is scraped separately.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Callable, Iterator, Sequence
+from typing import Generic, TypeVar
+
+# Latency buckets in seconds, from 100 microseconds to 10 seconds
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values.
+
+    Attributes:
+        buckets (tuple[float, ...]): Sorted upper bounds; an implicit ``+Inf``
+            bucket follows the last one.
+        count (int): Number of observations.
+        sum (float): Sum of observed values.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.count = 0
+        self.sum = 0.0
+        # Per-bucket (non-cumulative) counts; the final slot is +Inf
+        self._counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return ``(upper_bound, observations <= upper_bound)`` pairs, ending with +Inf."""
+
+        pairs = []
+        running = 0
+        for bound, count in zip((*self.buckets, float("inf")), self._counts, strict=True):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0-1) as the upper bound of its bucket.
+
+        Returns:
+            float: The bucket bound, ``inf`` if it falls past the last bucket,
+            or 0.0 with no observations.
+        """
+
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, running in self.cumulative():
+            if running >= rank:
+                return bound
+        return float("inf")
+
+    def reset(self) -> None:
+        """Drop all observations."""
+
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def stats(self) -> dict[str, float | dict[str, int]]:
+        """Return count, sum, mean, approximate p50/p99 and cumulative bucket counts."""
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else repr(bound)): running
+                for bound, running in self.cumulative()
+            },
+        }
+
+
+class Counter:
+    """Monotonically increasing value.
+
+    Attributes:
+        value (float): Current total.
+    """
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add ``amount`` (default 1) to the counter."""
+
+        self.value += amount
+
+    def reset(self) -> None:
+        """Set the counter back to zero."""
+
+        self.value = 0.0
+
+
+M = TypeVar("M", Counter, Histogram)
+
+# A metric exposed by the registry: a recorder, or a callable read at scrape time
+Exposed = Counter | Histogram | Callable[[], float]
+
+
+class MetricFamily(Generic[M]):
+    """A named metric with one child per combination of label values.
+
+    Attributes:
+        name (str): Metric name.
+        help (str): Help text.
+        labelnames (tuple[str, ...]): Label names, in order.
+    """
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str], factory: Callable[[], M]
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._factory: Callable[[], M] = factory
+        self._children: dict[tuple[str, ...], M] = {}
+
+    def labels(self, *values: str) -> M:
+        """Return the child for ``values`` (one per label name), creating it on first use."""
+
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._factory()
+        return child
+
+    def children(self) -> Iterator[tuple[dict[str, str], M]]:
+        """Yield ``(labels, child)`` pairs."""
+
+        for values, child in list(self._children.items()):
+            yield dict(zip(self.labelnames, values, strict=True)), child
+
+    def reset(self) -> None:
+        """Drop every child."""
+
+        self._children.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Registry:
+    """Collection of metrics rendered together by :meth:`render`."""
+
+    def __init__(self) -> None:
+        self._families: dict[str, tuple[str, MetricFamily[Counter] | MetricFamily[Histogram]]] = {}
+        self._exposed: dict[str, tuple[str, str, Exposed]] = {}
+
+    def counter(
+        self, name: str, help: str, labelnames: Sequence[str] = ()
+    ) -> MetricFamily[Counter]:
+        """Create a counter family (name conventionally ends in ``_total``)."""
+
+        family: MetricFamily[Counter] = MetricFamily(name, help, labelnames, Counter)
+        self._families[name] = ("counter", family)
+        return family
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> MetricFamily[Histogram]:
+        """Create a histogram family with the given bucket bounds."""
+
+        family: MetricFamily[Histogram] = MetricFamily(
+            name, help, labelnames, lambda: Histogram(buckets)
+        )
+        self._families[name] = ("histogram", family)
+        return family
+
+    def expose(self, name: str, help: str, kind: str, metric: Exposed) -> None:
+        """Render an existing unlabelled metric, e.g. one owned by another module.
+
+        Args:
+            name (str): Metric name.
+            help (str): Help text.
+            kind (str): ``"counter"``, ``"gauge"`` or ``"histogram"``.
+            metric (Exposed): A :class:`Counter` or :class:`Histogram`, or a
+                callable returning the current value.
+        """
+
+        self._exposed[name] = (kind, help, metric)
+
+    def reset(self) -> None:
+        """Drop all recorded values of the families created here."""
+
+        for _, family in self._families.values():
+            family.reset()
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format (0.0.4)."""
+
+        lines: list[str] = []
+        for name, (kind, family) in self._families.items():
+            lines += [f"# HELP {name} {family.help}", f"# TYPE {name} {kind}"]
+            for labels, child in family.children():
+                lines += _render_sample(name, labels, child)
+        for name, (kind, help, metric) in self._exposed.items():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines += _render_sample(name, {}, metric)
+        return "\n".join(lines) + "\n"
+
+
+def _render_sample(name: str, labels: dict[str, str], metric: Exposed) -> list[str]:
+    if isinstance(metric, Histogram):
+        lines = [
+            f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {running}"
+            for bound, running in metric.cumulative()
+        ]
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(metric.sum)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+        return lines
+    value = metric.value if isinstance(metric, Counter) else metric()
+    return [f"{name}{_format_labels(labels)} {_format_value(value)}"]
@@ -0,0 +1,121 @@
+"""Instrumented connection pool for the async engine.
+
+:class:`InstrumentedAsyncPool` is SQLAlchemy's ``AsyncAdaptedQueuePool`` with
+timing around connection checkout, so pool exhaustion shows up as growing
+wait times (and timeout counts) before it turns into request failures.
+Each pool records its telemetry in its own :class:`PoolMetrics`, reported by
+:func:`pool_stats`, and in :data:`pool_metrics`, the process-wide total that
+the Prometheus metrics export.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, cast
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection
+
+from src.core.metrics import Histogram
+
+
+class PoolMetrics:
+    """Checkout counters and latency histograms.
+
+    Attributes:
+        checkouts (int): Successful connection checkouts.
+        timeouts (int): Checkouts that gave up after the pool timeout.
+        wait (Histogram): Seconds spent waiting for a pooled connection slot,
+            including opening a new connection when the pool may grow.
+        checkout (Histogram): Seconds for a complete checkout, which also
+            covers pre-ping and reset of the connection.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait = Histogram()
+        self.checkout = Histogram()
+
+    def reset(self) -> None:
+        """Drop all recorded telemetry."""
+
+        self.checkouts = self.timeouts = 0
+        self.wait.reset()
+        self.checkout.reset()
+
+
+# Process-wide pool telemetry, summed over every pool
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records checkout wait and latency.
+
+    Attributes:
+        metrics (PoolMetrics): Telemetry of this pool alone. It is kept when
+            the engine recreates the pool (e.g. on ``dispose()``).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> InstrumentedAsyncPool:
+        pool = cast("InstrumentedAsyncPool", super().recreate())
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            for metrics in (self.metrics, pool_metrics):
+                metrics.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            for metrics in (self.metrics, pool_metrics):
+                metrics.wait.observe(elapsed)
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        connection = super().connect()
+        elapsed = time.perf_counter() - started
+        for metrics in (self.metrics, pool_metrics):
+            metrics.checkout.observe(elapsed)
+            metrics.checkouts += 1
+        return connection
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+    """Return live occupancy and telemetry of ``pool``.
+
+    Args:
+        pool (Pool): The engine's pool (``engine.pool``).
+
+    Returns:
+        dict[str, Any]: ``size``, ``checked_out``, ``checked_in``, ``overflow``
+        and ``max_connections`` for queue pools, plus this pool's checkout
+        counters and wait/checkout latency histograms for instrumented pools.
+    """
+
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_connections=pool.size() + pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+        )
+    if isinstance(pool, InstrumentedAsyncPool):
+        stats.update(
+            checkouts=pool.metrics.checkouts,
+            timeouts=pool.metrics.timeouts,
+            wait_seconds=pool.metrics.wait.stats(),
+            checkout_seconds=pool.metrics.checkout.stats(),
+        )
+    return stats
@@ -0,0 +1,305 @@
+"""On-demand CPU profiling of a live worker.
+
+Two profilers are available, both started by an operator holding the
+diagnostics token (see :mod:`src.core.diagnostics`):
+
+* ``cprofile``: a deterministic :mod:`cProfile` profile, served as a pstats
+  file (``pstats.Stats``, snakeviz) or as text sorted by cumulative time;
+* ``sample``: a background thread records the event-loop thread's stack every
+  few milliseconds, served as collapsed stacks (``outer;inner count`` per
+  line), the input format of flamegraph.pl and speedscope.
+
+A single request is profiled by sending :data:`PROFILE_HEADER` (``cprofile``
+or ``sample``) along with the diagnostics token; the response carries
+``X-Profile-Id`` for ``GET /admin/profiles/{id}``. ``POST /admin/profile``
+profiles the whole worker for a time-boxed window instead.
+
+Both profilers observe the event-loop thread, so a request's profile also
+contains whatever other requests ran on the loop meanwhile. Only one profile
+runs at a time per worker; a request asking for one while another is running
+is served unprofiled, with ``X-Profile-Status: busy``.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from src.core.config import settings
+from src.core.diagnostics import has_diagnostics_token
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+PROFILE_HEADER = "X-Profile"
+
+PROFILE_MODES = ("cprofile", "sample")
+
+# Output formats each profiler can render, the first being the default
+PROFILE_FORMATS = {"cprofile": ("pstats", "text"), "sample": ("collapsed",)}
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+_PROFILE_HEADER_KEY = PROFILE_HEADER.lower().encode("latin-1")
+
+
+def collapse_stack(frame: FrameType | None) -> str:
+    """Render ``frame`` and its callers as one collapsed-stack line, outermost first."""
+
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        location = f"{Path(code.co_filename).name}:{code.co_firstlineno}"
+        names.append(f"{code.co_qualname} ({location})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Sample one thread's Python stack from a background thread.
+
+    Attributes:
+        thread_id (int): ``threading.get_ident()`` of the sampled thread.
+        interval (float): Seconds between samples.
+        stacks (Counter[str]): Sample count per collapsed stack.
+    """
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        """Stop sampling and return the collected stacks."""
+
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+
+@dataclass(slots=True)
+class CapturedProfile:
+    """A finished profile.
+
+    Attributes:
+        id (str): Identifier for ``GET /admin/profiles/{id}``.
+        mode (str): ``cprofile`` or ``sample``.
+        route (str | None): Route template of the profiled request, or None
+            for a time-boxed window.
+        started_at (datetime): Start time (UTC).
+        duration_ms (float): Profiled wall time in milliseconds.
+        cprofile (cProfile.Profile | None): Stopped profiler (``cprofile`` mode).
+        stacks (Counter[str] | None): Collapsed stacks (``sample`` mode).
+    """
+
+    id: str
+    mode: str
+    route: str | None
+    started_at: datetime
+    duration_ms: float
+    cprofile: cProfile.Profile | None = None
+    stacks: Counter[str] | None = None
+
+    def summary(self) -> dict[str, Any]:
+        """Describe the profile without its data."""
+
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "route": self.route,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "formats": list(PROFILE_FORMATS[self.mode]),
+        }
+
+    def render(self, output: str | None = None, limit: int = 50) -> bytes:
+        """Render the profile in ``output`` format (the mode's default if None).
+
+        Args:
+            output (str | None): ``pstats`` or ``text`` for ``cprofile``
+                profiles, ``collapsed`` for ``sample`` profiles.
+            limit (int): Functions listed in ``text`` output.
+
+        Returns:
+            bytes: The rendered profile.
+
+        Raises:
+            ValueError: If the profile's mode cannot produce ``output``.
+        """
+
+        formats = PROFILE_FORMATS[self.mode]
+        output = output or formats[0]
+        if output not in formats:
+            raise ValueError(f"{self.mode} profiles are available as {', '.join(formats)}")
+        if output == "collapsed":
+            stacks = self.stacks or Counter()
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()).encode()
+        assert self.cprofile is not None
+        if output == "pstats":
+            # Same layout as pstats.Stats.dump_stats
+            self.cprofile.create_stats()
+            return marshal.dumps(self.cprofile.stats)
+        stream = io.StringIO()
+        stats = pstats.Stats(self.cprofile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return stream.getvalue().encode()
+
+
+class ActiveProfile:
+    """A profile in progress; see :meth:`ProfileRecorder.start`."""
+
+    def __init__(self, mode: str, interval: float) -> None:
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.started_at = datetime.now(UTC)
+        self._started = time.perf_counter()
+        self._cprofile: cProfile.Profile | None = None
+        self._sampler: SamplingProfiler | None = None
+        if mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._sampler = SamplingProfiler(threading.get_ident(), interval)
+            self._sampler.start()
+
+    def stop(self, route: str | None) -> CapturedProfile:
+        """Stop profiling and return the result."""
+
+        profile = CapturedProfile(
+            id=self.id,
+            mode=self.mode,
+            route=route,
+            started_at=self.started_at,
+            duration_ms=(time.perf_counter() - self._started) * 1000,
+        )
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            profile.cprofile = self._cprofile
+        if self._sampler is not None:
+            profile.stacks = self._sampler.stop()
+        return profile
+
+
+class ProfileRecorder:
+    """Run at most one profile at a time and keep the newest finished ones.
+
+    Attributes:
+        history_size (int): Finished profiles kept.
+    """
+
+    def __init__(self, history_size: int) -> None:
+        self.history_size = history_size
+        self._active: ActiveProfile | None = None
+        self._profiles: OrderedDict[str, CapturedProfile] = OrderedDict()
+
+    @property
+    def busy(self) -> bool:
+        """Whether a profile is currently running."""
+
+        return self._active is not None
+
+    def start(self, mode: str, interval: float = DEFAULT_SAMPLE_INTERVAL) -> ActiveProfile | None:
+        """Start profiling the calling (event-loop) thread.
+
+        Args:
+            mode (str): ``cprofile`` or ``sample``.
+            interval (float): Seconds between samples in ``sample`` mode.
+
+        Returns:
+            ActiveProfile | None: The running profile, or None if another one
+            is already running.
+        """
+
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}")
+        if self._active is not None:
+            return None
+        self._active = ActiveProfile(mode, interval)
+        return self._active
+
+    def finish(self, active: ActiveProfile, route: str | None = None) -> CapturedProfile:
+        """Stop ``active`` and keep its result."""
+
+        try:
+            profile = active.stop(route)
+        finally:
+            self._active = None
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.history_size:
+            self._profiles.popitem(last=False)
+        return profile
+
+    def get(self, profile_id: str) -> CapturedProfile | None:
+        """Return a kept profile by id."""
+
+        return self._profiles.get(profile_id)
+
+    def profiles(self) -> list[CapturedProfile]:
+        """Return the kept profiles, newest first."""
+
+        return list(reversed(self._profiles.values()))
+
+
+def _requested_mode(headers: list[tuple[bytes, bytes]]) -> str | None:
+    """Return the profile mode requested in raw ASGI ``headers``, if any."""
+
+    for key, value in headers:
+        if key == _PROFILE_HEADER_KEY:
+            mode = value.decode("latin-1").strip().lower()
+            return mode if mode in PROFILE_MODES else None
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that ask for it with a diagnostics token."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        mode = _requested_mode(scope["headers"]) if scope["type"] == "http" else None
+        if mode is None or not has_diagnostics_token(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        active = profile_recorder.start(mode)
+        header = (b"x-profile-id", active.id.encode()) if active else (b"x-profile-status", b"busy")
+
+        async def send_with_profile_id(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), header]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if active is not None:
+                profile_recorder.finish(active, getattr(scope.get("route"), "path", None))
+
+
+# Process-wide recorder served by /admin/profiles
+profile_recorder = ProfileRecorder(settings.PROFILING_HISTORY_SIZE)
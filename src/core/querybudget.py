@@ -0,0 +1,110 @@
+"""Statement counting for query budgets, and a guard against lazy loads.
+
+:func:`count_queries` counts the statements executed by the current task (and
+tasks it starts) on every engine the service uses, and can enforce a budget::
+
+    with count_queries(max_queries=1):
+        response = await client.get("/me", headers=auth)
+
+The endpoint tests hold hot paths such as ``/me`` and ``/refresh`` to a
+budget this way, so an N+1 query cannot creep in unnoticed.
+
+With ``Settings.STRICT_LAZY_LOADING`` every ORM query loads relationships that
+have no explicit loader option with ``raiseload("*", sql_only=True)``, so
+touching an unloaded ``User.refresh_tokens`` or ``RefreshToken.user`` raises
+:class:`sqlalchemy.exc.InvalidRequestError` instead of issuing a query.
+Relationships already in the identity map still resolve. Intended for
+development and tests; it is off by default.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import ORMExecuteState, Session, raiseload
+
+from src.core.config import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a :func:`count_queries` block runs more statements than allowed."""
+
+
+@dataclass(slots=True)
+class QueryCount:
+    """Statements executed inside a :func:`count_queries` block.
+
+    Attributes:
+        statements (list[str]): SQL of each statement, in execution order.
+    """
+
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        """Number of statements executed."""
+
+        return len(self.statements)
+
+
+# Counters of the enclosing count_queries blocks, innermost last
+_active_counts: ContextVar[tuple[QueryCount, ...]] = ContextVar("query_counts", default=())
+
+
+@contextmanager
+def count_queries(max_queries: int | None = None) -> Iterator[QueryCount]:
+    """Count statements executed in this context on engines passed to :func:`install`.
+
+    Args:
+        max_queries (int | None): Statements allowed in the block, or None to
+            only count.
+
+    Yields:
+        QueryCount: The running count.
+
+    Raises:
+        QueryBudgetExceeded: If the block ran more than ``max_queries`` statements.
+    """
+
+    counter = QueryCount()
+    reset = _active_counts.set((*_active_counts.get(), counter))
+    try:
+        yield counter
+    finally:
+        _active_counts.reset(reset)
+    if max_queries is not None and counter.count > max_queries:
+        listing = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise QueryBudgetExceeded(
+            f"{counter.count} statements executed, budget is {max_queries}:\n{listing}"
+        )
+
+
+def install(engine: Engine) -> None:
+    """Count statements executed on ``engine`` in :func:`count_queries` blocks.
+
+    Args:
+        engine (Engine): Sync engine (``AsyncEngine.sync_engine``) to watch.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        for counter in _active_counts.get():
+            counter.statements.append(statement)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _raise_on_lazy_load(state: ORMExecuteState) -> None:
+    if (
+        settings.STRICT_LAZY_LOADING
+        and state.is_select
+        and not state.is_column_load
+        and not state.is_relationship_load
+    ):
+        state.statement = state.statement.options(raiseload("*", sql_only=True))
@@ -0,0 +1,49 @@
+"""Read-your-writes tracking for replica reads.
+
+Replicas apply the primary's writes after a delay, so a client that has just
+registered (say) and immediately asks for its profile may not be found on the
+replica yet. :data:`recent_writes` remembers which keys (user ids) were
+written in the last ``Settings.READ_YOUR_WRITES_SECONDS``; read paths consult
+it and go to the primary for those keys.
+
+Tracking is per process. With several workers, a follow-up request served by
+a different worker can still read from the replica, so the window should be
+paired with a replica lag well below it.
+"""
+
+from __future__ import annotations
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+
+
+class RecentWrites:
+    """Keys written recently enough that reads must not go to a replica.
+
+    Attributes:
+        window (float): Seconds a write keeps its key pinned to the primary;
+            ``0`` disables pinning.
+    """
+
+    def __init__(self, window: float, max_keys: int = 100_000) -> None:
+        self.window = window
+        self._keys: TTLCache[str, bool] = TTLCache(max_size=max_keys, ttl=window)
+
+    def mark(self, key: str) -> None:
+        """Record a write for ``key``."""
+
+        self._keys.set(key, True, ttl=self.window)
+
+    def pinned(self, key: str) -> bool:
+        """Whether reads for ``key`` should go to the primary."""
+
+        return self._keys.get(key) is not None
+
+    def clear(self) -> None:
+        """Forget all recorded writes."""
+
+        self._keys.clear()
+
+
+# Process-wide record of recently written user ids
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
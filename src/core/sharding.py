@@ -0,0 +1,231 @@
+"""Hash sharding of user-owned rows across several databases.
+
+A :class:`HashRing` maps a shard key (a user id) to one of N shards by
+consistent hashing, so adding a shard moves only about 1/N of the keys.
+:class:`ShardRouter` plugs the ring into SQLAlchemy's horizontal sharding
+extension: each mapped class is registered with the column that holds its
+shard key (``User.id``, ``RefreshToken.user_id``, ...), which keeps a user's
+rows together on one shard. Classes registered as *global* live on a single
+directory database instead.
+
+Statement routing (see :meth:`ShardRouter.execute_chooser`):
+
+* a statement whose top-level ``WHERE`` pins the shard-key column with ``==``
+  goes to that key's shard only;
+* anything else (e.g. a lookup by token digest) is sent to every shard and
+  the results are merged, ``rowcount`` included.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import ColumnElement, inspect
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+    from sqlalchemy.orm import InstrumentedAttribute, Mapper, ORMExecuteState
+
+
+def _hash(value: str) -> int:
+    """Stable 64-bit hash of ``value`` (independent of PYTHONHASHSEED)."""
+
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring over shard identifiers.
+
+    Each shard owns ``vnodes`` points on the ring; a key belongs to the shard
+    owning the first point at or after the key's hash.
+
+    Attributes:
+        shard_ids (tuple[str, ...]): Shards on the ring.
+    """
+
+    def __init__(self, shard_ids: Sequence[str], vnodes: int = 128) -> None:
+        if not shard_ids:
+            raise ValueError("HashRing needs at least one shard")
+        self.shard_ids = tuple(shard_ids)
+        points = sorted(
+            (_hash(f"{shard_id}#{i}"), shard_id)
+            for shard_id in self.shard_ids
+            for i in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [owner for _, owner in points]
+
+    def shard_for(self, key: str) -> str:
+        """Return the shard that owns ``key``."""
+
+        index = bisect.bisect_left(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class ShardRouter:
+    """Route ORM operations to shards by consistent hash of a per-class key.
+
+    Attributes:
+        ring (HashRing): Ring over the data shards.
+        directory_id (str): Shard id of the directory database that holds
+            classes registered with :meth:`register_global`.
+        engines (dict[str, AsyncEngine]): Every engine, keyed by shard id.
+    """
+
+    def __init__(
+        self,
+        directory: AsyncEngine,
+        shards: Mapping[str, AsyncEngine],
+        directory_id: str = "directory",
+    ) -> None:
+        self.ring = HashRing(list(shards))
+        self.directory_id = directory_id
+        self.engines: dict[str, AsyncEngine] = {directory_id: directory, **shards}
+        self._keys: dict[type, InstrumentedAttribute[Any]] = {}
+        self._global: set[type] = set()
+
+    def register(self, cls: type, key: InstrumentedAttribute[Any]) -> None:
+        """Shard ``cls`` by the value of its ``key`` column.
+
+        Args:
+            cls (type): Mapped class.
+            key (InstrumentedAttribute[Any]): Column holding the shard key.
+        """
+
+        self._keys[cls] = key
+
+    def register_global(self, cls: type) -> None:
+        """Keep every row of ``cls`` on the directory database."""
+
+        self._global.add(cls)
+
+    @property
+    def data_shards(self) -> tuple[str, ...]:
+        """Identifiers of the data shards (directory excluded)."""
+
+        return self.ring.shard_ids
+
+    def shard_for(self, key: Any) -> str:
+        """Return the data shard that owns shard key ``key``."""
+
+        return self.ring.shard_for(str(key))
+
+    def session_options(self) -> dict[str, Any]:
+        """Keyword arguments for ``async_sessionmaker`` to build sharded sessions."""
+
+        return {
+            "sync_session_class": ShardedSession,
+            "shards": {shard_id: engine.sync_engine for shard_id, engine in self.engines.items()},
+            "shard_chooser": self.shard_chooser,
+            "identity_chooser": self.identity_chooser,
+            "execute_chooser": self.execute_chooser,
+        }
+
+    def shard_chooser(self, mapper: Mapper[Any] | None, instance: Any, **_kw: Any) -> str:
+        """Choose the shard for a pending instance (flush) or a bare bind lookup.
+
+        A lookup without an instance, such as ``session.get_bind(Model)`` to
+        inspect the dialect, gets the first data shard.
+        """
+
+        if mapper is None:
+            return self.directory_id
+        cls = mapper.class_
+        if cls in self._global:
+            return self.directory_id
+        if instance is None:
+            return self.data_shards[0]
+        key = self._keys.get(cls)
+        if key is not None:
+            value = getattr(instance, key.key)
+            if value is not None:
+                return self.shard_for(value)
+        raise ValueError(f"Cannot choose a shard for {cls.__name__} without its shard key")
+
+    def identity_chooser(
+        self,
+        mapper: Mapper[Any],
+        primary_key: Sequence[Any],
+        *,
+        lazy_loaded_from: Any,
+        **_kw: Any,
+    ) -> Iterable[str]:
+        """Choose the shards to search for a primary-key lookup (``session.get``)."""
+
+        cls = mapper.class_
+        if cls in self._global:
+            return [self.directory_id]
+        if lazy_loaded_from is not None and lazy_loaded_from.identity_token:
+            return [lazy_loaded_from.identity_token]
+        key = self._keys.get(cls)
+        primary_columns = mapper.primary_key
+        if (
+            key is not None
+            and len(primary_columns) == 1
+            and key.property.columns[0] is primary_columns[0]
+        ):
+            return [self.shard_for(primary_key[0])]
+        return self.data_shards
+
+    def execute_chooser(self, orm_context: ORMExecuteState) -> Iterable[str]:
+        """Choose the shards a statement runs on."""
+
+        mapper = orm_context.bind_mapper
+        cls = mapper.class_ if mapper is not None else None
+        if cls in self._global:
+            return [self.directory_id]
+        key = self._keys.get(cls) if cls is not None else None
+        where = getattr(orm_context.statement, "whereclause", None)
+        if key is not None and where is not None:
+            values = _equality_values(where, key.expression)
+            if values:
+                return sorted({self.shard_for(value) for value in values})
+        return self.data_shards
+
+
+def _equality_values(where: ColumnElement[Any], column: ColumnElement[Any]) -> list[Any]:
+    """Return values that ``where`` requires ``column`` to equal.
+
+    Only top-level ``AND`` terms of the form ``column == <bound value>`` or
+    ``column IN (<bound values>)`` count; an empty list means the statement
+    is not pinned to specific keys.
+    """
+
+    terms = (
+        list(where.clauses)
+        if isinstance(where, BooleanClauseList) and where.operator is operators.and_
+        else [where]
+    )
+    for term in terms:
+        if not isinstance(term, BinaryExpression) or not term.left.compare(column):
+            continue
+        right = term.right
+        if term.operator is operators.eq and isinstance(right, BindParameter):
+            return [right.effective_value]
+        if (
+            term.operator is operators.in_op
+            and isinstance(right, BindParameter)
+            and right.expanding
+        ):
+            return list(right.effective_value or [])
+    return []
+
+
+def shard_of(instance: Any) -> str | None:
+    """Return the shard id a loaded instance came from, if any."""
+
+    shard_id: str | None = inspect(instance).identity_token
+    return shard_id
+
+
+def is_sharded(db: AsyncSession) -> bool:
+    """Whether ``db`` routes across shards (see :meth:`ShardRouter.session_options`)."""
+
+    return isinstance(db.sync_session, ShardedSession)
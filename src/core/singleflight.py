@@ -0,0 +1,71 @@
+"""Single-flight coalescing of concurrent identical async calls.
+
+When many requests ask for the same thing at the same moment (a client
+fanning out parallel requests with one token, say), only the first caller
+runs the lookup; everyone else awaits the same in-flight result. Nothing is
+retained once the call finishes, so this adds no staleness on its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Share one in-flight awaitable among concurrent callers with the same key.
+
+    The shared call runs as its own task, so cancelling one caller (e.g. a
+    client disconnect) does not cancel the work the other callers wait on.
+    For the same reason ``func`` must not use resources owned by the caller
+    that started it, such as its request's database session: that caller may
+    finish and close them while the others still wait. Exceptions are
+    delivered to every caller.
+
+    Attributes:
+        executed (int): Calls that actually ran.
+        shared (int): Calls that joined an in-flight call instead of running.
+    """
+
+    def __init__(self) -> None:
+        self.executed = 0
+        self.shared = 0
+        self._calls: dict[K, asyncio.Task[V]] = {}
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """Run ``func`` unless a call for ``key`` is already in flight.
+
+        Args:
+            key (K): Identity of the call.
+            func (Callable[[], Awaitable[V]]): Zero-argument coroutine factory.
+
+        Returns:
+            V: The (possibly shared) result.
+        """
+
+        task = self._calls.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: K, task: asyncio.Task[V]) -> None:
+        """Forget a finished call and mark its exception as retrieved."""
+
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Return executed/shared counters and the number of calls in flight."""
+
+        return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
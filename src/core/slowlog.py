@@ -0,0 +1,236 @@
+"""Bounded log of slow SQL statements with their query plans.
+
+:meth:`SlowQueryLog.install` times every statement executed on an engine.
+Statements slower than ``Settings.SLOW_QUERY_THRESHOLD_MS`` are recorded
+with:
+
+* their bound parameters, redacted to type names (values may be emails,
+  token digests or password hashes);
+* the route template of the request that issued them, set by
+  :class:`RequestRouteMiddleware` (None outside a request, e.g. the sweeper);
+* the dialect's query plan (``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on
+  PostgreSQL), captured on the statement's first slow occurrence and reused
+  for later ones. Capturing runs the EXPLAIN on the same connection, inside a
+  savepoint on PostgreSQL so a failure cannot abort the request's transaction.
+
+The log keeps the newest ``Settings.SLOW_QUERY_LOG_SIZE`` records per worker
+and is served by ``GET /admin/slow-queries`` (see :mod:`src.core.admin`).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Iterable, Mapping
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from src.core.config import settings
+from src.core.instrumentation import statement_kind
+
+_PLAN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+_EXPLAINABLE = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+_QUERY_STARTS = "slowlog_query_starts"
+
+_current_scope: ContextVar[dict[str, Any] | None] = ContextVar("request_scope", default=None)
+
+
+@dataclass(frozen=True, slots=True)
+class SlowQuery:
+    """One statement execution that exceeded the threshold.
+
+    Attributes:
+        statement (str): SQL text as sent to the driver.
+        parameters (Any): Bound parameters with values replaced by type names.
+        duration_ms (float): Execution time in milliseconds.
+        route (str | None): Route template of the originating request.
+        recorded_at (datetime): When the statement finished (UTC).
+        plan (str | None): Query plan, or None if the dialect or statement has none.
+    """
+
+    statement: str
+    parameters: Any
+    duration_ms: float
+    route: str | None
+    recorded_at: datetime
+    plan: str | None
+
+
+def redact(parameters: Any) -> Any:
+    """Replace parameter values with their type names, keeping the structure.
+
+    ``None`` and booleans are kept as is, since they reveal nothing.
+    """
+
+    if parameters is None or isinstance(parameters, bool):
+        return parameters
+    if isinstance(parameters, Mapping):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+def _current_route() -> str | None:
+    """Return the route template of the request being served, if any."""
+
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    # The router stores the matched route in the shared scope
+    return getattr(scope.get("route"), "path", None)
+
+
+class SlowQueryLog:
+    """Record statements slower than a threshold, keeping the newest ``size``.
+
+    Attributes:
+        threshold (float): Threshold in seconds; ``0`` records nothing.
+        size (int): Maximum records (and cached plans) kept.
+    """
+
+    def __init__(self, threshold: float, size: int) -> None:
+        self.threshold = threshold
+        self.size = size
+        self._records: deque[SlowQuery] = deque(maxlen=size)
+        self._plans: dict[str, str | None] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether statements are being timed."""
+
+        return self.threshold > 0 and self.size > 0
+
+    def install(self, engine: Engine) -> None:
+        """Time statements executed on ``engine`` (``AsyncEngine.sync_engine``).
+
+        Does nothing while the log is disabled.
+        """
+
+        if not self.enabled:
+            return
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+            conn.info.setdefault(_QUERY_STARTS, []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(
+            conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+        ) -> None:
+            elapsed = time.perf_counter() - conn.info[_QUERY_STARTS].pop()
+            if elapsed >= self.threshold:
+                plan = None if executemany else self._plan(conn, statement, parameters)
+                self.record(statement, parameters, elapsed, plan)
+
+        @event.listens_for(engine, "handle_error")
+        def _error(context: Any) -> None:
+            # after_cursor_execute does not fire for failed statements
+            connection = context.connection
+            starts = connection.info.get(_QUERY_STARTS) if connection is not None else None
+            if context.statement is not None and starts:
+                starts.pop()
+
+    def record(self, statement: str, parameters: Any, seconds: float, plan: str | None) -> None:
+        """Append a record for one slow execution of ``statement``."""
+
+        self._records.append(
+            SlowQuery(
+                statement=statement,
+                parameters=redact(parameters),
+                duration_ms=seconds * 1000,
+                route=_current_route(),
+                recorded_at=datetime.now(UTC),
+                plan=plan,
+            )
+        )
+
+    def _plan(self, conn: Any, statement: str, parameters: Any) -> str | None:
+        """Return the cached plan for ``statement``, capturing it on first use."""
+
+        if statement in self._plans:
+            return self._plans[statement]
+        prefix = _PLAN_PREFIXES.get(conn.dialect.name)
+        plan = None
+        if prefix is not None and statement_kind(statement) in _EXPLAINABLE:
+            plan = _explain(conn, prefix + statement, parameters)
+        if len(self._plans) >= self.size:
+            del self._plans[next(iter(self._plans))]
+        self._plans[statement] = plan
+        return plan
+
+    def records(self, route: str | None = None, limit: int | None = None) -> list[SlowQuery]:
+        """Return records, newest first.
+
+        Args:
+            route (str | None): Only records from this route template.
+            limit (int | None): Maximum number of records.
+
+        Returns:
+            list[SlowQuery]: Matching records.
+        """
+
+        matching: Iterable[SlowQuery] = reversed(self._records)
+        if route is not None:
+            matching = (record for record in matching if record.route == route)
+        result = list(matching)
+        return result if limit is None else result[:limit]
+
+    def clear(self) -> None:
+        """Drop all records and cached plans."""
+
+        self._records.clear()
+        self._plans.clear()
+
+
+def _explain(conn: Any, sql: str, parameters: Any) -> str | None:
+    """Run ``sql`` (an EXPLAIN) on ``conn``'s DBAPI connection and return its rows as text.
+
+    Returns None for an empty plan (e.g. a plain INSERT on SQLite).
+    """
+
+    savepoint = conn.dialect.name == "postgresql"
+    cursor = conn.connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(sql, parameters)
+            rows = cursor.fetchall()
+        except Exception as exc:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return f"unavailable: {type(exc).__name__}: {exc}"
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+    # SQLite's plan detail and PostgreSQL's plan line are both the last column
+    return "\n".join(str(row[-1]) for row in rows) or None
+
+
+class RequestRouteMiddleware:
+    """ASGI middleware making the request's route available to :data:`slow_query_log`."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+# Process-wide log served by /admin/slow-queries
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS / 1000, settings.SLOW_QUERY_LOG_SIZE)
@@ -0,0 +1,110 @@
+"""Production SQLite profile: WAL, tuned pragmas and reader/writer routing.
+
+SQLite allows one writer at a time. In the default rollback-journal mode a
+write also blocks readers, so concurrent logins stall ``/me``. With
+``Settings.SQLITE_WAL_PROFILE`` enabled, :mod:`src.core.database` instead
+builds two engines on the same database file:
+
+* a writer engine with exactly one connection, so in-process writes queue in
+  the pool rather than contending for SQLite's lock;
+* a reader engine with a small pool of ``query_only`` connections that, in
+  WAL mode, read a consistent snapshot without waiting for the writer.
+
+:func:`routing_session_class` sends each statement to one of them: plain
+``SELECT`` statements go to a reader until the session writes, after which
+the rest of that transaction stays on the writer so it reads its own writes.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.sql import Select
+
+from src.core.config import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+_WRITER_STICKY = "routing_writer"
+
+
+def sqlite_pragmas(query_only: bool = False) -> list[str]:
+    """Return the PRAGMA statements applied to each new connection.
+
+    Args:
+        query_only (bool): Also forbid writes on the connection (reader pool).
+
+    Returns:
+        list[str]: PRAGMA statements, in order.
+    """
+
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_BYTES}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KIB}",
+        "PRAGMA foreign_keys=ON",
+    ]
+    if query_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def install_sqlite_pragmas(engine: AsyncEngine, query_only: bool = False) -> None:
+    """Apply :func:`sqlite_pragmas` whenever ``engine`` opens a connection.
+
+    Args:
+        engine (AsyncEngine): SQLite engine to configure.
+        query_only (bool): Make the engine's connections read-only.
+    """
+
+    statements = sqlite_pragmas(query_only)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def routing_session_class(writer: AsyncEngine, reader: AsyncEngine) -> type[Session]:
+    """Build a sync ``Session`` class that routes reads to ``reader``.
+
+    Args:
+        writer (AsyncEngine): Engine that receives writes and anything that is
+            not a plain ``SELECT``.
+        reader (AsyncEngine): Engine that receives ``SELECT`` statements issued
+            before the current transaction has written.
+
+    Returns:
+        type[Session]: Session class for ``async_sessionmaker(sync_session_class=...)``.
+    """
+
+    writer_bind, reader_bind = writer.sync_engine, reader.sync_engine
+
+    class RoutingSession(Session):
+        """Session that reads from the reader pool until it writes."""
+
+        def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:  # noqa: ARG002  (Session.get_bind signature)
+            if self.info.get(_WRITER_STICKY):
+                return writer_bind
+            if isinstance(clause, Select) and clause._for_update_arg is None and not self._flushing:
+                return reader_bind
+            if clause is not None or self._flushing:
+                self.info[_WRITER_STICKY] = True
+            return writer_bind
+
+    @event.listens_for(RoutingSession, "after_transaction_end")
+    def _reset(session: Session, transaction: SessionTransaction) -> None:
+        if transaction.parent is None:
+            session.info.pop(_WRITER_STICKY, None)
+
+    return RoutingSession
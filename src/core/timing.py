@@ -0,0 +1,122 @@
+"""Per-request phase timing reported in a ``Server-Timing`` response header.
+
+:class:`ServerTimingMiddleware` starts a :class:`PhaseTimer` for requests
+that opt in (``Settings.SERVER_TIMING_ENABLED``, or a valid
+:data:`src.core.diagnostics.DIAGNOSTICS_HEADER`). Code on the request's path
+records into it with :func:`phase` or :func:`record_phase`; both are no-ops
+when no timer is active, so the hooks cost nothing for other requests.
+
+Phases recorded by the service:
+
+* ``bcrypt``: password hash/verify jobs, queueing on the worker pool included;
+* ``db``: database statement execution (all statements, summed);
+* ``jwt``: token signing and verification;
+* ``user_lookup``, ``token_claim``: the login user SELECT and the refresh-token
+  claim, database round trips included;
+* ``commit``: flush and commit of the request's transaction;
+* ``total``: from the middleware to the start of the response.
+
+Phases may overlap (``db`` is contained in ``user_lookup``), and a phase
+recorded more than once is summed, with the count in its description.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+from src.core.config import settings
+from src.core.diagnostics import has_diagnostics_token
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class PhaseTimer:
+    """Accumulated duration and count per named phase of one request.
+
+    Attributes:
+        started (float): ``time.perf_counter()`` when the timer was created.
+        phases (dict[str, list[float]]): ``[seconds, count]`` per phase, in
+            first-recorded order.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, list[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add ``seconds`` to phase ``name``."""
+
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def header(self) -> str:
+        """Render the phases, then ``total``, as a ``Server-Timing`` header value."""
+
+        metrics = []
+        for name, (seconds, count) in self.phases.items():
+            metric = f"{name};dur={seconds * 1000:.3f}"
+            if count > 1:
+                metric += f';desc="{int(count)} calls"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+_current_timer: ContextVar[PhaseTimer | None] = ContextVar("phase_timer", default=None)
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """Add an already measured duration to phase ``name`` of the active timer."""
+
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as phase ``name`` of the active timer."""
+
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding a ``Server-Timing`` header to opted-in requests."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not (
+            settings.SERVER_TIMING_ENABLED or has_diagnostics_token(scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        timer = PhaseTimer()
+
+        async def send_with_timing(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_timer.set(timer)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timer.reset(token)
@@ -0,0 +1,89 @@
+"""Tests for hashing admission control.
+
+Tests slot limits, bounded queueing, queue deadlines and counters.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.auth.admission import AdmissionController
+
+
+class TestAdmissionController:
+    """Tests for AdmissionController."""
+
+    async def test_admits_up_to_max_in_flight(self) -> None:
+        """Jobs within the in-flight limit should be admitted immediately."""
+        gate = AdmissionController(max_in_flight=2, max_queue=0, queue_timeout=1.0)
+
+        await gate.acquire()
+        await gate.acquire()
+
+        assert gate.in_flight == 2
+        gate.release()
+        gate.release()
+        assert gate.in_flight == 0
+        assert gate.admitted == 2
+
+    async def test_rejects_when_queue_full(self) -> None:
+        """Jobs beyond in-flight plus queue should be rejected with Retry-After."""
+        gate = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1.0, retry_after=3)
+        await gate.acquire()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await gate.acquire()
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "3"}
+        assert gate.rejected_queue_full == 1
+
+    async def test_queued_job_gets_released_slot(self) -> None:
+        """A waiter should receive the slot as soon as it is released."""
+        gate = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1.0)
+        await gate.acquire()
+
+        waiter = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.queued == 1
+
+        gate.release()
+        await waiter
+
+        assert gate.in_flight == 1
+        assert gate.queued == 0
+        assert gate.admitted == 2
+
+    async def test_rejects_after_queue_timeout(self) -> None:
+        """Waiters should be rejected once the queue deadline passes."""
+        gate = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.01)
+        await gate.acquire()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await gate.acquire()
+
+        assert exc_info.value.status_code == 503
+        assert gate.rejected_timeout == 1
+        assert gate.queued == 0
+        gate.release()
+        assert gate.in_flight == 0
+
+    async def test_cancelled_waiter_does_not_leak_slot(self) -> None:
+        """Cancelling a queued job should not consume or leak a slot."""
+        gate = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout=1.0)
+        await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        gate.release()
+
+        assert gate.in_flight == 0
+        assert gate.queued == 0
+        async with gate.slot():
+            assert gate.in_flight == 1
@@ -0,0 +1,178 @@
+"""Tests for authentication dependencies.
+
+Tests principal resolution, the principal cache and claims-only resolution.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.auth import dependencies
+from src.auth.dependencies import get_claims_principal, get_current_principal
+from src.auth.models import User
+from src.auth.principal import Principal, principal_cache
+from src.auth.utils import create_access_token, create_refresh_token
+from src.core.replica import recent_writes
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+@pytest.fixture(autouse=True)
+def clear_principal_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every test with an empty principal cache and read-your-writes pinning off."""
+    principal_cache.clear()
+    recent_writes.clear()
+    monkeypatch.setattr(recent_writes, "window", 0.0)
+
+
+@pytest.fixture
+def read_sessions(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> async_sessionmaker[AsyncSession]:
+    """Route the dependencies' read sessions to the test database."""
+    factory = async_sessionmaker(bind=db_session.bind, expire_on_commit=False)
+    monkeypatch.setattr(dependencies, "ReadSessionLocal", factory)
+    return factory
+
+
+async def _create_user(db: AsyncSession) -> User:
+    user = User(
+        email="test@example.com",
+        username="testuser",
+        hashed_password="not-a-real-hash",
+        is_active=True,
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@pytest.mark.usefixtures("read_sessions")
+class TestGetCurrentPrincipal:
+    """Tests for get_current_principal."""
+
+    async def test_resolves_and_caches_principal(self, db_session: AsyncSession) -> None:
+        """The second lookup should be served from the cache."""
+        user = await _create_user(db_session)
+        token = create_access_token({"sub": user.id})
+
+        first = await get_current_principal(token)
+        second = await get_current_principal(token)
+
+        assert first.id == user.id
+        assert first.email == "test@example.com"
+        assert second is first
+        assert principal_cache.hits == 1
+        assert principal_cache.misses == 1
+
+    async def test_orm_update_invalidates_cache(self, db_session: AsyncSession) -> None:
+        """Updating the user through the ORM should drop the cached principal."""
+        user = await _create_user(db_session)
+        token = create_access_token({"sub": user.id})
+        await get_current_principal(token)
+
+        user.is_active = False
+        await db_session.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token)
+        assert exc_info.value.status_code == 401
+
+    async def test_rejects_refresh_token(self, db_session: AsyncSession) -> None:
+        """Refresh tokens must not be accepted as access tokens."""
+        user = await _create_user(db_session)
+        token = create_refresh_token({"sub": user.id})
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token)
+        assert exc_info.value.status_code == 401
+
+    async def test_concurrent_misses_share_their_own_session(
+        self,
+        db_session: AsyncSession,
+        read_sessions: async_sessionmaker[AsyncSession],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Concurrent misses should share one session that outlives a cancelled caller."""
+        user = await _create_user(db_session)
+        token = create_access_token({"sub": user.id})
+        opened: list[AsyncSession] = []
+
+        def session_factory() -> AsyncSession:
+            opened.append(read_sessions())
+            return opened[-1]
+
+        monkeypatch.setattr(dependencies, "ReadSessionLocal", session_factory)
+        first = asyncio.ensure_future(get_current_principal(token))
+        second = asyncio.ensure_future(get_current_principal(token))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        principal = await second
+
+        assert principal.id == user.id
+        assert first.cancelled()
+        assert len(opened) == 1
+
+
+class TestGetClaimsPrincipal:
+    """Tests for get_claims_principal (stateless /me)."""
+
+    @staticmethod
+    def _claims_token(issued_at: float) -> str:
+        principal = Principal(
+            id="user-1",
+            email="test@example.com",
+            username="testuser",
+            is_active=True,
+            created_at=datetime(2024, 1, 1, tzinfo=UTC),
+        )
+        claims = {"sub": principal.id, "email": principal.email, "iat": int(issued_at)}
+        claims.update(principal.profile_claims())
+        return create_access_token(claims)
+
+    async def test_fresh_claims_need_no_database(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Fresh profile claims should be served without opening a session."""
+
+        def no_session() -> None:
+            raise AssertionError("no database session expected")
+
+        monkeypatch.setattr(dependencies, "AsyncSessionLocal", no_session)
+        monkeypatch.setattr(dependencies, "ReadSessionLocal", no_session)
+        token = self._claims_token(datetime.now(UTC).timestamp())
+
+        principal = await get_claims_principal(token)
+
+        assert principal.id == "user-1"
+        assert principal.username == "testuser"
+        assert principal.created_at == datetime(2024, 1, 1, tzinfo=UTC)
+
+    async def test_stale_claims_fall_back_to_database(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Claims older than the staleness bound should be re-resolved."""
+        user = await _create_user(db_session)
+
+        @asynccontextmanager
+        async def session_factory() -> AsyncIterator[AsyncSession]:
+            yield db_session
+
+        monkeypatch.setattr(dependencies, "ReadSessionLocal", session_factory)
+        monkeypatch.setattr(dependencies.settings, "PROFILE_CLAIMS_MAX_AGE_SECONDS", 60)
+        stale = datetime.now(UTC).timestamp() - 3600
+        claims = {"sub": user.id, "email": user.email, "iat": int(stale)}
+        claims.update(Principal.from_user(user).profile_claims())
+        claims["username"] = "renamed-in-token"
+
+        principal = await get_claims_principal(create_access_token(claims))
+
+        assert principal.username == "testuser"
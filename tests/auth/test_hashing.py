@@ -0,0 +1,64 @@
+"""Tests for the asynchronous password hashing pool.
+
+Tests offloaded hashing/verification on thread and process executors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from src import app as app_module
+from src.auth.hashing import PasswordHasher
+from src.auth.utils import get_password_hash, verify_password
+
+
+class TestPasswordHasher:
+    """Tests for PasswordHasher."""
+
+    async def test_thread_executor_round_trip(self) -> None:
+        """Hashes produced on the pool should verify with the sync helper."""
+        hasher = PasswordHasher(workers=0)
+        try:
+            hashed = await hasher.run(get_password_hash, "TestPassword123!")
+
+            assert hashed.startswith("$2b$")
+            assert verify_password("TestPassword123!", hashed)
+            assert await hasher.run(verify_password, "TestPassword123!", hashed) is True
+            assert await hasher.run(verify_password, "WrongPassword!", hashed) is False
+        finally:
+            hasher.shutdown()
+
+    @pytest.mark.slow
+    async def test_process_executor_round_trip(self) -> None:
+        """Hashing should work across process boundaries."""
+        hasher = PasswordHasher(workers=1)
+        try:
+            hashed = await hasher.run(get_password_hash, "TestPassword123!")
+
+            assert await hasher.run(verify_password, "TestPassword123!", hashed) is True
+        finally:
+            hasher.shutdown()
+
+    async def test_app_shutdown_does_not_block_event_loop(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Waiting for a running hash on shutdown should leave the loop responsive."""
+        hasher = PasswordHasher(workers=0)
+        monkeypatch.setattr(app_module, "password_hasher", hasher)
+        job = asyncio.ensure_future(hasher.run(time.sleep, 0.3))
+        await asyncio.sleep(0.05)
+        ticks = 0
+
+        async def heartbeat() -> None:
+            nonlocal ticks
+            while not job.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(app_module.on_shutdown(), heartbeat())
+
+        assert job.done()
+        assert ticks > 5
@@ -0,0 +1,202 @@
+"""Tests for authentication schema migrations."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.auth.migrations import (
+    _created_at_ddl,
+    create_refresh_token_indexes,
+    migrate_refresh_token_created_at,
+    migrate_refresh_token_digests,
+    migrate_refresh_token_families,
+)
+from src.auth.utils import hash_token
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+LEGACY_SCHEMA = [
+    """CREATE TABLE users (
+        id VARCHAR(36) PRIMARY KEY, email VARCHAR(255) NOT NULL UNIQUE,
+        username VARCHAR(50) NOT NULL UNIQUE, hashed_password VARCHAR(255) NOT NULL,
+        is_active BOOLEAN NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL
+    )""",
+    """CREATE TABLE refresh_tokens (
+        id VARCHAR(36) PRIMARY KEY, token TEXT NOT NULL UNIQUE,
+        user_id VARCHAR(36) NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        expires_at DATETIME NOT NULL, revoked BOOLEAN NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX ix_refresh_tokens_token ON refresh_tokens (token)",
+]
+
+
+class TestRefreshTokenDigestMigration:
+    """Tests for migrate_refresh_token_digests."""
+
+    async def test_migrates_legacy_rows(self, tmp_path: Path) -> None:
+        """Raw tokens should be replaced by digests and user_id indexed."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+        expires = datetime.now(UTC) + timedelta(days=1)
+        async with engine.begin() as conn:
+            for statement in LEGACY_SCHEMA:
+                await conn.execute(text(statement))
+            await conn.execute(
+                text(
+                    "INSERT INTO users (id, email, username, hashed_password, is_active) "
+                    "VALUES ('u1', 'a@example.com', 'alice', 'x', 1)"
+                )
+            )
+            for i in range(5):
+                await conn.execute(
+                    text(
+                        "INSERT INTO refresh_tokens (id, token, user_id, expires_at, revoked) "
+                        "VALUES (:id, :token, 'u1', :expires, :revoked)"
+                    ),
+                    {"id": f"t{i}", "token": f"jwt-{i}", "expires": expires, "revoked": i == 0},
+                )
+
+        migrated = await migrate_refresh_token_digests(engine, batch_size=2)
+
+        assert migrated == 5
+        async with engine.connect() as conn:
+            rows = (
+                await conn.execute(
+                    text("SELECT id, token_hash, revoked FROM refresh_tokens ORDER BY id")
+                )
+            ).all()
+            columns = await conn.run_sync(
+                lambda sync: {c["name"] for c in inspect(sync).get_columns("refresh_tokens")}
+            )
+            indexes = await conn.run_sync(
+                lambda sync: {i["name"] for i in inspect(sync).get_indexes("refresh_tokens")}
+            )
+        assert [row.token_hash for row in rows] == [hash_token(f"jwt-{i}") for i in range(5)]
+        assert bool(rows[0].revoked) is True
+        assert "token" not in columns
+        assert "ix_refresh_tokens_user_id_expires_at" in indexes
+        assert "ix_refresh_tokens_live_user_id" in indexes
+
+        assert await migrate_refresh_token_digests(engine) == 0
+        await engine.dispose()
+
+    async def test_migrates_in_place_outside_sqlite(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The in-place path should leave indexing until family_id and created_at exist."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'in-place.db'}")
+        expires = datetime.now(UTC) + timedelta(days=1)
+        async with engine.begin() as conn:
+            await conn.execute(text(LEGACY_SCHEMA[0]))
+            # No unique constraint on token: SQLite cannot drop such a column
+            await conn.execute(
+                text(
+                    "CREATE TABLE refresh_tokens (id VARCHAR(36) PRIMARY KEY, token TEXT NOT NULL, "
+                    "user_id VARCHAR(36) NOT NULL, expires_at DATETIME NOT NULL, "
+                    "revoked BOOLEAN NOT NULL)"
+                )
+            )
+            await conn.execute(
+                text("CREATE INDEX ix_refresh_tokens_user_id ON refresh_tokens (user_id)")
+            )
+            await conn.execute(
+                text(
+                    "INSERT INTO refresh_tokens (id, token, user_id, expires_at, revoked) "
+                    "VALUES ('t0', 'jwt-0', 'u1', :expires, 0)"
+                ),
+                {"expires": expires},
+            )
+
+        # Take the non-SQLite branch, skipping the constraint DDL SQLite cannot run
+        monkeypatch.setattr(engine.sync_engine.dialect, "name", "postgresql")
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute", retval=True)
+        def _skip_constraint_ddl(
+            conn: Any, cursor: Any, statement: str, parameters: Any, *args: Any
+        ) -> tuple[str, Any]:
+            if "ALTER COLUMN" in statement or "ADD CONSTRAINT" in statement:
+                return "SELECT 1", ()
+            return statement, parameters
+
+        assert await migrate_refresh_token_digests(engine) == 1
+        assert await migrate_refresh_token_families(engine) is True
+        assert await migrate_refresh_token_created_at(engine) is True
+        await create_refresh_token_indexes(engine)
+
+        async with engine.connect() as conn:
+            row = (
+                await conn.execute(text("SELECT id, token_hash, family_id FROM refresh_tokens"))
+            ).one()
+            indexes = await conn.run_sync(
+                lambda sync: {i["name"] for i in inspect(sync).get_indexes("refresh_tokens")}
+            )
+        assert row.token_hash == hash_token("jwt-0")
+        assert row.family_id == row.id
+        assert "ix_refresh_tokens_family_id" in indexes
+        assert "ix_refresh_tokens_user_id_expires_at" in indexes
+        assert "ix_refresh_tokens_user_id" not in indexes
+        await engine.dispose()
+
+
+class TestRefreshTokenColumnMigrations:
+    """Tests for migrate_refresh_token_families and migrate_refresh_token_created_at."""
+
+    async def test_existing_tokens_get_their_own_family(self, tmp_path: Path) -> None:
+        """Older rows should get family_id = id, the legacy issue time, and current indexes."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'digests.db'}")
+        expires = datetime.now(UTC) + timedelta(days=1)
+        async with engine.begin() as conn:
+            await conn.execute(text(LEGACY_SCHEMA[0]))
+            await conn.execute(
+                text(
+                    "CREATE TABLE refresh_tokens (id VARCHAR(36) PRIMARY KEY, "
+                    "token_hash VARCHAR(64) NOT NULL UNIQUE, user_id VARCHAR(36) NOT NULL, "
+                    "expires_at DATETIME NOT NULL, revoked BOOLEAN NOT NULL)"
+                )
+            )
+            await conn.execute(
+                text("CREATE INDEX ix_refresh_tokens_user_id ON refresh_tokens (user_id)")
+            )
+            for i in range(3):
+                await conn.execute(
+                    text(
+                        "INSERT INTO refresh_tokens (id, token_hash, user_id, expires_at, revoked) "
+                        "VALUES (:id, :token_hash, 'u1', :expires, 0)"
+                    ),
+                    {"id": f"t{i}", "token_hash": hash_token(f"jwt-{i}"), "expires": expires},
+                )
+
+        assert await migrate_refresh_token_families(engine) is True
+        assert await migrate_refresh_token_created_at(engine) is True
+        await create_refresh_token_indexes(engine)
+
+        async with engine.connect() as conn:
+            rows = (
+                await conn.execute(text("SELECT id, family_id, created_at FROM refresh_tokens"))
+            ).all()
+            indexes = await conn.run_sync(
+                lambda sync: {i["name"] for i in inspect(sync).get_indexes("refresh_tokens")}
+            )
+        assert all(row.family_id == row.id for row in rows)
+        assert all(row.created_at.startswith("1970-01-01") for row in rows)
+        assert "ix_refresh_tokens_family_id" in indexes
+        assert "ix_refresh_tokens_user_id_expires_at" in indexes
+        assert "ix_refresh_tokens_user_id" not in indexes
+
+        assert await migrate_refresh_token_families(engine) is False
+        assert await migrate_refresh_token_created_at(engine) is False
+        await engine.dispose()
+
+    def test_created_at_keeps_time_zone_on_postgresql(self) -> None:
+        """The added column should match the model's timezone-aware type and default to UTC."""
+        ddl = _created_at_ddl(postgresql.dialect())
+
+        assert "created_at TIMESTAMP WITH TIME ZONE NOT NULL" in ddl
+        assert ddl.endswith("DEFAULT '1970-01-01 00:00:00+00:00'")
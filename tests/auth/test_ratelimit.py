@@ -0,0 +1,122 @@
+"""Tests for token-bucket rate limiting.
+
+Tests bursts, refill, LRU key eviction and the per-route 429 response.
+"""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.auth.ratelimit import RouteRateLimiter, TokenBucketLimiter
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_request(host: str = "203.0.113.7") -> Request:
+    """Build a minimal request carrying a client address."""
+    return Request({"type": "http", "client": (host, 12345), "headers": []})
+
+
+class TestTokenBucketLimiter:
+    """Tests for TokenBucketLimiter."""
+
+    def test_allows_burst_then_limits(self) -> None:
+        """Hits up to capacity should pass, the next should be delayed."""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(capacity=3, rate=1.0, max_keys=10, clock=clock)
+
+        assert [limiter.hit("k") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.hit("k") == pytest.approx(1.0)
+
+    def test_refills_over_time(self) -> None:
+        """Tokens should be regained at the configured rate."""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter(capacity=1, rate=0.5, max_keys=10, clock=clock)
+        limiter.hit("k")
+
+        clock.now = 1.0
+        assert limiter.hit("k") > 0
+        clock.now = 4.0
+        assert limiter.hit("k") == 0.0
+
+    def test_keys_are_independent(self) -> None:
+        """Exhausting one key should not affect another."""
+        limiter = TokenBucketLimiter(capacity=1, rate=0.0, max_keys=10, clock=FakeClock())
+        limiter.hit("a")
+
+        assert limiter.hit("a") > 0
+        assert limiter.hit("b") == 0.0
+
+    def test_evicts_least_recently_used_keys(self) -> None:
+        """The store should never exceed max_keys."""
+        limiter = TokenBucketLimiter(capacity=1, rate=0.0, max_keys=2, clock=FakeClock())
+        limiter.hit("a")
+        limiter.hit("b")
+        limiter.hit("a")  # refresh "a"; "b" is now least recently used
+        limiter.hit("c")
+
+        assert len(limiter) == 2
+        assert limiter.evictions == 1
+        assert limiter.hit("a") > 0  # still tracked and exhausted
+        assert limiter.hit("b") == 0.0  # evicted, so starts fresh
+
+
+class TestRouteRateLimiter:
+    """Tests for RouteRateLimiter."""
+
+    def test_rejects_with_429_and_retry_after(self) -> None:
+        """Exceeding the per-email limit should raise 429 with Retry-After."""
+        limiter = RouteRateLimiter("login", per_minute=1, burst=2, max_keys=100)
+        request = make_request()
+        limiter.check(request, "user@example.com")
+        limiter.check(request, "USER@example.com")
+
+        with pytest.raises(HTTPException) as exc_info:
+            limiter.check(make_request("198.51.100.1"), "user@example.com")
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers is not None
+        assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+    def test_limits_per_ip_across_emails(self) -> None:
+        """One client address should not be able to cycle through emails."""
+        limiter = RouteRateLimiter("login", per_minute=1, burst=2, max_keys=100)
+        request = make_request()
+        limiter.check(request, "a@example.com")
+        limiter.check(request, "b@example.com")
+
+        with pytest.raises(HTTPException):
+            limiter.check(request, "c@example.com")
+
+    def test_throttled_ip_cannot_drain_victim_email(self) -> None:
+        """Requests rejected for their IP should not be charged to the email."""
+        limiter = RouteRateLimiter("login", per_minute=1, burst=3, max_keys=100)
+        attacker = make_request()
+        limiter.check(attacker, "probe@example.com")
+
+        rejected = 0
+        for _ in range(10):
+            try:
+                limiter.check(attacker, "victim@example.com")
+            except HTTPException:
+                rejected += 1
+
+        limiter.check(make_request("198.51.100.1"), "victim@example.com")
+        assert rejected == 8
+
+    def test_disabled_limiter_never_rejects(self) -> None:
+        """A disabled limiter should be a no-op."""
+        limiter = RouteRateLimiter("login", per_minute=0, burst=1, max_keys=1, enabled=False)
+
+        for _ in range(10):
+            limiter.check(make_request(), "a@example.com")
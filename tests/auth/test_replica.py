@@ -0,0 +1,113 @@
+"""Tests for replica reads with read-your-writes stickiness.
+
+Two SQLite files stand in for the primary and a lagging replica: rows are
+written to the primary only and copied to the replica explicitly.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.auth import dependencies
+from src.auth.dependencies import get_current_principal, get_current_user
+from src.auth.models import User
+from src.auth.principal import principal_cache
+from src.auth.utils import create_access_token
+from src.core.database import Base
+from src.core.replica import recent_writes
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+
+class Databases:
+    """Primary and replica session factories."""
+
+    def __init__(
+        self, primary: async_sessionmaker[AsyncSession], replica: async_sessionmaker[AsyncSession]
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[Databases]:
+    """Create primary and replica databases and route the dependencies to them."""
+    engines = []
+    factories = []
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        engines.append(engine)
+        factories.append(async_sessionmaker(bind=engine, expire_on_commit=False))
+    monkeypatch.setattr(dependencies, "AsyncSessionLocal", factories[0])
+    monkeypatch.setattr(dependencies, "ReadSessionLocal", factories[1])
+    principal_cache.clear()
+    recent_writes.clear()
+    yield Databases(*factories)
+    for engine in engines:
+        await engine.dispose()
+
+
+async def _register_on_primary(databases: Databases) -> User:
+    async with databases.primary() as db:
+        user = User(email="a@example.com", username="alice", hashed_password="x", is_active=True)
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+
+async def _replicate(databases: Databases, user: User) -> None:
+    async with databases.replica() as db:
+        db.add(
+            User(
+                id=user.id,
+                email=user.email,
+                username=user.username,
+                hashed_password=user.hashed_password,
+                is_active=user.is_active,
+                created_at=user.created_at,
+            )
+        )
+        await db.commit()
+
+
+class TestReplicaReads:
+    """Tests for replica-backed user lookups."""
+
+    async def test_fresh_write_is_read_from_primary(self, databases: Databases) -> None:
+        """A just-registered user should resolve even though the replica lags."""
+        user = await _register_on_primary(databases)
+        token = create_access_token({"sub": user.id})
+
+        async with databases.replica() as replica:
+            principal = await get_current_principal(token)
+            entity = await get_current_user(token, replica)
+
+        assert principal.id == user.id
+        assert entity.email == "a@example.com"
+
+    async def test_reads_use_replica_once_window_passes(self, databases: Databases) -> None:
+        """Outside the read-your-writes window lookups should hit the replica."""
+        user = await _register_on_primary(databases)
+        token = create_access_token({"sub": user.id})
+        recent_writes.clear()
+        principal_cache.clear()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_principal(token)
+        assert exc_info.value.status_code == 401
+
+        await _replicate(databases, user)
+        recent_writes.clear()
+        principal = await get_current_principal(token)
+
+        assert principal.id == user.id
@@ -0,0 +1,102 @@
+"""Endpoint tests for /logout and /logout/all through the ASGI app."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest_asyncio
+
+from src.app import app
+from src.auth.hashing import password_hasher
+from src.auth.principal import principal_cache
+from src.auth.ratelimit import login_rate_limiter, register_rate_limiter
+from src.core.database import Base, engine
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+
+@pytest_asyncio.fixture
+async def client() -> AsyncGenerator[httpx.AsyncClient, None]:
+    """Client for the full application on a fresh copy of its in-memory database."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    password_hasher.shutdown()
+    principal_cache.clear()
+    login_rate_limiter.buckets.clear()
+    register_rate_limiter.buckets.clear()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+async def _login(client: httpx.AsyncClient, user_data: dict[str, str]) -> dict[str, str]:
+    response = await client.post(
+        "/login", json={"email": user_data["email"], "password": user_data["password"]}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def _refresh(client: httpx.AsyncClient, refresh_token: str) -> httpx.Response:
+    return await client.post("/refresh", json={"refresh_token": refresh_token})
+
+
+class TestLogout:
+    """Tests for POST /logout."""
+
+    async def test_revokes_presented_session(
+        self, client: httpx.AsyncClient, test_user_data: dict[str, str]
+    ) -> None:
+        """Logout should return 204 and the refresh token should stop working."""
+        await client.post("/register", json=test_user_data)
+        tokens = await _login(client, test_user_data)
+
+        response = await client.post("/logout", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 204
+        assert response.content == b""
+        assert (await _refresh(client, tokens["refresh_token"])).status_code == 401
+
+    async def test_unknown_token_is_rejected(self, client: httpx.AsyncClient) -> None:
+        """A refresh token that was never issued should get 404."""
+        response = await client.post("/logout", json={"refresh_token": "not-a-real-token"})
+
+        assert response.status_code == 404
+
+
+class TestLogoutAll:
+    """Tests for POST /logout/all."""
+
+    async def test_revokes_every_family(
+        self, client: httpx.AsyncClient, test_user_data: dict[str, str]
+    ) -> None:
+        """Every login of the user should be revoked."""
+        await client.post("/register", json=test_user_data)
+        sessions = [await _login(client, test_user_data) for _ in range(2)]
+        headers = {"Authorization": f"Bearer {sessions[0]['access_token']}"}
+
+        response = await client.post("/logout/all", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"revoked": 2}
+        for tokens in sessions:
+            assert (await _refresh(client, tokens["refresh_token"])).status_code == 401
+
+    async def test_requires_access_token(
+        self, client: httpx.AsyncClient, test_user_data: dict[str, str]
+    ) -> None:
+        """Requests without a bearer token, or with a refresh token, should get 401."""
+        await client.post("/register", json=test_user_data)
+        tokens = await _login(client, test_user_data)
+        refresh_auth = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+
+        anonymous = await client.post("/logout/all")
+        wrong_kind = await client.post("/logout/all", headers=refresh_auth)
+
+        assert anonymous.status_code == 401
+        assert wrong_kind.status_code == 401
+        assert (await _refresh(client, tokens["refresh_token"])).status_code == 200
@@ -0,0 +1,290 @@
+"""Tests for authentication service functions.
+
+Tests registration races, and refresh-token persistence, rotation, reuse
+detection and revocation in both token formats.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.auth import service
+from src.auth.models import RefreshToken, User
+from src.auth.schemas import UserRegisterRequest
+from src.auth.service import (
+    create_tokens,
+    refresh_access_token,
+    refresh_token_record,
+    register_user,
+    revoke_refresh_token,
+    revoke_user_refresh_tokens,
+)
+from src.auth.utils import hash_token, opaque_token_id
+from src.core.database import Base
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+async def _create_user(db: AsyncSession) -> User:
+    user = User(
+        email="test@example.com",
+        username="testuser",
+        hashed_password="not-a-real-hash",
+        is_active=True,
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def _issue(db: AsyncSession, user: User) -> str:
+    _, refresh_token = create_tokens(user)
+    db.add(refresh_token_record(user.id, refresh_token))
+    await db.commit()
+    return refresh_token
+
+
+@pytest.fixture(params=["jwt", "opaque"])
+def token_format(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run a test once per refresh-token format."""
+    monkeypatch.setattr(service.settings, "REFRESH_TOKEN_FORMAT", request.param)
+    return str(request.param)
+
+
+class TestRegistration:
+    """Tests for register_user."""
+
+    async def test_concurrent_duplicates_are_rejected_cleanly(self, tmp_path: Path) -> None:
+        """Racing registrations of one email should create one user and reject the rest with 400."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'register.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        request = UserRegisterRequest(
+            email="race@example.com", username="racer", password="Str0ng!Passw0rd"
+        )
+
+        async def attempt() -> User:
+            async with factory() as db:
+                return await register_user(db, request)
+
+        results = await asyncio.gather(*(attempt() for _ in range(4)), return_exceptions=True)
+
+        created = [result for result in results if isinstance(result, User)]
+        rejected = [result for result in results if isinstance(result, HTTPException)]
+        assert len(created) == 1
+        assert created[0].created_at is not None
+        assert len(rejected) == 3
+        assert all(error.status_code == 400 for error in rejected)
+        await engine.dispose()
+
+
+class TestRefreshTokens:
+    """Tests for refresh-token issue, refresh and revocation."""
+
+    async def test_opaque_record_uses_token_id_as_primary_key(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Opaque tokens should be stored under their embedded id."""
+        monkeypatch.setattr(service.settings, "REFRESH_TOKEN_FORMAT", "opaque")
+        user = await _create_user(db_session)
+        refresh_token = await _issue(db_session, user)
+
+        row = await db_session.get(RefreshToken, opaque_token_id(refresh_token))
+        assert row is not None
+        assert row.token_hash == hash_token(refresh_token)
+
+    @pytest.mark.usefixtures("token_format")
+    async def test_refresh_reuses_token_without_rotation(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """With rotation disabled the same refresh token should be returned."""
+        monkeypatch.setattr(service.settings, "REFRESH_TOKEN_ROTATION", False)
+        user = await _create_user(db_session)
+        refresh_token = await _issue(db_session, user)
+
+        access_token, returned = await refresh_access_token(db_session, refresh_token)
+
+        assert access_token
+        assert returned == refresh_token
+
+    @pytest.mark.usefixtures("token_format")
+    async def test_concurrent_refreshes_share_lookups_in_own_session(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Without rotation, concurrent refreshes should share lookups run in new sessions."""
+        monkeypatch.setattr(service.settings, "REFRESH_TOKEN_ROTATION", False)
+        user = await _create_user(db_session)
+        refresh_token = await _issue(db_session, user)
+        sessions = async_sessionmaker(bind=db_session.bind, expire_on_commit=False)
+        executed = service.refresh_token_lookups.executed
+
+        async def _refresh() -> tuple[str, str]:
+            async with sessions() as db:
+                return await refresh_access_token(db, refresh_token, session_factory=sessions)
+
+        results = await asyncio.gather(*(_refresh() for _ in range(4)))
+
+        assert {returned for _, returned in results} == {refresh_token}
+        assert service.refresh_token_lookups.executed == executed + 1
+
+    @pytest.mark.usefixtures("token_format")
+    async def test_rotation_issues_successor_in_same_family(self, db_session: AsyncSession) -> None:
+        """Rotation should revoke the presented token and store its successor."""
+        user = await _create_user(db_session)
+        refresh_token = await _issue(db_session, user)
+
+        access_token, rotated = await refresh_access_token(db_session, refresh_token)
+
+        rows = {
+            row.token_hash: row
+            for row in (await db_session.execute(select(RefreshToken))).scalars()
+        }
+        old, new = rows[hash_token(refresh_token)], rows[hash_token(rotated)]
+        assert access_token
+        assert rotated != refresh_token
+        assert old.revoked is True
+        assert new.revoked is False
+        assert new.family_id == old.family_id == old.id
+
+    @pytest.mark.usefixtures("token_format")
+    async def test_reuse_revokes_whole_family(self, db_session: AsyncSession) -> None:
+        """Replaying a rotated token should revoke every token in its family."""
+        user = await _create_user(db_session)
+        first = await _issue(db_session, user)
+        _, second = await refresh_access_token(db_session, first)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await refresh_access_token(db_session, first)
+        assert exc_info.value.detail == "Refresh token reuse detected"
+
+        with pytest.raises(HTTPException):
+            await refresh_access_token(db_session, second)
+
+    @pytest.mark.usefixtures("token_format")
+    async def test_concurrent_replay_revokes_family(self, tmp_path: Path) -> None:
+        """Of two racing refreshes with one token, the loser should revoke the family."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'rotation.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with factory() as db:
+            refresh_token = await _issue(db, await _create_user(db))
+
+        async def attempt() -> tuple[str, str]:
+            async with factory() as db:
+                return await refresh_access_token(db, refresh_token)
+
+        results = await asyncio.gather(attempt(), attempt(), return_exceptions=True)
+
+        rotated = [result for result in results if isinstance(result, tuple)]
+        rejected = [result for result in results if isinstance(result, HTTPException)]
+        assert len(rotated) == len(rejected) == 1
+        assert rejected[0].detail == "Refresh token reuse detected"
+        async with factory() as db:
+            with pytest.raises(HTTPException):
+                await refresh_access_token(db, rotated[0][1])
+        await engine.dispose()
+
+    @pytest.mark.usefixtures("token_format")
+    async def test_refresh_rejects_revoked_token(self, db_session: AsyncSession) -> None:
+        """Revoked refresh tokens should be refused."""
+        user = await _create_user(db_session)
+        refresh_token = await _issue(db_session, user)
+
+        await revoke_refresh_token(db_session, refresh_token)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await refresh_access_token(db_session, refresh_token)
+        assert exc_info.value.status_code == 401
+
+    async def test_opaque_token_with_wrong_secret_is_rejected(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A known id with a forged secret should not authenticate."""
+        monkeypatch.setattr(service.settings, "REFRESH_TOKEN_FORMAT", "opaque")
+        user = await _create_user(db_session)
+        refresh_token = await _issue(db_session, user)
+        token_id = refresh_token.split(".")[0]
+
+        with pytest.raises(HTTPException) as exc_info:
+            await refresh_access_token(db_session, f"{token_id}.forged-secret")
+        assert exc_info.value.status_code == 401
+
+    async def test_rotation_without_update_returning(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Dialects without UPDATE ... RETURNING should rotate via select-then-update."""
+        monkeypatch.setattr(db_session.get_bind().dialect, "update_returning", False)
+        user = await _create_user(db_session)
+        refresh_token = await _issue(db_session, user)
+
+        _, rotated = await refresh_access_token(db_session, refresh_token)
+
+        assert rotated != refresh_token
+        with pytest.raises(HTTPException):
+            await refresh_access_token(db_session, refresh_token)
+
+
+class TestRevocation:
+    """Tests for logout and bulk session revocation."""
+
+    async def test_logout_revokes_whole_session(self, db_session: AsyncSession) -> None:
+        """Logging out with the newest token should also kill its rotated ancestors."""
+        user = await _create_user(db_session)
+        first = await _issue(db_session, user)
+        _, second = await refresh_access_token(db_session, first)
+        other = await _issue(db_session, user)
+
+        await revoke_refresh_token(db_session, second)
+
+        with pytest.raises(HTTPException):
+            await refresh_access_token(db_session, second)
+        _, rotated = await refresh_access_token(db_session, other)
+        assert rotated
+
+    async def test_logout_unknown_token_is_404(self, db_session: AsyncSession) -> None:
+        """Revoking a token that was never issued should report not found."""
+        with pytest.raises(HTTPException) as exc_info:
+            await revoke_refresh_token(db_session, "unknown-token")
+        assert exc_info.value.status_code == 404
+
+    async def test_revoke_all_user_tokens(self, db_session: AsyncSession) -> None:
+        """Every live token of the user should be revoked in one statement."""
+        user = await _create_user(db_session)
+        tokens = [await _issue(db_session, user) for _ in range(3)]
+
+        assert await revoke_user_refresh_tokens(db_session, user.id) == 3
+        assert await revoke_user_refresh_tokens(db_session, user.id) == 0
+        for token in tokens:
+            with pytest.raises(HTTPException):
+                await refresh_access_token(db_session, token)
+
+    async def test_revoke_tokens_issued_before(self, db_session: AsyncSession) -> None:
+        """Only tokens issued before the cut-off should be revoked."""
+        user = await _create_user(db_session)
+        old = await _issue(db_session, user)
+        (
+            await db_session.execute(
+                select(RefreshToken).where(RefreshToken.token_hash == hash_token(old))
+            )
+        ).scalar_one().created_at = datetime.now(UTC) - timedelta(days=1)
+        await db_session.commit()
+        new = await _issue(db_session, user)
+
+        cutoff = datetime.now(UTC) - timedelta(hours=1)
+        assert await revoke_user_refresh_tokens(db_session, user.id, issued_before=cutoff) == 1
+
+        with pytest.raises(HTTPException):
+            await refresh_access_token(db_session, old)
+        _, rotated = await refresh_access_token(db_session, new)
+        assert rotated
@@ -0,0 +1,172 @@
+"""Tests for hash-sharded user and refresh-token storage.
+
+Three SQLite files act as data shards and a fourth as the email directory.
+The service functions run unchanged against the sharded session.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.auth.models import RefreshToken, User, UserDirectoryEntry
+from src.auth.principal import principal_cache
+from src.auth.schemas import UserRegisterRequest
+from src.auth.service import (
+    authenticate_user,
+    create_tokens,
+    refresh_access_token,
+    refresh_token_record,
+    register_user,
+    revoke_refresh_token,
+)
+from src.core.database import Base
+from src.core.sharding import ShardRouter, is_sharded, shard_of
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+PASSWORD = "Str0ng!Passw0rd"
+
+
+@pytest_asyncio.fixture
+async def router(tmp_path: Path) -> AsyncIterator[ShardRouter]:
+    """Build a router over a directory database and three data shards."""
+    engines = {
+        name: create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        for name in ("directory", "shard-0", "shard-1", "shard-2")
+    }
+    for engine in engines.values():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    directory = engines.pop("directory")
+    shard_router = ShardRouter(directory, engines)
+    shard_router.register(User, User.id)
+    shard_router.register(RefreshToken, RefreshToken.user_id)
+    shard_router.register_global(UserDirectoryEntry)
+    principal_cache.clear()
+    yield shard_router
+    for engine in shard_router.engines.values():
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db(router: ShardRouter) -> AsyncIterator[AsyncSession]:
+    """Yield a sharded session."""
+    factory = async_sessionmaker(
+        class_=AsyncSession, expire_on_commit=False, autoflush=False, **router.session_options()
+    )
+    async with factory() as session:
+        yield session
+
+
+async def _rows(router: ShardRouter, shard_id: str, model: type) -> int:
+    async with router.engines[shard_id].connect() as conn:
+        return int((await conn.execute(select(func.count()).select_from(model))).scalar_one())
+
+
+async def _register(db: AsyncSession, index: int) -> User:
+    request = UserRegisterRequest(
+        email=f"user{index}@example.com", username=f"user{index}", password=PASSWORD
+    )
+    return await register_user(db, request)
+
+
+class TestShardedStorage:
+    """Tests for the service layer on sharded storage."""
+
+    async def test_register_writes_user_to_its_shard_and_directory(
+        self, db: AsyncSession, router: ShardRouter
+    ) -> None:
+        """The user row should land on its hash shard and the email in the directory."""
+        assert is_sharded(db)
+        user = await _register(db, 0)
+        home = router.shard_for(user.id)
+
+        assert shard_of(user) == home
+        assert await _rows(router, home, User) == 1
+        assert sum([await _rows(router, shard, User) for shard in router.data_shards]) == 1
+        assert await _rows(router, router.directory_id, UserDirectoryEntry) == 1
+        assert await _rows(router, router.directory_id, User) == 0
+
+    async def test_duplicate_email_is_rejected_across_shards(self, db: AsyncSession) -> None:
+        """Uniqueness should hold even when the new user would hash elsewhere."""
+        await _register(db, 0)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await register_user(
+                db,
+                UserRegisterRequest(email="user0@example.com", username="other", password=PASSWORD),
+            )
+        assert exc_info.value.status_code == 400
+
+    async def test_concurrent_duplicates_are_rejected_cleanly(self, router: ShardRouter) -> None:
+        """Racing registrations of one email should create one user and reject the rest with 400."""
+        factory = async_sessionmaker(
+            class_=AsyncSession, expire_on_commit=False, **router.session_options()
+        )
+
+        async def attempt() -> User:
+            async with factory() as session:
+                return await _register(session, 0)
+
+        results = await asyncio.gather(*(attempt() for _ in range(4)), return_exceptions=True)
+
+        rejected = [result for result in results if isinstance(result, HTTPException)]
+        assert len([result for result in results if isinstance(result, User)]) == 1
+        assert len(rejected) == 3
+        assert all(error.status_code == 400 for error in rejected)
+        assert sum([await _rows(router, shard, User) for shard in router.data_shards]) == 1
+        assert await _rows(router, router.directory_id, UserDirectoryEntry) == 1
+
+    async def test_failed_user_write_releases_reservation(
+        self, db: AsyncSession, router: ShardRouter
+    ) -> None:
+        """If the shard write fails, the email should be free to register again."""
+        for shard in router.data_shards:
+            async with router.engines[shard].begin() as conn:
+                await conn.run_sync(User.__table__.drop)
+
+        with pytest.raises(OperationalError):
+            await _register(db, 0)
+
+        assert await _rows(router, router.directory_id, UserDirectoryEntry) == 0
+
+    async def test_authenticate_resolves_shard_by_email(self, db: AsyncSession) -> None:
+        """Login by email should find users on any shard."""
+        users = [await _register(db, i) for i in range(12)]
+
+        for i, user in enumerate(users):
+            assert (await authenticate_user(db, f"user{i}@example.com", PASSWORD)).id == user.id
+        with pytest.raises(HTTPException) as exc_info:
+            await authenticate_user(db, "nobody@example.com", PASSWORD)
+        assert exc_info.value.status_code == 401
+
+    async def test_refresh_tokens_are_colocated_with_user(
+        self, db: AsyncSession, router: ShardRouter
+    ) -> None:
+        """Issued and rotated tokens should stay on the user's shard."""
+        user = await _register(db, 0)
+        _, refresh_token = create_tokens(user)
+        db.add(refresh_token_record(user.id, refresh_token))
+        await db.commit()
+
+        _, rotated = await refresh_access_token(db, refresh_token)
+        home = router.shard_for(user.id)
+
+        assert rotated != refresh_token
+        assert await _rows(router, home, RefreshToken) == 2
+        assert sum([await _rows(router, shard, RefreshToken) for shard in router.data_shards]) == 2
+
+        await revoke_refresh_token(db, rotated)
+        with pytest.raises(HTTPException) as exc_info:
+            await refresh_access_token(db, rotated)
+        assert exc_info.value.status_code == 401
@@ -0,0 +1,102 @@
+"""Tests for the background refresh-token sweeper."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.auth.models import RefreshToken, User
+from src.auth.sweeper import RefreshTokenSweeper
+
+
+async def _seed(db: AsyncSession) -> None:
+    """Create one user with live, revoked, rotated, recently expired and long-expired tokens."""
+    user = User(email="a@example.com", username="alice", hashed_password="x", is_active=True)
+    db.add(user)
+    await db.flush()
+    now = datetime.now(UTC)
+    rows = [
+        ("live", now + timedelta(days=1), False),
+        ("revoked", now + timedelta(days=1), True),
+        ("recent", now - timedelta(hours=1), False),
+    ] + [(f"old{i}", now - timedelta(days=3), False) for i in range(5)]
+    # A rotated token whose successor is still live must be kept for reuse detection.
+    rows += [("rotated", now + timedelta(days=1), True)]
+    families = {"rotated": "live"}
+    for name, expires_at, revoked in rows:
+        db.add(
+            RefreshToken(
+                id=name,
+                token_hash=name.ljust(64, "0"),
+                user_id=user.id,
+                family_id=families.get(name, name),
+                expires_at=expires_at,
+                revoked=revoked,
+            )
+        )
+    await db.commit()
+
+
+def _sweeper(db_session: AsyncSession, **overrides: float) -> RefreshTokenSweeper:
+    bind = db_session.bind
+    options: dict[str, float] = {
+        "interval": 60.0,
+        "batch_size": 2,
+        "batch_pause": 0.0,
+        "retention_hours": 24.0,
+    }
+    options.update(overrides)
+    return RefreshTokenSweeper(
+        async_sessionmaker(bind=bind, expire_on_commit=False),
+        interval=options["interval"],
+        batch_size=int(options["batch_size"]),
+        batch_pause=options["batch_pause"],
+        retention_hours=options["retention_hours"],
+    )
+
+
+class TestRefreshTokenSweeper:
+    """Tests for RefreshTokenSweeper."""
+
+    async def test_pass_deletes_revoked_and_expired_past_retention(
+        self, db_session: AsyncSession
+    ) -> None:
+        """Live, recently expired and live-family tokens should survive a pass."""
+        await _seed(db_session)
+        sweeper = _sweeper(db_session)
+
+        deleted = await sweeper.sweep_once()
+
+        remaining = set((await db_session.execute(select(RefreshToken.id))).scalars())
+        assert deleted == 6
+        assert remaining == {"live", "recent", "rotated"}
+        assert sweeper.stats()["last_deleted"] == 6
+        assert sweeper.stats()["passes"] == 1
+
+    async def test_second_pass_is_a_no_op(self, db_session: AsyncSession) -> None:
+        """A pass with nothing to delete should report zero rows."""
+        await _seed(db_session)
+        sweeper = _sweeper(db_session)
+
+        await sweeper.sweep_once()
+
+        assert await sweeper.sweep_once() == 0
+        assert sweeper.total_deleted == 6
+
+    async def test_start_and_stop(self, db_session: AsyncSession) -> None:
+        """The periodic task should run a pass on start and stop cleanly."""
+        await _seed(db_session)
+        sweeper = _sweeper(db_session)
+
+        sweeper.start()
+        for _ in range(50):
+            if sweeper.passes:
+                break
+            await asyncio.sleep(0.01)
+        await sweeper.stop()
+
+        assert sweeper.passes == 1
+        assert sweeper.stats()["running"] == 0
@@ -5,15 +5,21 @@ Tests password hashing, verification, and JWT token operations.
 
 from __future__ import annotations
 
+import time
 from datetime import timedelta
 
 import pytest
 
+from src.auth import utils
 from src.auth.utils import (
     create_access_token,
+    create_opaque_refresh_token,
     create_refresh_token,
     decode_token,
     get_password_hash,
+    hash_token,
+    opaque_token_id,
+    token_cache,
     verify_password,
 )
 
@@ -115,6 +121,22 @@ class TestJWTTokens:
         assert payload["type"] == "refresh"
         assert "exp" in payload
 
+    def test_refresh_tokens_are_unique(self) -> None:
+        """Refresh tokens issued back to back should differ (random jti)."""
+        data = {"sub": "user123"}
+
+        assert create_refresh_token(data) != create_refresh_token(data)
+
+    def test_hash_token_is_fixed_width_digest(self) -> None:
+        """Token digests should be 64-character hex strings."""
+        token = create_refresh_token({"sub": "user123"})
+
+        digest = hash_token(token)
+
+        assert len(digest) == 64
+        assert digest == hash_token(token)
+        assert digest != hash_token(token + "x")
+
     def test_access_token_with_custom_expiry(self) -> None:
         """Access token should respect custom expiry delta."""
         data = {"sub": "user123"}
@@ -135,3 +157,67 @@ class TestJWTTokens:
             decode_token(invalid_token)
 
         assert exc_info.value.status_code == 401
+
+
+class TestOpaqueRefreshTokens:
+    """Tests for the opaque ``<id>.<secret>`` refresh-token format."""
+
+    def test_opaque_token_carries_row_id(self) -> None:
+        """The id part should be recoverable from an opaque token."""
+        token = create_opaque_refresh_token()
+        token_id, secret = token.split(".")
+
+        assert opaque_token_id(token) == token_id
+        assert len(token_id) == 36
+        assert len(secret) >= 43
+
+    def test_opaque_tokens_are_unique(self) -> None:
+        """Each opaque token should have its own id and secret."""
+        assert create_opaque_refresh_token() != create_opaque_refresh_token()
+
+    def test_jwt_and_garbage_have_no_opaque_id(self) -> None:
+        """JWTs and malformed strings should not parse as opaque tokens."""
+        assert opaque_token_id(create_refresh_token({"sub": "user123"})) is None
+        assert opaque_token_id("not-a-token") is None
+        assert opaque_token_id("a" * 36 + ".") is None
+
+
+class TestTokenCache:
+    """Tests for the opt-in verified-token cache in decode_token."""
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Enable a small token cache for each test."""
+        token_cache.clear()
+        monkeypatch.setattr(token_cache, "max_size", 8)
+
+    def test_repeated_decode_is_served_from_cache(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The second decode of the same token should skip JWT verification."""
+        token = create_access_token({"sub": "user123"})
+        first = decode_token(token)
+
+        def fail_decode(*args: object, **kwargs: object) -> None:
+            raise AssertionError("jwt.decode should not be called on a cache hit")
+
+        monkeypatch.setattr(utils.jwt, "decode", fail_decode)
+        second = decode_token(token)
+
+        assert second == first
+        assert token_cache.hits == 1
+
+    def test_cached_entry_does_not_outlive_exp(self) -> None:
+        """Cached entries should expire together with the token."""
+        token = create_access_token({"sub": "user123"}, expires_delta=timedelta(seconds=60))
+        decode_token(token)
+
+        expires_at, _ = next(iter(token_cache._data.values()))
+        assert expires_at <= time.monotonic() + 60
+
+    def test_invalid_token_is_not_cached(self) -> None:
+        """Rejected tokens should never enter the cache."""
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException):
+            decode_token("invalid.token.string")
+
+        assert len(token_cache) == 0
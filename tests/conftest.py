@@ -15,6 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 # Set test environment before importing app modules
 os.environ["SECRET_KEY"] = "test-secret-key-for-testing-only"
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+# Accidental relationship lazy loads fail the tests (see src.core.querybudget)
+os.environ["STRICT_LAZY_LOADING"] = "true"
 
 from src.core.database import Base
 
@@ -0,0 +1,72 @@
+"""Tests for the bounded TTL/LRU cache."""
+
+from __future__ import annotations
+
+from src.core.cache import TTLCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_get_set_and_counters(self) -> None:
+        """Hits and misses should be counted."""
+        cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=5, clock=FakeClock())
+
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire(self) -> None:
+        """Entries should not be served past their TTL."""
+        clock = FakeClock()
+        cache: TTLCache[str, int] = TTLCache(max_size=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=1)
+
+        clock.now = 2
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        clock.now = 5
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self) -> None:
+        """The cache should not grow beyond max_size."""
+        cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=60, clock=FakeClock())
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.evictions == 1
+
+    def test_invalidate(self) -> None:
+        """Invalidated keys should miss."""
+        cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.invalidate("a")
+        cache.invalidate("missing")
+
+        assert cache.get("a") is None
+
+    def test_zero_size_disables_cache(self) -> None:
+        """A cache with max_size 0 should never store entries."""
+        cache: TTLCache[str, int] = TTLCache(max_size=0, ttl=60)
+        cache.set("a", 1)
+
+        assert not cache.enabled
+        assert cache.get("a") is None
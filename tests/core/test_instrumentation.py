@@ -0,0 +1,58 @@
+"""Tests for request and database instrumentation."""
+
+from __future__ import annotations
+
+import contextlib
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.instrumentation import RequestMetricsMiddleware, instrument_engine, metrics
+
+
+class TestRequestMetricsMiddleware:
+    """Tests for RequestMetricsMiddleware."""
+
+    async def test_labels_requests_by_route_template(self) -> None:
+        """Path parameters should not leak into labels; unknown paths share one label."""
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int) -> dict[str, int]:
+            return {"id": item_id}
+
+        app.add_middleware(RequestMetricsMiddleware)
+        metrics.requests.reset()
+        metrics.request_seconds.reset()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/items/1")
+            await client.get("/items/2")
+            await client.get("/missing")
+
+        assert metrics.requests.labels("GET", "/items/{item_id}", "200").value == 2
+        assert metrics.requests.labels("GET", "unmatched", "404").value == 1
+        assert metrics.request_seconds.labels("GET", "/items/{item_id}").count == 2
+
+
+class TestInstrumentEngine:
+    """Tests for instrument_engine."""
+
+    async def test_records_statement_latency_by_kind(self) -> None:
+        """Executed statements should be timed under their leading keyword, failures included."""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        instrument_engine(engine.sync_engine)
+        metrics.db_execute_seconds.reset()
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with contextlib.suppress(OperationalError):
+                await conn.execute(text("SELECT * FROM missing_table"))
+            await conn.execute(text("select 2"))
+        await engine.dispose()
+
+        assert metrics.db_execute_seconds.labels("SELECT").count == 2
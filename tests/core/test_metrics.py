@@ -0,0 +1,97 @@
+"""Tests for in-process metric primitives."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.core.metrics import Counter, Histogram, Registry
+
+
+class TestHistogram:
+    """Tests for Histogram."""
+
+    def test_observations_land_in_cumulative_buckets(self) -> None:
+        """Each bucket should count observations at or below its bound."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+        assert histogram.count == 4
+        assert histogram.sum == 2.65
+
+    def test_quantile_returns_bucket_bound(self) -> None:
+        """Quantiles should resolve to the bound of the bucket holding the rank."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for _ in range(99):
+            histogram.observe(0.01)
+        histogram.observe(5.0)
+
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(1.0) == float("inf")
+        assert Histogram().quantile(0.5) == 0.0
+
+    def test_stats_and_reset(self) -> None:
+        """Stats should expose bucket counts keyed by bound, and reset should clear them."""
+        histogram = Histogram(buckets=(1.0,))
+        histogram.observe(0.5)
+
+        assert histogram.stats()["buckets"] == {"1.0": 1, "+Inf": 1}
+
+        histogram.reset()
+        assert histogram.count == 0
+        assert histogram.stats()["buckets"] == {"1.0": 0, "+Inf": 0}
+
+
+class TestRegistry:
+    """Tests for Registry rendering."""
+
+    def test_renders_labelled_counters(self) -> None:
+        """Counters should render one escaped sample per label combination."""
+        registry = Registry()
+        logins = registry.counter("logins_total", "Logins.", ("outcome",))
+        logins.labels("success").inc()
+        logins.labels("success").inc(2)
+        logins.labels('we"ird').inc()
+
+        text = registry.render()
+
+        assert "# HELP logins_total Logins.\n# TYPE logins_total counter\n" in text
+        assert 'logins_total{outcome="success"} 3.0\n' in text
+        assert 'logins_total{outcome="we\\"ird"} 1.0\n' in text
+
+    def test_renders_histograms_with_le_buckets(self) -> None:
+        """Histograms should render cumulative buckets, sum and count."""
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        latency.labels("/me").observe(0.05)
+        latency.labels("/me").observe(0.5)
+
+        lines = registry.render().splitlines()
+
+        assert 'latency_seconds_bucket{route="/me",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{route="/me",le="1.0"} 2' in lines
+        assert 'latency_seconds_bucket{route="/me",le="+Inf"} 2' in lines
+        assert 'latency_seconds_sum{route="/me"} 0.55' in lines
+        assert 'latency_seconds_count{route="/me"} 2' in lines
+
+    def test_exposes_existing_metrics_and_callables(self) -> None:
+        """Unlabelled metrics owned elsewhere should render from their current value."""
+        registry = Registry()
+        counter = Counter()
+        counter.inc()
+        registry.expose("jobs_total", "Jobs.", "counter", counter)
+        registry.expose("queue_depth", "Depth.", "gauge", lambda: 7)
+
+        lines = registry.render().splitlines()
+
+        assert "jobs_total 1.0" in lines
+        assert "# TYPE queue_depth gauge" in lines
+        assert "queue_depth 7.0" in lines
+
+    def test_label_count_is_checked(self) -> None:
+        """Children must be addressed with one value per label name."""
+        family = Registry().counter("x_total", "X.", ("a", "b"))
+
+        with pytest.raises(ValueError):
+            family.labels("only-one")
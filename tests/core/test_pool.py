@@ -0,0 +1,103 @@
+"""Tests for the instrumented connection pool."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.database import _engine_options
+from src.core.pool import InstrumentedAsyncPool, pool_metrics, pool_stats
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture(autouse=True)
+def reset_pool_metrics() -> None:
+    """Start every test with empty pool telemetry."""
+    pool_metrics.reset()
+
+
+class TestInstrumentedAsyncPool:
+    """Tests for InstrumentedAsyncPool and pool_stats."""
+
+    async def test_checkouts_are_timed(self, tmp_path: Path) -> None:
+        """Every checkout should be counted and timed."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedAsyncPool
+        )
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        stats = pool_stats(engine.pool)
+        assert stats["checkouts"] == 3
+        assert stats["checkout_seconds"]["count"] == 3
+        assert stats["checked_out"] == 0
+        await engine.dispose()
+
+    async def test_exhaustion_is_counted(self, tmp_path: Path) -> None:
+        """A checkout that times out should be recorded while the pool is full."""
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedAsyncPool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        async with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+            stats = pool_stats(engine.pool)
+
+        assert stats["checked_out"] == 1
+        assert stats["max_connections"] == 1
+        assert stats["timeouts"] == 1
+        await engine.dispose()
+
+    async def test_telemetry_is_kept_per_pool(self, tmp_path: Path) -> None:
+        """Each pool should report only its own checkouts, also across dispose()."""
+        engines = [
+            create_async_engine(
+                f"sqlite+aiosqlite:///{tmp_path / name}.db", poolclass=InstrumentedAsyncPool
+            )
+            for name in ("busy", "idle")
+        ]
+        busy, idle = engines
+        for _ in range(2):
+            async with busy.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        await busy.dispose()
+
+        assert pool_stats(busy.pool)["checkouts"] == 2
+        assert pool_stats(busy.pool)["wait_seconds"]["count"] == 2
+        assert pool_stats(idle.pool)["checkouts"] == 0
+        assert pool_stats(idle.pool)["wait_seconds"]["count"] == 0
+        assert pool_metrics.checkouts == 2
+        for engine in engines:
+            await engine.dispose()
+
+
+class TestEngineOptions:
+    """Tests for pool configuration of the application engine."""
+
+    def test_file_database_uses_configured_pool(self) -> None:
+        """File-backed databases should get the instrumented, sized pool."""
+        options = _engine_options("sqlite+aiosqlite:///./app.db")
+
+        assert options["poolclass"] is InstrumentedAsyncPool
+        assert {
+            "pool_size",
+            "max_overflow",
+            "pool_timeout",
+            "pool_pre_ping",
+            "pool_recycle",
+        } <= set(options)
+
+    def test_memory_database_keeps_default_pool(self) -> None:
+        """In-memory SQLite should not receive queue-pool options."""
+        assert _engine_options("sqlite+aiosqlite:///:memory:") == {}
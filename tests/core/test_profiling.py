@@ -0,0 +1,149 @@
+"""Tests for on-demand profiling."""
+
+from __future__ import annotations
+
+import marshal
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.core import diagnostics
+from src.core.admin import router as admin_router
+from src.core.diagnostics import DIAGNOSTICS_HEADER
+from src.core.profiling import (
+    PROFILE_HEADER,
+    ProfileRecorder,
+    ProfilingMiddleware,
+    SamplingProfiler,
+    collapse_stack,
+    profile_recorder,
+)
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_collapse_stack_lists_outermost_frame_first() -> None:
+    """The calling function should be the last entry of its own collapsed stack."""
+    stack = collapse_stack(sys._getframe())
+
+    assert stack.split(";")[-1].startswith("test_collapse_stack_lists_outermost_frame_first (")
+
+
+def test_sampling_profiler_samples_target_thread() -> None:
+    """Samples should be taken from the target thread's stack."""
+    worker = threading.Thread(target=_spin, args=(0.3,))
+    worker.start()
+    assert worker.ident is not None
+    sampler = SamplingProfiler(worker.ident, interval=0.001)
+    sampler.start()
+    worker.join()
+    stacks = sampler.stop()
+
+    assert stacks
+    assert all("_spin (" in stack for stack in stacks)
+
+
+class TestProfileRecorder:
+    """Tests for ProfileRecorder."""
+
+    def test_runs_one_profile_at_a_time(self) -> None:
+        """A second profile should not start while one is running."""
+        recorder = ProfileRecorder(history_size=4)
+        active = recorder.start("cprofile")
+        assert active is not None
+
+        assert recorder.start("sample") is None
+        recorder.finish(active)
+        assert not recorder.busy
+
+    def test_keeps_newest_profiles(self) -> None:
+        """Only the newest ``history_size`` profiles should be kept."""
+        recorder = ProfileRecorder(history_size=2)
+        ids = []
+        for _ in range(3):
+            active = recorder.start("cprofile")
+            assert active is not None
+            ids.append(recorder.finish(active).id)
+
+        assert [profile.id for profile in recorder.profiles()] == ids[:0:-1]
+        assert recorder.get(ids[0]) is None
+
+    def test_renders_cprofile_formats(self) -> None:
+        """cProfile results should render as pstats and text, not collapsed stacks."""
+        recorder = ProfileRecorder(history_size=1)
+        active = recorder.start("cprofile")
+        assert active is not None
+        _spin(0.01)
+        profile = recorder.finish(active, route="/login")
+
+        stats = marshal.loads(profile.render())
+        assert any(function == "_spin" for _, _, function in stats)
+        assert "_spin" in profile.render("text").decode()
+        with pytest.raises(ValueError):
+            profile.render("collapsed")
+
+
+class TestProfilingEndpoints:
+    """Tests for ProfilingMiddleware and the /admin profile endpoints."""
+
+    @staticmethod
+    def _app() -> FastAPI:
+        app = FastAPI()
+        app.include_router(admin_router)
+
+        @app.get("/work")
+        async def work() -> dict[str, str]:
+            _spin(0.01)
+            return {"status": "ok"}
+
+        app.add_middleware(ProfilingMiddleware)
+        return app
+
+    async def test_profiles_single_request(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A trusted X-Profile request should be profiled and its profile retrievable."""
+        monkeypatch.setattr(diagnostics.settings, "DIAGNOSTICS_TOKEN", "s3cret")
+        token = {DIAGNOSTICS_HEADER: "s3cret"}
+
+        transport = httpx.ASGITransport(app=self._app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            untrusted = await client.get("/work", headers={PROFILE_HEADER: "cprofile"})
+            profiled = await client.get("/work", headers={**token, PROFILE_HEADER: "cprofile"})
+            profile_id = profiled.headers["x-profile-id"]
+            text = await client.get(
+                f"/admin/profiles/{profile_id}", params={"format": "text"}, headers=token
+            )
+            wrong_format = await client.get(
+                f"/admin/profiles/{profile_id}", params={"format": "collapsed"}, headers=token
+            )
+
+        assert "x-profile-id" not in untrusted.headers
+        profile = profile_recorder.get(profile_id)
+        assert profile is not None and profile.route == "/work"
+        assert text.status_code == 200
+        assert "_spin" in text.text
+        assert wrong_format.status_code == 400
+
+    async def test_profiles_time_boxed_window(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """POST /admin/profile should return collapsed stacks sampled over the window."""
+        monkeypatch.setattr(diagnostics.settings, "DIAGNOSTICS_TOKEN", "s3cret")
+
+        transport = httpx.ASGITransport(app=self._app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/admin/profile",
+                params={"seconds": 0.1, "interval_ms": 1},
+                headers={DIAGNOSTICS_HEADER: "s3cret"},
+            )
+
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        assert lines
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
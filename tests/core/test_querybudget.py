@@ -0,0 +1,139 @@
+"""Tests for query budgets and the strict lazy-load guard."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.app import app
+from src.auth.hashing import password_hasher
+from src.auth.models import RefreshToken
+from src.auth.principal import principal_cache
+from src.auth.schemas import UserRegisterRequest
+from src.auth.service import create_tokens, refresh_token_record, register_user
+from src.core import querybudget
+from src.core.database import Base, engine
+from src.core.querybudget import QueryBudgetExceeded, count_queries
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+
+@pytest_asyncio.fixture
+async def client() -> AsyncGenerator[httpx.AsyncClient, None]:
+    """Client for the full application on a fresh copy of its in-memory database."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    password_hasher.shutdown()
+    principal_cache.clear()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+async def _login(client: httpx.AsyncClient, user_data: dict[str, str]) -> dict[str, str]:
+    await client.post("/register", json=user_data)
+    response = await client.post(
+        "/login", json={"email": user_data["email"], "password": user_data["password"]}
+    )
+    return response.json()
+
+
+class TestCountQueries:
+    """Tests for count_queries."""
+
+    async def test_counts_statements_in_context(self) -> None:
+        """Statements should be counted by every enclosing block, and only inside them."""
+        test_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        querybudget.install(test_engine.sync_engine)
+
+        async with test_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with count_queries() as outer:
+                await conn.execute(text("SELECT 2"))
+                with count_queries() as inner:
+                    await conn.execute(text("SELECT 3"))
+        await test_engine.dispose()
+
+        assert outer.statements == ["SELECT 2", "SELECT 3"]
+        assert inner.count == 1
+
+    async def test_raises_over_budget(self) -> None:
+        """Exceeding the budget should fail and list the statements."""
+        test_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        querybudget.install(test_engine.sync_engine)
+
+        with pytest.raises(QueryBudgetExceeded, match="SELECT 2"):
+            async with test_engine.connect() as conn:
+                with count_queries(max_queries=1):
+                    await conn.execute(text("SELECT 1"))
+                    await conn.execute(text("SELECT 2"))
+        await test_engine.dispose()
+
+
+class TestEndpointBudgets:
+    """Statement budgets for the hot endpoints."""
+
+    async def test_me_runs_at_most_one_query(
+        self, client: httpx.AsyncClient, test_user_data: dict[str, str]
+    ) -> None:
+        """/me should load the user with a single statement, and none once cached."""
+        tokens = await _login(client, test_user_data)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        principal_cache.clear()
+
+        with count_queries(max_queries=1):
+            cold = await client.get("/me", headers=headers)
+        with count_queries(max_queries=0):
+            cached = await client.get("/me", headers=headers)
+
+        assert cold.status_code == cached.status_code == 200
+
+    async def test_refresh_runs_at_most_two_queries(
+        self, client: httpx.AsyncClient, test_user_data: dict[str, str]
+    ) -> None:
+        """Rotation should claim the old token and insert its successor, nothing more."""
+        tokens = await _login(client, test_user_data)
+
+        with count_queries(max_queries=2):
+            response = await client.post(
+                "/refresh", json={"refresh_token": tokens["refresh_token"]}
+            )
+
+        assert response.status_code == 200
+
+
+class TestStrictLazyLoading:
+    """Tests for the STRICT_LAZY_LOADING guard."""
+
+    async def test_lazy_load_raises_in_strict_mode(
+        self,
+        db_session: AsyncSession,
+        test_user_data: dict[str, str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """An unloaded relationship should raise instead of emitting a query."""
+        user = await register_user(db_session, UserRegisterRequest(**test_user_data))
+        db_session.add(refresh_token_record(user.id, create_tokens(user)[1]))
+        await db_session.commit()
+        db_session.expunge_all()
+
+        monkeypatch.setattr(querybudget.settings, "STRICT_LAZY_LOADING", False)
+        token = (await db_session.execute(select(RefreshToken))).scalar_one()
+        lenient = await db_session.run_sync(lambda _: token.user)
+        db_session.expunge_all()
+
+        monkeypatch.setattr(querybudget.settings, "STRICT_LAZY_LOADING", True)
+        token = (await db_session.execute(select(RefreshToken))).scalar_one()
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            await db_session.run_sync(lambda _: token.user)
+
+        assert lenient is not None and lenient.id == user.id
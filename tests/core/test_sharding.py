@@ -0,0 +1,71 @@
+"""Tests for the consistent-hash ring and statement routing helpers."""
+
+from __future__ import annotations
+
+from collections import Counter
+
+import pytest
+from sqlalchemy import select
+
+from src.auth.models import RefreshToken
+from src.core.sharding import HashRing, _equality_values
+
+
+class TestHashRing:
+    """Tests for HashRing."""
+
+    def test_assignment_is_stable(self) -> None:
+        """The same key should map to the same shard across ring instances."""
+        first = HashRing(["a", "b", "c"])
+        second = HashRing(["a", "b", "c"])
+
+        assert all(
+            first.shard_for(f"user-{i}") == second.shard_for(f"user-{i}") for i in range(500)
+        )
+
+    def test_keys_spread_across_shards(self) -> None:
+        """Every shard should own a reasonable share of keys."""
+        ring = HashRing(["a", "b", "c", "d"])
+        counts = Counter(ring.shard_for(f"user-{i}") for i in range(4000))
+
+        assert set(counts) == {"a", "b", "c", "d"}
+        assert min(counts.values()) > 4000 / 4 * 0.6
+
+    def test_adding_a_shard_moves_few_keys(self) -> None:
+        """Growing from 4 to 5 shards should move roughly a fifth of the keys, all to the new one."""
+        before = HashRing(["a", "b", "c", "d"])
+        after = HashRing(["a", "b", "c", "d", "e"])
+        keys = [f"user-{i}" for i in range(4000)]
+        moved = [key for key in keys if before.shard_for(key) != after.shard_for(key)]
+
+        assert len(moved) < len(keys) * 0.3
+        assert all(after.shard_for(key) == "e" for key in moved)
+
+    def test_requires_a_shard(self) -> None:
+        """An empty ring should be rejected."""
+        with pytest.raises(ValueError):
+            HashRing([])
+
+
+class TestEqualityValues:
+    """Tests for extracting shard keys from WHERE clauses."""
+
+    def test_equality_in_conjunction(self) -> None:
+        """A top-level ``key == value`` term should pin the statement."""
+        stmt = select(RefreshToken).where(
+            RefreshToken.user_id == "u1", RefreshToken.revoked.is_(False)
+        )
+
+        assert _equality_values(stmt.whereclause, RefreshToken.user_id.expression) == ["u1"]
+
+    def test_in_list(self) -> None:
+        """``key IN (...)`` should pin the statement to each listed key."""
+        stmt = select(RefreshToken).where(RefreshToken.user_id.in_(["u1", "u2"]))
+
+        assert _equality_values(stmt.whereclause, RefreshToken.user_id.expression) == ["u1", "u2"]
+
+    def test_other_columns_do_not_pin(self) -> None:
+        """Filters that do not constrain the key should fan out."""
+        stmt = select(RefreshToken).where(RefreshToken.token_hash == "digest")
+
+        assert _equality_values(stmt.whereclause, RefreshToken.user_id.expression) == []
@@ -0,0 +1,77 @@
+"""Tests for single-flight call coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    async def test_concurrent_calls_share_one_execution(self) -> None:
+        """Concurrent callers with the same key should run the function once."""
+        flight: SingleFlight[str, int] = SingleFlight()
+        calls = 0
+
+        async def lookup() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 42
+
+        results = await asyncio.gather(*(flight.do("k", lookup) for _ in range(10)))
+
+        assert results == [42] * 10
+        assert calls == 1
+        assert flight.executed == 1
+        assert flight.shared == 9
+        assert flight.stats()["in_flight"] == 0
+
+    async def test_sequential_calls_are_not_cached(self) -> None:
+        """Once a call finishes, the next caller should run it again."""
+        flight: SingleFlight[str, int] = SingleFlight()
+        calls = 0
+
+        async def lookup() -> int:
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flight.do("k", lookup) == 1
+        assert await flight.do("k", lookup) == 2
+
+    async def test_exceptions_reach_every_caller(self) -> None:
+        """A failing shared call should raise in all waiting callers."""
+        flight: SingleFlight[str, int] = SingleFlight()
+
+        async def lookup() -> int:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.do("k", lookup) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    async def test_cancelling_one_caller_does_not_cancel_others(self) -> None:
+        """The shared call should survive the cancellation of its first caller."""
+        flight: SingleFlight[str, int] = SingleFlight()
+
+        async def lookup() -> int:
+            await asyncio.sleep(0.02)
+            return 7
+
+        first = asyncio.create_task(flight.do("k", lookup))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("k", lookup))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == 7
@@ -0,0 +1,139 @@
+"""Tests for the slow-query log and its admin endpoint."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.core import diagnostics
+from src.core.admin import router as admin_router
+from src.core.diagnostics import DIAGNOSTICS_HEADER
+from src.core.slowlog import RequestRouteMiddleware, SlowQueryLog, redact, slow_query_log
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    import pytest
+
+
+@pytest_asyncio.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """In-memory SQLite database with one indexed table."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE tokens (id INTEGER PRIMARY KEY, user_id TEXT)"))
+        await conn.execute(text("CREATE INDEX ix_tokens_user_id ON tokens (user_id)"))
+    yield engine
+    await engine.dispose()
+
+
+def test_redact_keeps_structure_but_not_values() -> None:
+    """Values should become type names; None and booleans are harmless and kept."""
+    assert redact(("a@example.com", 3, None, True)) == ["<str>", "<int>", None, True]
+    assert redact({"email": "a@example.com"}) == {"email": "<str>"}
+
+
+class TestSlowQueryLog:
+    """Tests for SlowQueryLog."""
+
+    async def test_records_slow_statements_with_plan(self, engine: AsyncEngine) -> None:
+        """A slow statement should be logged with redacted parameters and its query plan."""
+        log = SlowQueryLog(threshold=1e-9, size=10)
+        log.install(engine.sync_engine)
+
+        async with engine.connect() as conn:
+            for _ in range(2):
+                await conn.execute(
+                    text("SELECT id FROM tokens WHERE user_id = :u"), {"u": "secret"}
+                )
+
+        first, second = log.records()
+        assert first.parameters == ["<str>"]
+        assert first.route is None
+        assert first.plan is not None and "ix_tokens_user_id" in first.plan
+        assert second.plan == first.plan
+
+    async def test_ignores_fast_statements(self, engine: AsyncEngine) -> None:
+        """Statements under the threshold should not be logged."""
+        log = SlowQueryLog(threshold=60.0, size=10)
+        log.install(engine.sync_engine)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        assert log.records() == []
+
+    async def test_disabled_log_installs_nothing(self, engine: AsyncEngine) -> None:
+        """A zero threshold should disable the log entirely."""
+        log = SlowQueryLog(threshold=0, size=10)
+        log.install(engine.sync_engine)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        assert not log.enabled
+        assert log.records() == []
+
+    async def test_keeps_newest_records(self, engine: AsyncEngine) -> None:
+        """The log should be bounded, dropping the oldest records first."""
+        log = SlowQueryLog(threshold=1e-9, size=2)
+        log.install(engine.sync_engine)
+
+        async with engine.connect() as conn:
+            for value in range(3):
+                await conn.execute(text(f"SELECT {value}"))
+
+        assert [record.statement for record in log.records()] == ["SELECT 2", "SELECT 1"]
+
+    async def test_records_originating_route(self, engine: AsyncEngine) -> None:
+        """Statements issued while serving a request should carry its route template."""
+        log = SlowQueryLog(threshold=1e-9, size=10)
+        log.install(engine.sync_engine)
+        app = FastAPI()
+
+        @app.get("/users/{user_id}/tokens")
+        async def tokens(user_id: str) -> dict[str, int]:
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    text("SELECT count(*) FROM tokens WHERE user_id = :u"), {"u": user_id}
+                )
+            return {"count": result.scalar_one()}
+
+        app.add_middleware(RequestRouteMiddleware)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/users/42/tokens")
+
+        assert [record.route for record in log.records()] == ["/users/{user_id}/tokens"]
+        assert log.records(route="/other") == []
+
+
+class TestSlowQueriesEndpoint:
+    """Tests for GET /admin/slow-queries."""
+
+    async def test_requires_diagnostics_token(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Only requests with the configured token should see the log."""
+        monkeypatch.setattr(diagnostics.settings, "DIAGNOSTICS_TOKEN", "s3cret")
+        slow_query_log.clear()
+        slow_query_log.record("SELECT 1", (), 0.25, None)
+        app = FastAPI()
+        app.include_router(admin_router)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            denied = await client.get("/admin/slow-queries")
+            allowed = await client.get(
+                "/admin/slow-queries", headers={DIAGNOSTICS_HEADER: "s3cret"}
+            )
+        slow_query_log.clear()
+
+        assert denied.status_code == 403
+        assert allowed.status_code == 200
+        (query,) = allowed.json()["queries"]
+        assert query["statement"] == "SELECT 1"
+        assert query["duration_ms"] == 250.0
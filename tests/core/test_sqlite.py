@@ -0,0 +1,91 @@
+"""Tests for the SQLite WAL profile."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import exc, insert, select, text, update
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.auth.models import User
+from src.core.database import Base
+from src.core.sqlite import install_sqlite_pragmas, routing_session_class
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+async def _engines(tmp_path: Path) -> tuple[AsyncEngine, AsyncEngine]:
+    url = f"sqlite+aiosqlite:///{tmp_path / 'wal.db'}"
+    writer, reader = create_async_engine(url), create_async_engine(url)
+    install_sqlite_pragmas(writer)
+    install_sqlite_pragmas(reader, query_only=True)
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return writer, reader
+
+
+class TestSqlitePragmas:
+    """Tests for install_sqlite_pragmas."""
+
+    async def test_connections_use_wal(self, tmp_path: Path) -> None:
+        """New connections should run in WAL mode with NORMAL synchronous."""
+        writer, reader = await _engines(tmp_path)
+        async with reader.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+        await writer.dispose()
+        await reader.dispose()
+
+    async def test_reader_connections_are_read_only(self, tmp_path: Path) -> None:
+        """Writes through the reader engine should be refused."""
+        writer, reader = await _engines(tmp_path)
+        async with reader.connect() as conn:
+            with pytest.raises(exc.OperationalError):
+                await conn.execute(
+                    insert(User).values(
+                        id="u1",
+                        email="a@example.com",
+                        username="alice",
+                        hashed_password="x",
+                        is_active=True,
+                    )
+                )
+        await writer.dispose()
+        await reader.dispose()
+
+
+class TestRoutingSession:
+    """Tests for routing_session_class."""
+
+    async def test_reads_go_to_reader_until_the_transaction_writes(self, tmp_path: Path) -> None:
+        """SELECTs should use the reader, then stick to the writer after a write."""
+        writer, reader = await _engines(tmp_path)
+        factory = async_sessionmaker(
+            sync_session_class=routing_session_class(writer, reader), class_=AsyncSession
+        )
+        query = select(User)
+        async with factory() as db:
+            session = db.sync_session
+            assert session.get_bind(clause=query) is reader.sync_engine
+
+            db.add(
+                User(email="a@example.com", username="alice", hashed_password="x", is_active=True)
+            )
+            await db.flush()
+            assert session.get_bind(clause=query) is writer.sync_engine
+            assert (await db.execute(query)).scalar_one().username == "alice"
+
+            await db.commit()
+            assert session.get_bind(clause=query) is reader.sync_engine
+            assert (await db.execute(query)).scalar_one().username == "alice"
+
+            assert session.get_bind(clause=update(User)) is writer.sync_engine
+        await writer.dispose()
+        await reader.dispose()
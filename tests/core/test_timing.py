@@ -0,0 +1,131 @@
+"""Tests for Server-Timing phase recording."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+from fastapi import FastAPI
+
+from src.auth.schemas import UserRegisterRequest
+from src.auth.service import authenticate_user, create_tokens, register_user
+from src.core import diagnostics, timing
+from src.core.diagnostics import DIAGNOSTICS_HEADER
+from src.core.timing import PhaseTimer, ServerTimingMiddleware, phase, record_phase
+
+if TYPE_CHECKING:
+    import pytest
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _phases(header: str) -> dict[str, str]:
+    """Map each Server-Timing metric name to its parameters."""
+
+    metrics = (metric.split(";", 1) for metric in header.split(", "))
+    return dict(metrics)
+
+
+def _timed_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def index() -> dict[str, str]:
+        with phase("work"):
+            record_phase("db", 0.002)
+            record_phase("db", 0.001)
+        return {"status": "ok"}
+
+    app.add_middleware(ServerTimingMiddleware)
+    return app
+
+
+async def _get(app: FastAPI, headers: dict[str, str] | None = None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/", headers=headers)
+
+
+class TestPhaseTimer:
+    """Tests for PhaseTimer and the recording helpers."""
+
+    def test_header_sums_repeated_phases(self) -> None:
+        """Repeated phases should be summed, with their count, and total should come last."""
+        timer = PhaseTimer()
+        timer.add("db", 0.0015)
+        timer.add("bcrypt", 0.25)
+        timer.add("db", 0.0005)
+
+        header = timer.header()
+
+        assert header.startswith('db;dur=2.000;desc="2 calls", bcrypt;dur=250.000, total;dur=')
+
+    def test_helpers_are_noops_without_timer(self) -> None:
+        """Recording outside an opted-in request should do nothing."""
+        with phase("work"):
+            record_phase("db", 1.0)
+
+        assert timing._current_timer.get() is None
+
+
+class TestServerTimingMiddleware:
+    """Tests for ServerTimingMiddleware."""
+
+    async def test_disabled_by_default(self) -> None:
+        """Requests without the setting or a trusted header should get no header."""
+        response = await _get(_timed_app())
+
+        assert "server-timing" not in response.headers
+
+    async def test_enabled_by_setting(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """With SERVER_TIMING_ENABLED every response should carry the breakdown."""
+        monkeypatch.setattr(timing.settings, "SERVER_TIMING_ENABLED", True)
+
+        response = await _get(_timed_app())
+
+        phases = _phases(response.headers["server-timing"])
+        assert set(phases) == {"work", "db", "total"}
+        assert phases["db"] == 'dur=3.000;desc="2 calls"'
+
+    async def test_enabled_by_trusted_header(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Only the configured diagnostics token should turn timing on."""
+        monkeypatch.setattr(diagnostics.settings, "DIAGNOSTICS_TOKEN", "s3cret")
+        app = _timed_app()
+
+        trusted = await _get(app, {DIAGNOSTICS_HEADER: "s3cret"})
+        untrusted = await _get(app, {DIAGNOSTICS_HEADER: "guess"})
+
+        assert "work" in _phases(trusted.headers["server-timing"])
+        assert "server-timing" not in untrusted.headers
+
+    async def test_header_ignored_without_configured_token(self) -> None:
+        """An empty DIAGNOSTICS_TOKEN should never match, even an empty header."""
+        response = await _get(_timed_app(), {DIAGNOSTICS_HEADER: ""})
+
+        assert "server-timing" not in response.headers
+
+    async def test_reports_login_phases(
+        self,
+        db_session: AsyncSession,
+        test_user_data: dict[str, str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Registration and login should report bcrypt, lookup, JWT and commit phases."""
+        monkeypatch.setattr(timing.settings, "SERVER_TIMING_ENABLED", True)
+        app = FastAPI()
+
+        @app.get("/")
+        async def login() -> dict[str, str]:
+            await register_user(db_session, UserRegisterRequest(**test_user_data))
+            user = await authenticate_user(
+                db_session, test_user_data["email"], test_user_data["password"]
+            )
+            access_token, _ = create_tokens(user)
+            return {"access_token": access_token}
+
+        app.add_middleware(ServerTimingMiddleware)
+
+        response = await _get(app)
+
+        phases = _phases(response.headers["server-timing"])
+        assert {"bcrypt", "user_lookup", "jwt", "commit", "total"} <= set(phases)
+        assert phases["bcrypt"].endswith('desc="2 calls"')
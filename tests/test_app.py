@@ -0,0 +1,80 @@
+"""HTTP-level tests for the operational endpoints of the application."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.app import app
+from src.core import diagnostics
+from src.core.diagnostics import DIAGNOSTICS_HEADER
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+HEALTH_ENDPOINTS = ["/health/hashing", "/health/cache", "/health/sweeper", "/health/db"]
+
+
+@pytest_asyncio.fixture
+async def client() -> AsyncGenerator[httpx.AsyncClient, None]:
+    """Client for the full application."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+class TestHealth:
+    """Tests for the liveness check and the /health endpoints."""
+
+    async def test_root_is_public(self, client: httpx.AsyncClient) -> None:
+        """The liveness check should not need a token."""
+        response = await client.get("/")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+    @pytest.mark.parametrize("path", HEALTH_ENDPOINTS)
+    async def test_requires_diagnostics_token(
+        self, client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch, path: str
+    ) -> None:
+        """Only requests with the configured token should see internal stats."""
+        monkeypatch.setattr(diagnostics.settings, "DIAGNOSTICS_TOKEN", "s3cret")
+
+        denied = await client.get(path)
+        wrong = await client.get(path, headers={DIAGNOSTICS_HEADER: "guess"})
+        allowed = await client.get(path, headers={DIAGNOSTICS_HEADER: "s3cret"})
+
+        assert denied.status_code == 403
+        assert wrong.status_code == 403
+        assert allowed.status_code == 200
+
+    @pytest.mark.parametrize("path", HEALTH_ENDPOINTS)
+    async def test_closed_without_configured_token(
+        self, client: httpx.AsyncClient, path: str
+    ) -> None:
+        """With no token configured the endpoints should stay closed."""
+        response = await client.get(path, headers={DIAGNOSTICS_HEADER: ""})
+
+        assert response.status_code == 403
+
+
+class TestMetrics:
+    """Tests for GET /metrics."""
+
+    async def test_serves_prometheus_text_format(self, client: httpx.AsyncClient) -> None:
+        """The exposition should use the Prometheus text content type and layout."""
+        await client.get("/")
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        lines = response.text.splitlines()
+        assert "# TYPE http_requests_total counter" in lines
+        assert any(line.startswith("# HELP http_requests_total ") for line in lines)
+        assert any(
+            line.startswith("http_requests_total{") and 'route="/"' in line for line in lines
+        )